@@ -1,28 +1,27 @@
 import streamlit as st
-import re
-import string
 import pandas as pd
-from collections import Counter
-import numpy as np
-import requests
-import json
+import atexit
 import os
+import queue
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-# PDF processing - try multiple libraries
-try:
-    import fitz  # PyMuPDF
-    PDF_LIBRARY = "pymupdf"
-except ImportError:
-    try:
-        import pdfplumber
-        PDF_LIBRARY = "pdfplumber"
-    except ImportError:
-        try:
-            from PyPDF2 import PdfReader
-            PDF_LIBRARY = "pypdf2"
-        except ImportError:
-            PDF_LIBRARY = None
-            st.error("❌ Tidak ada library PDF yang terinstall. Install salah satu: PyMuPDF, pdfplumber, atau PyPDF2")
+import requests
+
+import extractors
+from cache import ResultCache, file_content_hash
+from errors import OpenRouterError
+from evaluator import INTERACTIVE_MAX_CHARS, INTERACTIVE_MAX_PAGES, CVEvaluator, OpenRouterClient
+from job_matching import JobMatcher
+from metrics import METRICS
+from ocr import PageOCR, ocr_available
+from results_store import ResultsStore
+from scheduler import RequestScheduler
+
+# PDF processing - backend dipilih per dokumen oleh registry di extractors.py
+if not extractors.available_extractors():
+    st.error("❌ Tidak ada library PDF yang terinstall. Install salah satu: PyMuPDF, pdfplumber, atau PyPDF2")
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -31,357 +30,340 @@ st.set_page_config(
     layout="wide"
 )
 
-class OpenRouterClient:
-    def __init__(self, api_key, model="anthropic/claude-3.5-sonnet"):
-        self.api_key = api_key
-        self.model = model
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.headers = {
-            "Authorization": f"Bearer {api_key}",
-            "HTTP-Referer": "http://localhost:8501",
-            "X-Title": "CV Evaluator App",
-            "Content-Type": "application/json"
-        }
-        
-        # Model pricing info (per 1M tokens)
-        self.model_info = {
-            "anthropic/claude-3.5-sonnet": {"name": "Claude 3.5 Sonnet", "cost": "$3", "quality": "Premium"},
-            "openai/gpt-4o-mini": {"name": "GPT-4o Mini", "cost": "$0.15", "quality": "Good"},
-            "google/gemini-flash-1.5": {"name": "Gemini Flash", "cost": "$0.075", "quality": "Good"},
-            "meta-llama/llama-3.1-8b-instruct": {"name": "Llama 3.1 8B", "cost": "$0.055", "quality": "Budget"},
-            "microsoft/wizardlm-2-8x22b": {"name": "WizardLM", "cost": "$0.50", "quality": "Good"},
-            "mistralai/mixtral-8x7b-instruct": {"name": "Mixtral 8x7B", "cost": "$0.24", "quality": "Good"}
-        }
-    
-    def analyze_cv_with_ai(self, cv_text):
-        """Analisis CV menggunakan AI dari OpenRouter"""
-        prompt = f"""
-        Analisis CV berikut dan berikan penilaian dalam format JSON yang tepat:
+# Interface Streamlit
+# Resource berikut dibuat sekali per proses server dan dipakai bersama oleh semua sesi & rerun
+@st.cache_resource
+def get_scheduler(api_key):
+    """Scheduler request AI per API key, dipakai bersama oleh semua sesi"""
+    return RequestScheduler(OpenRouterClient(api_key))
 
-        CV TEXT:
-        {cv_text[:4000]}  # Batasi panjang text untuk API
+@st.cache_resource
+def get_result_cache():
+    cache = ResultCache()
+    # Counter hit/miss dan waktu akses yang masih ditampung ditulis saat proses berhenti
+    atexit.register(cache.flush)
+    return cache
 
-        Berikan response dalam format JSON dengan struktur berikut:
-        {{
-            "overall_score": <nilai 0-100>,
-            "section_scores": {{
-                "structure": <nilai 0-25>,
-                "experience": <nilai 0-25>, 
-                "skills": <nilai 0-25>,
-                "branding": <nilai 0-25>
-            }},
-            "strengths": [
-                "kekuatan 1",
-                "kekuatan 2"
-            ],
-            "weaknesses": [
-                "kelemahan 1", 
-                "kelemahan 2"
-            ],
-            "suggestions": [
-                "saran 1",
-                "saran 2",
-                "saran 3"
-            ],
-            "job_roles": [
-                {{
-                    "role": "nama role",
-                    "match_percentage": <nilai 0-100>,
-                    "reason": "alasan mengapa cocok"
-                }}
-            ],
-            "detected_skills": [
-                "skill1", "skill2", "skill3"
-            ]
-        }}
+@st.cache_resource
+def get_page_ocr():
+    """Process pool OCR yang dipakai bersama oleh semua evaluator (False jika OCR tidak tersedia)"""
+    if not ocr_available():
+        return False
+    ocr = PageOCR(cache=get_result_cache())
+    atexit.register(ocr.close)
+    return ocr
 
-        Kriteria penilaian:
-        - Structure (25): Kelengkapan section, format, organisasi
-        - Experience (25): Deskripsi kerja, pencapaian, impact
-        - Skills (25): Technical skills, tools, expertise
-        - Branding (25): Contact info, LinkedIn, portfolio, summary
+@st.cache_resource
+def get_results_store():
+    """Results store Parquet (None jika pyarrow tidak terinstall)"""
+    try:
+        # Hasil dari UI ditampung lalu ditulis per 20 CV / 60 detik, saat tab ranking dibuka, dan saat
+        # proses berhenti; part kecil digabung otomatis oleh store
+        store = ResultsStore(flush_rows=20, flush_seconds=60)
+    except ImportError:
+        return None
+    atexit.register(store.close)
+    return store
 
-        Berikan analisis yang mendalam dan konstruktif dalam bahasa Indonesia.
-        """
+@st.cache_resource
+def get_evaluator(api_key, model):
+    """Evaluator (taksonomi + engine aturan scoring, client HTTP dengan connection pool) per API key & model"""
+    openrouter_client = OpenRouterClient(api_key, model) if api_key else None
+    scheduler = get_scheduler(api_key) if api_key else None
+    return CVEvaluator(openrouter_client, cache=get_result_cache(), scheduler=scheduler, ocr=get_page_ocr(),
+                       max_pages=INTERACTIVE_MAX_PAGES, max_chars=INTERACTIVE_MAX_CHARS)
 
-        payload = {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ],
-            "max_tokens": 2000,
-            "temperature": 0.3
-        }
+def parse_job_descriptions(text):
+    """Job description dari text area: blok dipisah baris `---`, baris pertama blok = nama posisi"""
+    jobs = {}
+    for block in text.split("\n---"):
+        lines = block.strip().strip("-").strip().splitlines()
+        if lines and lines[0].strip():
+            jobs[lines[0].strip()] = "\n".join(lines)
+    return jobs
 
-        try:
-            response = requests.post(self.base_url, headers=self.headers, json=payload)
-            
-            # Handle specific error codes
-            if response.status_code == 402:
-                st.error("💳 **Payment Required**: Akun OpenRouter memerlukan top-up balance.")
-                st.info("""
-                **Cara mengatasi:**
-                1. Kunjungi https://openrouter.ai/account
-                2. Top-up balance minimal $5
-                3. Atau gunakan mode analisis dasar (tanpa API key)
-                """)
-                return None
-            elif response.status_code == 401:
-                st.error("🔑 **API Key Invalid**: Periksa kembali API key Anda.")
-                return None
-            elif response.status_code == 429:
-                st.error("⏰ **Rate Limit**: Terlalu banyak request. Coba lagi dalam beberapa menit.")
-                return None
-            
-            response.raise_for_status()
-            
-            result = response.json()
-            ai_response = result['choices'][0]['message']['content']
-            
-            # Parse JSON response
-            try:
-                # Ekstrak JSON dari response (jika ada text tambahan)
-                json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group()
-                    return json.loads(json_str)
-                else:
-                    return json.loads(ai_response)
-            except json.JSONDecodeError:
-                # Fallback jika parsing gagal
-                return self._create_fallback_response(ai_response)
-                
-        except requests.exceptions.RequestException as e:
-            if "402" in str(e):
-                st.error("💳 **Insufficient Balance**: Silakan top-up akun OpenRouter Anda.")
-            else:
-                st.error(f"❌ **API Error**: {str(e)}")
-            return None
-        except Exception as e:
-            st.error(f"❌ **Unexpected Error**: {str(e)}")
-            return None
-    
-    def _create_fallback_response(self, ai_text):
-        """Fallback response jika JSON parsing gagal"""
-        return {
-            "overall_score": 70,
-            "section_scores": {
-                "structure": 18,
-                "experience": 17,
-                "skills": 18,
-                "branding": 17
-            },
-            "strengths": ["CV struktur cukup baik", "Informasi lengkap"],
-            "weaknesses": ["Perlu lebih detail", "Format bisa diperbaiki"],
-            "suggestions": [
-                "Tambahkan ringkasan profil yang menarik",
-                "Sertakan lebih banyak pencapaian dengan angka",
-                "Update skills sesuai tren industri"
-            ],
-            "job_roles": [
-                {"role": "General Position", "match_percentage": 70, "reason": "Profil umum yang cukup baik"}
-            ],
-            "detected_skills": ["Communication", "Teamwork", "Problem Solving"],
-            "ai_raw_response": ai_text
-        }
+@st.cache_resource
+def get_job_matcher(jobs_text):
+    """Matcher TF-IDF per isi text area job description (dibangun ulang hanya jika isinya berubah)"""
+    jobs = parse_job_descriptions(jobs_text)
+    return JobMatcher(jobs, CVEvaluator.clean_text) if jobs else None
 
-class CVEvaluator:
-    def __init__(self, openrouter_client=None):
-        self.openrouter_client = openrouter_client
-        
-        # Database role dan skill yang terkait (sebagai backup)
-        self.role_skills = {
-            "Data Analyst": [
-                "python", "sql", "excel", "tableau", "power bi", "pandas", "numpy", 
-                "statistics", "data visualization", "analytics", "reporting", "dashboard"
-            ],
-            "Data Scientist": [
-                "python", "r", "machine learning", "deep learning", "tensorflow", "pytorch",
-                "scikit-learn", "statistics", "pandas", "numpy", "jupyter", "sql"
-            ],
-            "Software Engineer": [
-                "python", "java", "javascript", "react", "node.js", "git", "api", 
-                "backend", "frontend", "database", "sql", "mongodb"
-            ],
-            "UI/UX Designer": [
-                "figma", "sketch", "adobe xd", "photoshop", "illustrator", "wireframe",
-                "prototype", "user research", "design thinking", "html", "css"
-            ],
-            "Digital Marketing": [
-                "google ads", "facebook ads", "seo", "sem", "google analytics", 
-                "social media", "content marketing", "email marketing", "copywriting"
-            ],
-            "Content Writer": [
-                "writing", "copywriting", "content creation", "seo", "wordpress",
-                "blog", "social media", "research", "editing", "proofreading"
-            ],
-            "Project Manager": [
-                "agile", "scrum", "jira", "trello", "project management", "leadership",
-                "communication", "planning", "stakeholder management", "risk management"
-            ],
-            "Business Analyst": [
-                "requirements analysis", "business process", "sql", "excel", "documentation",
-                "stakeholder management", "process improvement", "data analysis"
-            ]
-        }
+def report_openrouter_error(e):
+    """Tampilkan pesan error OpenRouter yang sesuai di UI"""
+    # Handle specific error codes
+    if e.status_code == 402:
+        st.error("💳 **Payment Required**: Akun OpenRouter memerlukan top-up balance.")
+        st.info("""
+        **Cara mengatasi:**
+        1. Kunjungi https://openrouter.ai/account
+        2. Top-up balance minimal $5
+        3. Atau gunakan mode analisis dasar (tanpa API key)
+        """)
+    elif e.status_code == 401:
+        st.error("🔑 **API Key Invalid**: Periksa kembali API key Anda.")
+    elif e.status_code == 429:
+        st.error("⏰ **Rate Limit**: Terlalu banyak request. Coba lagi dalam beberapa menit.")
+    else:
+        st.error(f"❌ **API Error**: {str(e)}")
 
-    def extract_text_from_pdf(self, pdf_file):
-        """Ekstrak teks dari file PDF dengan multiple library support"""
-        try:
-            if PDF_LIBRARY == "pymupdf":
-                doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-                text = ""
-                for page in doc:
-                    text += page.get_text()
-                doc.close()
-                return text
-                
-            elif PDF_LIBRARY == "pdfplumber":
-                pdf_file.seek(0)  # Reset file pointer
-                with pdfplumber.open(pdf_file) as pdf:
-                    text = ""
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                    return text
-                    
-            elif PDF_LIBRARY == "pypdf2":
-                pdf_file.seek(0)  # Reset file pointer
-                pdf_reader = PdfReader(pdf_file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
-                
-            else:
-                st.error("❌ Tidak ada library PDF yang tersedia")
-                return ""
-                
-        except Exception as e:
-            st.error(f"Error membaca PDF: {str(e)}")
-            return ""
+def report_errors(errors):
+    for error in errors:
+        if isinstance(error, OpenRouterError):
+            report_openrouter_error(error)
+        elif isinstance(error, extractors.PDFExtractionError):
+            st.error(f"Error membaca PDF: {str(error)}")
+        else:
+            st.warning(f"AI analysis gagal, menggunakan analisis dasar: {str(error)}")
 
-    def clean_text(self, text):
-        """Membersihkan dan memproses teks"""
-        # Konversi ke lowercase untuk processing
-        text_clean = text.lower()
-        # Hapus karakter khusus berlebihan tapi pertahankan struktur
-        text_clean = re.sub(r'[^\w\s@.-]', ' ', text_clean)
-        # Hapus spasi berlebihan
-        text_clean = re.sub(r'\s+', ' ', text_clean)
-        return text_clean.strip()
+# Mode client: jika CV_EVAL_SERVICE_URL di-set, scoring dikerjakan oleh service.py
+SERVICE_URL = os.environ.get("CV_EVAL_SERVICE_URL")
 
-    def fallback_analysis(self, text):
-        """Analisis fallback menggunakan rule-based system"""
-        clean_text = self.clean_text(text)
+def evaluate_via_service(pdf_bytes, api_key, model, user, timeout=300):
+    """Kirim CV ke service HTTP lalu tunggu hasilnya (long-polling). Return (results, errors)"""
+    headers = {"Content-Type": "application/pdf"}
+    if api_key:
+        headers["X-OpenRouter-Key"] = api_key
+    try:
+        response = requests.post(f"{SERVICE_URL}/jobs", data=pdf_bytes, headers=headers,
+                                 params={"model": model, "user": user}, timeout=30)
+        response.raise_for_status()
+        job_id = response.json()["job_id"]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = requests.get(f"{SERVICE_URL}/jobs/{job_id}", params={"wait": 30}, timeout=60).json()
+            if job["status"] in ("done", "failed"):
+                break
+        else:
+            return None, [TimeoutError("Service tidak mengembalikan hasil tepat waktu")]
+    except requests.exceptions.RequestException as e:
+        return None, [RuntimeError(f"Service tidak dapat dihubungi: {str(e)}")]
+
+    errors = []
+    for error in job.get("errors", []):
+        if error["type"] == "OpenRouterError":
+            errors.append(OpenRouterError(error["message"], error["status_code"]))
+        elif error["type"] == "PDFExtractionError":
+            errors.append(extractors.PDFExtractionError(error["message"]))
+        else:
+            errors.append(RuntimeError(error["message"]))
+    st.session_state["last_timings"] = job.get("timings", {})
+    return job.get("results"), errors
+
+def render_results(results, partial=False):
+    """Tampilkan hasil evaluasi. `partial=True` untuk hasil streaming yang belum lengkap"""
+    # Tampilkan hasil
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        # Skor utama
+        st.markdown("## 📊 Hasil Evaluasi CV")
         
-        # Basic scoring
-        structure_score = self._calculate_structure_score(clean_text)
-        experience_score = self._calculate_experience_score(clean_text)
-        skills_score = self._calculate_skills_score(clean_text)
-        branding_score = self._calculate_branding_score(clean_text)
+        # Score gauge
+        score = results.get('overall_score')
+        if score is None:
+            st.info("⏳ Menunggu skor keseluruhan...")
+        else:
+            if score >= 80:
+                color = "green"
+                status = "Excellent"
+            elif score >= 60:
+                color = "orange"
+                status = "Good"
+            else:
+                color = "red"
+                status = "Needs Improvement"
+            
+            st.markdown(f"""
+            <div style="text-align: center; padding: 20px; background-color: #f0f2f6; border-radius: 10px;">
+                <h1 style="color: {color}; margin: 0;">{score}/100</h1>
+                <h3 style="color: {color}; margin: 0;">{status}</h3>
+            </div>
+            """, unsafe_allow_html=True)
         
-        total_score = structure_score + experience_score + skills_score + branding_score
+        # Breakdown skor
+        st.markdown("### 📈 Detail Penilaian")
+        breakdown_data = []
+        for criteria, score_val in results.get('section_scores', {}).items():
+            breakdown_data.append({
+                'Kriteria': criteria.title(),
+                'Skor': score_val,
+                'Skor Max': 25,
+                'Persentase': round((score_val / 25) * 100, 1)
+            })
         
-        return {
-            "overall_score": total_score,
-            "section_scores": {
-                "structure": structure_score,
-                "experience": experience_score,
-                "skills": skills_score,
-                "branding": branding_score
-            },
-            "strengths": ["CV terstruktur dengan baik", "Informasi lengkap tersedia"],
-            "weaknesses": ["Bisa ditingkatkan dengan AI analysis"],
-            "suggestions": [
-                "Gunakan OpenRouter API untuk analisis yang lebih mendalam",
-                "Tambahkan lebih banyak detail pencapaian",
-                "Sertakan portfolio online"
-            ],
-            "job_roles": self._recommend_roles_basic(clean_text),
-            "detected_skills": self._extract_skills_basic(clean_text)
-        }
-
-    def _calculate_structure_score(self, text):
-        """Hitung skor struktur dasar"""
-        sections = ["profile", "experience", "education", "skills", "contact"]
-        score = 0
-        for section in sections:
-            if section in text:
-                score += 5
-        return min(score, 25)
-    
-    def _calculate_experience_score(self, text):
-        """Hitung skor pengalaman dasar"""
-        keywords = ["tahun", "year", "experience", "worked", "managed", "developed"]
-        score = sum(2 for keyword in keywords if keyword in text)
-        return min(score, 25)
+        if breakdown_data:
+            breakdown_df = pd.DataFrame(breakdown_data)
+            st.dataframe(breakdown_df, use_container_width=True)
+        
+        # Progress bars
+        for row in breakdown_data:
+            percentage = row['Skor'] / 25
+            st.progress(percentage, text=f"{row['Kriteria']}: {row['Skor']}/25")
     
-    def _calculate_skills_score(self, text):
-        """Hitung skor skills dasar"""
-        all_skills = set()
-        for skills_list in self.role_skills.values():
-            all_skills.update(skills_list)
+    with col2:
+        # Kekuatan dan Kelemahan
+        st.markdown("### ✅ Kekuatan")
+        for strength in results.get('strengths', [])[:3]:
+            st.write(f"• {strength}")
         
-        skills_count = sum(1 for skill in all_skills if skill in text)
-        return min(skills_count, 25)
+        st.markdown("### ⚠️ Area Perbaikan")
+        for weakness in results.get('weaknesses', [])[:3]:
+            st.write(f"• {weakness}")
     
-    def _calculate_branding_score(self, text):
-        """Hitung skor branding dasar"""
-        score = 0
-        if "@" in text: score += 6
-        if "linkedin" in text: score += 6
-        if "github" in text: score += 6
-        if "portfolio" in text: score += 7
-        return min(score, 25)
+    # Rekomendasi Role dengan AI
+    st.markdown("## 🎯 Rekomendasi Role Pekerjaan")
+    if results.get('job_roles'):
+        for rec in results['job_roles'][:3]:
+            with st.expander(f"🔥 {rec.get('role', '-')} - {rec.get('match_percentage', 0)}% Match"):
+                st.write(f"**Tingkat Kesesuaian**: {rec.get('match_percentage', 0)}%")
+                st.write(f"**Alasan**: {rec.get('reason', '')}")
+    elif not partial:
+        st.warning("Tidak ada rekomendasi role yang ditemukan.")
     
-    def _recommend_roles_basic(self, text):
-        """Rekomendasi role dasar"""
-        roles = []
-        for role, skills in list(self.role_skills.items())[:3]:
-            match_count = sum(1 for skill in skills if skill in text)
-            if match_count > 0:
-                percentage = min((match_count / len(skills)) * 100, 100)
-                roles.append({
-                    "role": role,
-                    "match_percentage": round(percentage, 1),
-                    "reason": f"Ditemukan {match_count} skills yang relevan"
-                })
-        return roles
+    # Skills yang Terdeteksi
+    st.markdown("## 🛠️ Skills Terdeteksi")
+    if results.get('detected_skills'):
+        skills_text = ", ".join(results['detected_skills'][:10])
+        st.info(f"**Skills**: {skills_text}")
     
-    def _extract_skills_basic(self, text):
-        """Ekstrak skills dasar"""
-        all_skills = set()
-        for skills_list in self.role_skills.values():
-            all_skills.update(skills_list)
-        
-        found_skills = [skill for skill in all_skills if skill in text]
-        return found_skills[:10]  # Return top 10
+    # Saran Perbaikan dari AI
+    st.markdown("## 💡 Saran Perbaikan AI")
+    if results.get('suggestions'):
+        for i, suggestion in enumerate(results['suggestions'], 1):
+            st.write(f"**{i}.** {suggestion}")
+    
+    # Tips tambahan
+    st.markdown("## 🚀 Tips Tambahan")
+    st.info("""
+    **Untuk hasil analisis terbaik:**
+    - Gunakan OpenRouter API key untuk analisis AI yang mendalam
+    - Pastikan CV dalam format PDF yang bersih dan terbaca
+    - Sertakan informasi lengkap di semua section
+    - Update CV secara berkala dengan pencapaian terbaru
+    """)
+    
+    # Debug info jika diperlukan (widget hanya dibuat setelah hasil lengkap)
+    if not partial and results.get('ai_raw_response') and st.checkbox("Tampilkan Raw AI Response"):
+        with st.expander("AI Raw Response"):
+            st.text(results['ai_raw_response'])
 
-    def evaluate_cv(self, pdf_file):
-        """Evaluasi CV secara keseluruhan"""
-        # Ekstrak teks
-        text = self.extract_text_from_pdf(pdf_file)
-        if not text:
-            return None
-        
-        # Jika ada OpenRouter client, gunakan AI analysis
-        if self.openrouter_client:
-            try:
-                ai_results = self.openrouter_client.analyze_cv_with_ai(text)
-                if ai_results:
-                    return ai_results
-            except Exception as e:
-                st.warning(f"AI analysis gagal, menggunakan analisis dasar: {str(e)}")
-        
-        # Fallback ke rule-based analysis
-        return self.fallback_analysis(text)
+def evaluate_with_progress(evaluator, uploaded_file, user_id):
+    """Evaluasi di thread terpisah; hasil parsial dari streaming AI ditampilkan begitu tiap field selesai"""
+    updates = queue.Queue()
+    placeholder = st.empty()
+    with st.spinner("🔄 Menganalisis CV dengan AI..."):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(evaluator.evaluate, uploaded_file, user_id, updates.put)
+            while not future.done() or not updates.empty():
+                try:
+                    partial = updates.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                # Jika beberapa update menumpuk, cukup tampilkan yang terbaru
+                while not updates.empty():
+                    partial = updates.get_nowait()
+                with placeholder.container():
+                    render_results(partial, partial=True)
+    placeholder.empty()
+    evaluation = future.result()
+    st.session_state["last_timings"] = evaluation.timings
+    return evaluation.results, evaluation.errors
+
+def render_debug_panel():
+    """Panel debug di sidebar: durasi tiap tahap evaluasi terakhir dan metrik proses server"""
+    with st.sidebar:
+        st.markdown("---")
+        if not st.checkbox("🛠️ Mode Debug Performa"):
+            return
+        timings = st.session_state.get("last_timings")
+        if timings:
+            st.write("**Evaluasi terakhir (ms)**")
+            st.dataframe(pd.DataFrame(
+                [{"Tahap": stage, "Durasi": round(seconds * 1000, 1)} for stage, seconds in timings.items()]
+            ), hide_index=True)
+        if SERVICE_URL:
+            st.caption(f"Metrik service tersedia di {SERVICE_URL}/metrics")
+            return
+        snapshot = METRICS.snapshot()
+        if not snapshot["timers"]:
+            st.info("Belum ada evaluasi di proses ini")
+            return
+        st.write("**Semua evaluasi di proses ini (ms)**")
+        st.dataframe(pd.DataFrame([
+            {"Tahap": stage, "Jumlah": timer["count"], "Rata-rata": round(timer["avg"] * 1000, 1),
+             "Maks": round(timer["max"] * 1000, 1)}
+            for stage, timer in sorted(snapshot["timers"].items())
+        ]), hide_index=True)
+        if snapshot["counters"]:
+            st.write("**Counter**")
+            st.dataframe(pd.DataFrame(
+                [{"Nama": name, "Nilai": value} for name, value in sorted(snapshot["counters"].items())]
+            ), hide_index=True)
+        st.download_button("⬇️ Download metrik (Prometheus)", METRICS.to_prometheus(),
+                           file_name="cv_eval_metrics.txt", mime="text/plain")
+
+def render_job_matching(evaluator, uploaded_file):
+    """Skor kecocokan CV terhadap job description yang dimasukkan user (format `job_roles`)"""
+    st.markdown("## 🧩 Kecocokan dengan Job Description")
+    jobs_text = st.text_area(
+        "Job description (pisahkan tiap posisi dengan baris `---`, baris pertama = nama posisi)",
+        key="job_descriptions", height=150,
+        placeholder="Data Analyst\nMenganalisis data penjualan dengan SQL dan Tableau...\n---\nBackend Engineer\n..."
+    )
+    matcher = get_job_matcher(jobs_text) if jobs_text.strip() else None
+    if matcher is None:
+        return
+    # Teks hasil ekstraksi diambil dari cache evaluator, sehingga PDF tidak diekstrak ulang
+    text = evaluator.load_text(uploaded_file, file_content_hash(uploaded_file))
+    matches = matcher.match([text]).top_jobs_per_cv(top_k=len(matcher.job_names))[0]
+    if not matches:
+        st.warning("Tidak ada kata kunci job description yang ditemukan di CV.")
+    for rec in matches:
+        st.progress(min(rec["match_percentage"] / 100, 1.0), text=f"{rec['role']}: {rec['match_percentage']}%")
+
+def render_ranking_view():
+    """Ranking CV dari results store (hasil batch.py --results dan evaluasi di UI)"""
+    store = get_results_store()
+    if store is None:
+        st.info("📦 Install `pyarrow` untuk menyimpan dan me-ranking hasil evaluasi")
+        return
+    store.flush()
+    if not store.count():
+        st.info("Belum ada hasil tersimpan. Jalankan `python batch.py folder_cv/ --results` "
+                "atau evaluasi CV di tab sebelah.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        role = st.selectbox("Role", ["(semua role)"] + store.roles())
+        campaign = st.selectbox("Campaign", ["(semua campaign)"] + store.campaigns())
+    with col2:
+        skills = st.multiselect("Wajib punya skill", store.skills())
+        min_score = st.slider("Skor minimal", 0, 100, 0)
+    with col3:
+        limit = st.number_input("Jumlah teratas", min_value=1, max_value=10000, value=50)
+
+    start = time.perf_counter()
+    table = store.query(role=None if role == "(semua role)" else role, skills=skills,
+                        min_score=min_score or None,
+                        campaign=None if campaign == "(semua campaign)" else campaign, limit=int(limit))
+    elapsed = time.perf_counter() - start
+    st.caption(f"{table.num_rows} dari {store.count()} CV ({elapsed * 1000:.1f} ms)")
+    if not table.num_rows:
+        return
+
+    df = table.to_pandas()
+    df["detected_skills"] = df["detected_skills"].map(lambda values: ", ".join(values))
+    df["roles"] = df["roles"].map(lambda values: ", ".join(
+        f"{value['role']} ({value['match_percentage']:.0f}%)" for value in values))
+    df["evaluated_at"] = pd.to_datetime(df["evaluated_at"], unit="s")
+    columns = ["name", "overall_score", *(["role_match"] if "role_match" in df else []),
+               "structure", "experience", "skills", "branding", "detected_skills", "roles",
+               "source", "model", "campaign", "evaluated_at"]
+    st.dataframe(df[columns], hide_index=True, use_container_width=True)
+    st.download_button("⬇️ Download ranking (CSV)", df[columns].to_csv(index=False),
+                       file_name="ranking_cv.csv", mime="text/csv")
 
-# Interface Streamlit
 def main():
     st.title("🤖 AI CV Evaluator with OpenRouter")
     st.subheader("Analisis CV Otomatis dengan AI Canggih")
@@ -448,7 +430,16 @@ def main():
         - **Personal Branding (25 poin)**
         """)
     
-    # Main content
+    tab_evaluation, tab_ranking = st.tabs(["📄 Evaluasi CV", "📊 Ranking Batch"])
+    with tab_evaluation:
+        render_evaluation(api_key, selected_model)
+    with tab_ranking:
+        render_ranking_view()
+
+    render_debug_panel()
+
+def render_evaluation(api_key, selected_model):
+    """Upload dan evaluasi satu CV"""
     uploaded_file = st.file_uploader(
         "📄 Upload CV Anda (Format PDF)",
         type=['pdf'],
@@ -461,107 +452,31 @@ def main():
             st.error("❌ Ukuran file terlalu besar! Maksimal 10MB.")
             return
         
-        with st.spinner("🔄 Menganalisis CV dengan AI..."):
-            # Setup OpenRouter client jika ada API key
-            openrouter_client = None
-            if api_key:
-                openrouter_client = OpenRouterClient(api_key, selected_model)
-            
-            evaluator = CVEvaluator(openrouter_client)
-            results = evaluator.evaluate_cv(uploaded_file)
+        # Hasil dimemo per (hash file, model) di sesi ini, sehingga interaksi widget
+        # setelah analisis pertama (mis. checkbox raw response) tidak memicu analisis ulang
+        memo_key = (file_content_hash(uploaded_file), selected_model if api_key else "rule-based")
+        session_results = st.session_state.setdefault("results", {})
+        results = session_results.get(memo_key)
+        if results is None:
+            user_id = st.session_state.setdefault("user_id", uuid.uuid4().hex)
+            if SERVICE_URL:
+                with st.spinner("🔄 Menganalisis CV dengan AI..."):
+                    results, errors = evaluate_via_service(uploaded_file.getvalue(), api_key, selected_model, user_id)
+            else:
+                results, errors = evaluate_with_progress(get_evaluator(api_key, selected_model), uploaded_file, user_id)
+            report_errors(errors)
+            if results:
+                session_results[memo_key] = results
+                store = get_results_store()
+                if store is not None:
+                    ai_scored = bool(api_key) and not errors
+                    store.append(results, memo_key[0], name=uploaded_file.name,
+                                 source="ai" if ai_scored else "rule-based",
+                                 model=selected_model if ai_scored else None)
         
         if results:
-            # Tampilkan hasil
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                # Skor utama
-                st.markdown("## 📊 Hasil Evaluasi CV")
-                
-                # Score gauge
-                score = results['overall_score']
-                if score >= 80:
-                    color = "green"
-                    status = "Excellent"
-                elif score >= 60:
-                    color = "orange"
-                    status = "Good"
-                else:
-                    color = "red"
-                    status = "Needs Improvement"
-                
-                st.markdown(f"""
-                <div style="text-align: center; padding: 20px; background-color: #f0f2f6; border-radius: 10px;">
-                    <h1 style="color: {color}; margin: 0;">{score}/100</h1>
-                    <h3 style="color: {color}; margin: 0;">{status}</h3>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Breakdown skor
-                st.markdown("### 📈 Detail Penilaian")
-                breakdown_data = []
-                for criteria, score_val in results['section_scores'].items():
-                    breakdown_data.append({
-                        'Kriteria': criteria.title(),
-                        'Skor': score_val,
-                        'Skor Max': 25,
-                        'Persentase': round((score_val / 25) * 100, 1)
-                    })
-                
-                breakdown_df = pd.DataFrame(breakdown_data)
-                st.dataframe(breakdown_df, use_container_width=True)
-                
-                # Progress bars
-                for row in breakdown_data:
-                    percentage = row['Skor'] / 25
-                    st.progress(percentage, text=f"{row['Kriteria']}: {row['Skor']}/25")
-            
-            with col2:
-                # Kekuatan dan Kelemahan
-                st.markdown("### ✅ Kekuatan")
-                for strength in results.get('strengths', [])[:3]:
-                    st.write(f"• {strength}")
-                
-                st.markdown("### ⚠️ Area Perbaikan")
-                for weakness in results.get('weaknesses', [])[:3]:
-                    st.write(f"• {weakness}")
-            
-            # Rekomendasi Role dengan AI
-            st.markdown("## 🎯 Rekomendasi Role Pekerjaan")
-            if results.get('job_roles'):
-                for rec in results['job_roles'][:3]:
-                    with st.expander(f"🔥 {rec['role']} - {rec['match_percentage']}% Match"):
-                        st.write(f"**Tingkat Kesesuaian**: {rec['match_percentage']}%")
-                        st.write(f"**Alasan**: {rec['reason']}")
-            else:
-                st.warning("Tidak ada rekomendasi role yang ditemukan.")
-            
-            # Skills yang Terdeteksi
-            st.markdown("## 🛠️ Skills Terdeteksi")
-            if results.get('detected_skills'):
-                skills_text = ", ".join(results['detected_skills'][:10])
-                st.info(f"**Skills**: {skills_text}")
-            
-            # Saran Perbaikan dari AI
-            st.markdown("## 💡 Saran Perbaikan AI")
-            if results.get('suggestions'):
-                for i, suggestion in enumerate(results['suggestions'], 1):
-                    st.write(f"**{i}.** {suggestion}")
-            
-            # Tips tambahan
-            st.markdown("## 🚀 Tips Tambahan")
-            st.info("""
-            **Untuk hasil analisis terbaik:**
-            - Gunakan OpenRouter API key untuk analisis AI yang mendalam
-            - Pastikan CV dalam format PDF yang bersih dan terbaca
-            - Sertakan informasi lengkap di semua section
-            - Update CV secara berkala dengan pencapaian terbaru
-            """)
-            
-            # Debug info jika diperlukan
-            if results.get('ai_raw_response') and st.checkbox("Tampilkan Raw AI Response"):
-                with st.expander("AI Raw Response"):
-                    st.text(results['ai_raw_response'])
+            render_results(results)
+            render_job_matching(get_evaluator(api_key, selected_model), uploaded_file)
         
         else:
             st.error("❌ Gagal memproses CV. Pastikan file PDF dapat dibaca dengan baik.")
@@ -0,0 +1,449 @@
+"""Evaluasi CV massal (batch) tanpa UI menggunakan process pool.
+
+Contoh penggunaan:
+    python batch.py folder_cv/ --workers 8 --output hasil.jsonl
+
+    # Run yang bisa dilanjutkan: CV yang sudah dinilai dilewati, CV yang
+    # terdampak perubahan taksonomi/prompt dinilai ulang
+    python batch.py folder_cv/ --store .cache/jobs.sqlite3 --model openai/gpt-4o-mini
+
+    # Cascade: rule-based untuk semua CV, model premium hanya untuk CV borderline/teratas
+    python batch.py folder_cv/ --cascade rule-based:45-70:80 --cascade anthropic/claude-3.5-sonnet
+
+    # Near-duplicate: salinan CV yang sedikit diedit ditautkan ke hasil CV representatif
+    python batch.py folder_cv/ --store .cache/jobs.sqlite3 --model openai/gpt-4o-mini --dedup
+
+    # Simpan hasil ke results store Parquet untuk ranking/filter (lihat results_store.py)
+    python batch.py folder_cv/ --store .cache/jobs.sqlite3 --results --campaign rekrutmen-2024q3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from cascade import RULE_BASED, ModelCascade, parse_tier_spec
+from evaluator import CVEvaluator, OpenRouterClient
+from cache import ResultCache, file_content_hash
+from dedup import DEFAULT_DEDUP_PATH, NearDuplicateIndex
+from jobs import FAILED, SCORED_AI, SCORED_FALLBACK, SCORED_STATES, JobStore
+from metrics import METRICS, profile
+from ocr import PageOCR, ocr_available
+from results_store import DEFAULT_RESULTS_PATH, ResultsStore
+from scheduler import RequestScheduler
+
+# Evaluator per proses worker (dibuat sekali oleh initializer)
+_worker_evaluator = None
+
+
+def _init_worker(cache_path=None, max_pages=None, max_chars=None):
+    global _worker_evaluator
+    cache = ResultCache(cache_path) if cache_path else None
+    # Proses worker sudah paralel, sehingga OCR dijalankan langsung tanpa process pool tambahan
+    ocr = PageOCR(workers=0, cache=cache) if ocr_available() else False
+    _worker_evaluator = CVEvaluator(cache=cache, max_pages=max_pages, max_chars=max_chars, ocr=ocr)
+
+
+def _process_path(path, text=None, score=True, return_text=False):
+    """Ekstrak (jika `text` None) lalu nilai rule-based (jika `score`) satu file PDF di proses worker"""
+    start = time.perf_counter()
+    record = {"path": path, "text": None}
+    # Durasi per tahap dan counter dikirim balik ke proses utama (registry METRICS tiap proses terpisah)
+    counters = METRICS.snapshot()["counters"]
+    with profile("batch_document"), METRICS.trace() as timings:
+        try:
+            if text is None:
+                # Path dikirim langsung agar library PDF membuka file tanpa menyalin isinya
+                file_hash = file_content_hash(path) if _worker_evaluator.cache is not None else None
+                text = _worker_evaluator.load_text(path, file_hash)
+                if return_text:
+                    record["text"] = text
+            if score:
+                with METRICS.timer("rule_based"):
+                    record["results"] = _worker_evaluator.fallback_analysis(text)
+            record["status"] = "ok"
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+    record["timings"] = timings
+    record["counters"] = {name: value - counters.get(name, 0)
+                          for name, value in METRICS.snapshot()["counters"].items()
+                          if value != counters.get(name, 0)}
+    record["elapsed"] = time.perf_counter() - start
+    return record
+
+
+def scoring_model(version, results=None):
+    """Model AI yang menghasilkan skor, dari versi scoring job store (None untuk rule-based)"""
+    tier = (results or {}).get("cascade_tier")
+    if tier:
+        return None if tier == RULE_BASED else tier
+    if version and version.startswith("ai:"):
+        # "ai:<model>:<versi prompt>"; nama model bisa mengandung ":" (mis. ":free")
+        return version[len("ai:"):].rsplit(":", 1)[0]
+    return None
+
+
+def collect_pdf_paths(sources):
+    """Kumpulkan path PDF dari daftar file dan/atau direktori"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                paths.extend(os.path.join(root, name) for name in files
+                             if name.lower().endswith(".pdf"))
+        else:
+            paths.append(source)
+    return sorted(paths)
+
+
+class BatchEvaluator:
+    def __init__(self, workers=None, max_in_flight=None, cache_path=None, max_pages=None, max_chars=None,
+                 store_path=None, openrouter_client=None, scheduler=None, retry_failed=False, cascade=None,
+                 dedup=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_path = cache_path
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        # Job store persisten (opsional): run bisa dilanjutkan dan hanya CV terdampak yang dinilai ulang
+        self.store_path = store_path
+        self.retry_failed = retry_failed
+        # Jika ada client, CV dinilai AI lewat scheduler; worker hanya mengekstrak teks
+        self.openrouter_client = openrouter_client
+        self.scheduler = scheduler
+        # Cascade model (opsional) menggantikan satu model untuk semua CV
+        self.cascade = cascade
+        # Index near-duplicate (opsional): hanya satu CV per cluster yang dinilai AI, butuh job store
+        if dedup is not None and store_path is None:
+            raise ValueError("Deduplikasi membutuhkan job store (store_path)")
+        self.dedup = dedup
+        # Batasi jumlah task yang antre agar memori tetap stabil untuk ribuan file
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self.processed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.deduplicated = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        """Jumlah CV per detik pada run terakhir"""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def _is_done(self, document, version, use_ai):
+        """Dokumen tidak perlu diproses lagi pada run ini"""
+        if document["state"] == FAILED:
+            return not self.retry_failed
+        if document["state"] not in SCORED_STATES:
+            return False
+        # Hasil AI yang sudah dibayar tidak ditimpa oleh run rule-based
+        return document["version"] == version or (not use_ai and document["state"] == SCORED_AI)
+
+    def run(self, sources):
+        """Evaluasi semua PDF dan yield hasil per file begitu selesai"""
+        paths = collect_pdf_paths(sources)
+        self.processed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.deduplicated = 0
+        start = time.perf_counter()
+
+        use_ai = self.openrouter_client is not None or self.cascade is not None
+        evaluator = CVEvaluator(self.openrouter_client, max_pages=self.max_pages, max_chars=self.max_chars)
+        fallback_version = evaluator.scoring_version(False)
+        if self.cascade is not None:
+            ai_version = self.cascade.version
+        elif use_ai:
+            ai_version = evaluator.scoring_version(True)
+        else:
+            ai_version = None
+        version = ai_version or fallback_version
+
+        store = JobStore(self.store_path) if self.store_path else None
+        scheduler = self.scheduler
+        if self.openrouter_client is not None and self.cascade is None and scheduler is None:
+            scheduler = RequestScheduler(self.openrouter_client)
+        # Tier cascade dijalankan berurutan per CV, di thread terpisah agar tidak memblokir loop utama
+        cascade_executor = ThreadPoolExecutor(max_workers=self.max_in_flight) if self.cascade else None
+
+        # Kelompokkan path per hash isi: CV duplikat hanya dinilai sekali
+        documents = {}
+        if store is not None:
+            for path, file_hash in store.sync(paths):
+                documents.setdefault(file_hash, []).append(path)
+        else:
+            documents = {path: [path] for path in paths}
+
+        def records(key, **fields):
+            # Dengan job store, key dokumen adalah hash isi PDF
+            identity = {"content_hash": key} if store is not None else {}
+            for path in documents[key]:
+                self.processed += 1
+                if fields["status"] != "ok":
+                    self.failed += 1
+                yield {"path": path, **identity, **fields}
+
+        # Deduplikasi hanya menghemat penilaian AI; rule-based cukup murah untuk setiap CV
+        dedup = self.dedup if use_ai else None
+        waiting = {}     # key representatif -> [(key salinan, kemiripan)] yang menunggu hasilnya
+        linked = []      # (key salinan, key representatif, kemiripan, data dokumen representatif)
+        finished = set()  # key yang sudah selesai dinilai pada run ini
+
+        def link(key, representative, similarity, document):
+            """Tautkan salinan ke hasil representatif (state & versi ikut disalin ke job store)"""
+            self.deduplicated += len(documents[key])
+            METRICS.incr("dedup_linked", len(documents[key]))
+            store.mark_scored(key, document["state"], document["version"], document["results"], document["error"])
+            finished.add(key)
+            duplicate_of = documents[representative][0] if representative in documents else representative
+            fields = {"error": document["error"]} if document["error"] else {}
+            yield from records(key, status="ok", source="duplicate", results=document["results"],
+                               model=scoring_model(document["version"], document["results"]),
+                               duplicate_of=duplicate_of, similarity=round(similarity, 3), elapsed=0.0, **fields)
+
+        def link_waiting(key):
+            if key in waiting:
+                document = store.get(key)
+                for follower, similarity in waiting.pop(key):
+                    yield from link(follower, key, similarity, document)
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(self.cache_path, self.max_pages, self.max_chars)) as executor:
+                # future -> (jenis, key dokumen, teks, error AI)
+                pending = {}
+
+                def submit_ai(key, text, check_duplicate=True):
+                    if dedup is not None and check_duplicate:
+                        cluster, similarity = dedup.add(key, text)
+                        if cluster != key:
+                            representative = store.get(cluster)
+                            if (representative is not None and representative["state"] in SCORED_STATES
+                                    and self._is_done(representative, version, use_ai)):
+                                linked.append((key, cluster, similarity, representative))
+                                return
+                            if cluster in documents and cluster not in finished:
+                                # Representatif sedang atau akan dinilai pada run ini
+                                waiting.setdefault(cluster, []).append((key, similarity))
+                                return
+                    if self.cascade is not None:
+                        future = cascade_executor.submit(self.cascade.evaluate_text, text, "batch")
+                    else:
+                        future = scheduler.submit(text, user="batch", client=self.openrouter_client)
+                    pending[future] = ("ai", key, text, None)
+
+                def submit_worker(key, text=None, score=not use_ai, ai_error=None):
+                    future = executor.submit(_process_path, documents[key][0], text, score,
+                                             store is not None or use_ai)
+                    pending[future] = ("worker", key, text, ai_error)
+
+                queue = iter(documents)
+                while True:
+                    # Isi antrean sampai batas in-flight
+                    while len(pending) < self.max_in_flight:
+                        key = next(queue, None)
+                        if key is None:
+                            break
+                        document = store.get(key) if store is not None else None
+                        if document is not None and self._is_done(document, version, use_ai):
+                            self.skipped += len(documents[key])
+                            finished.add(key)
+                            status = "failed" if document["state"] == FAILED else "ok"
+                            if status == "ok":
+                                result = {"results": document["results"],
+                                          "model": scoring_model(document["version"], document["results"])}
+                            else:
+                                result = {"error": document["error"]}
+                            yield from records(key, status=status, source="store", elapsed=0.0, **result)
+                            continue
+                        text = None
+                        if document is not None and document["text"] and document["text_limits"] == evaluator.text_limits:
+                            text = document["text"]
+                        if text is not None and use_ai:
+                            submit_ai(key, text)
+                        else:
+                            submit_worker(key, text)
+                    while linked:
+                        yield from link(*linked.pop())
+                    if not pending:
+                        if not waiting:
+                            break
+                        # Representatif tidak selesai dinilai (mis. gagal): salinan dinilai sendiri
+                        stranded = [key for followers in waiting.values() for key, _ in followers]
+                        waiting.clear()
+                        for key in stranded:
+                            submit_ai(key, store.get(key)["text"], check_duplicate=False)
+                        continue
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, key, text, ai_error = pending.pop(future)
+                        self.elapsed = time.perf_counter() - start
+
+                        if kind == "ai":
+                            try:
+                                results = future.result()
+                            except Exception as e:
+                                # AI gagal: nilai rule-based, error dicatat agar run berikutnya mencoba AI lagi
+                                submit_worker(key, text, score=True, ai_error=str(e))
+                                continue
+                            if store is not None:
+                                state = SCORED_FALLBACK if results.get("cascade_tier") == RULE_BASED else SCORED_AI
+                                store.mark_scored(key, state, ai_version, results)
+                            source = "cascade" if self.cascade is not None else "ai"
+                            finished.add(key)
+                            yield from records(key, status="ok", source=source, results=results,
+                                               model=scoring_model(ai_version, results), elapsed=0.0)
+                            yield from link_waiting(key)
+                            continue
+
+                        record = future.result()
+                        for stage, seconds in record["timings"].items():
+                            METRICS.observe(stage, seconds)
+                        for name, value in record["counters"].items():
+                            METRICS.incr(name, value)
+                        if record["status"] != "ok":
+                            if store is not None:
+                                store.mark_failed(key, record["error"])
+                            finished.add(key)
+                            yield from records(key, status="failed", error=record["error"],
+                                               elapsed=record["elapsed"])
+                            continue
+                        text = record["text"] or text
+                        if store is not None and record["text"]:
+                            store.mark_extracted(key, text, evaluator.text_limits)
+                        if "results" not in record:
+                            submit_ai(key, text)
+                            continue
+                        if store is not None:
+                            store.mark_scored(key, SCORED_FALLBACK, fallback_version, record["results"], ai_error)
+                        fields = {"error": ai_error} if ai_error else {}
+                        finished.add(key)
+                        yield from records(key, status="ok", source="rule-based", results=record["results"],
+                                           model=None, elapsed=record["elapsed"], **fields)
+                        yield from link_waiting(key)
+        finally:
+            if cascade_executor is not None:
+                cascade_executor.shutdown(cancel_futures=True)
+            if scheduler is not None and self.scheduler is None:
+                scheduler.close()
+            if store is not None:
+                store.close()
+
+        self.elapsed = time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluasi CV massal dengan process pool")
+    parser.add_argument("sources", nargs="+", help="File PDF atau direktori berisi PDF")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument("--cache", default=None, help="Path cache SQLite hasil evaluasi (opsional)")
+    parser.add_argument("--max-pages", type=int, default=None, help="Batas halaman yang diekstrak per CV")
+    parser.add_argument("--max-chars", type=int, default=None, help="Batas karakter yang diekstrak per CV")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Batas CV yang diproses bersamaan")
+    parser.add_argument("--store", default=None,
+                        help="Path job store SQLite agar run bisa dilanjutkan dan dinilai ulang secara inkremental")
+    parser.add_argument("--retry-failed", action="store_true", help="Proses ulang CV yang sebelumnya gagal diekstrak")
+    parser.add_argument("--model", default=None,
+                        help="Model OpenRouter untuk penilaian AI (butuh env OPENROUTER_API_KEY); default rule-based")
+    parser.add_argument("--cascade", action="append", metavar="MODEL[:MIN-MAX[:TOP]]",
+                        help="Tier cascade, urut dari paling murah (mis. rule-based:45-70:80). "
+                             "CV dengan skor di rentang MIN-MAX atau >= TOP dieskalasi ke tier berikutnya")
+    parser.add_argument("--rps", type=float, default=2.0, help="Batas request AI per detik")
+    parser.add_argument("--results", nargs="?", const=DEFAULT_RESULTS_PATH, default=None, metavar="DIR",
+                        help="Simpan hasil per CV ke results store Parquet untuk ranking/filter "
+                             f"(default: {DEFAULT_RESULTS_PATH}, butuh pyarrow)")
+    parser.add_argument("--campaign", default=None, help="Label campaign untuk baris di results store")
+    parser.add_argument("--dedup", nargs="?", const=DEFAULT_DEDUP_PATH, default=None, metavar="PATH",
+                        help="Nilai hanya satu CV per cluster near-duplicate (butuh --store dan AI); "
+                             f"index disimpan di PATH (default: {DEFAULT_DEDUP_PATH})")
+    parser.add_argument("--dedup-threshold", type=float, default=0.8,
+                        help="Estimasi kemiripan Jaccard minimal untuk dianggap duplikat (default 0.8)")
+    parser.add_argument("--output", default="-", help="File output JSON Lines (default: stdout)")
+    parser.add_argument("--metrics", default=None, metavar="PATH",
+                        help="Tambahkan snapshot metrik (timer per tahap, counter) ke file JSON Lines")
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("OPENROUTER_API_KEY")
+    openrouter_client = None
+    if args.model:
+        if not api_key:
+            parser.error("--model membutuhkan environment variable OPENROUTER_API_KEY")
+        openrouter_client = OpenRouterClient(api_key, args.model)
+    scheduler = None
+    cascade = None
+    if args.cascade:
+        tiers = [parse_tier_spec(spec, api_key) for spec in args.cascade]
+        model_tiers = [tier for tier in tiers if tier.client is not None]
+        if model_tiers and not api_key:
+            parser.error("--cascade dengan model AI membutuhkan environment variable OPENROUTER_API_KEY")
+        if model_tiers:
+            scheduler = RequestScheduler(model_tiers[0].client, requests_per_second=args.rps)
+        cascade = ModelCascade(tiers, CVEvaluator(), scheduler=scheduler)
+    elif openrouter_client:
+        scheduler = RequestScheduler(openrouter_client, requests_per_second=args.rps)
+
+    dedup = None
+    if args.dedup:
+        if not args.store:
+            parser.error("--dedup membutuhkan --store")
+        if not (openrouter_client or cascade):
+            parser.error("--dedup hanya berlaku untuk penilaian AI (--model atau --cascade)")
+        dedup = NearDuplicateIndex(args.dedup, threshold=args.dedup_threshold)
+
+    batch = BatchEvaluator(workers=args.workers, max_in_flight=args.max_in_flight, cache_path=args.cache,
+                           max_pages=args.max_pages, max_chars=args.max_chars, store_path=args.store,
+                           openrouter_client=openrouter_client, scheduler=scheduler,
+                           retry_failed=args.retry_failed, cascade=cascade, dedup=dedup)
+    results_store = ResultsStore(args.results) if args.results else None
+    # Hasil yang dilewati dari job store tidak ditulis ulang jika sudah ada di results store,
+    # dan CV yang sama di beberapa path hanya ditulis sekali per run
+    stored_hashes = results_store.content_hashes(args.campaign) if results_store is not None else set()
+    appended = set()
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for record in batch.run(args.sources):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            if results_store is not None and record.get("results"):
+                content_hash = record.get("content_hash") or file_content_hash(record["path"])
+                if content_hash in appended or (record["source"] == "store" and content_hash in stored_hashes):
+                    continue
+                results_store.append(record["results"], content_hash, name=os.path.basename(record["path"]),
+                                     campaign=args.campaign, source=record["source"], model=record.get("model"))
+                appended.add(content_hash)
+    finally:
+        if results_store is not None:
+            results_store.close()
+        if output is not sys.stdout:
+            output.close()
+        if scheduler is not None:
+            scheduler.close()
+        if dedup is not None:
+            dedup.close()
+
+    print(
+        f"Selesai: {batch.processed} CV ({batch.failed} gagal, {batch.skipped} sudah dinilai sebelumnya, "
+        f"{batch.deduplicated} ditautkan ke CV near-duplicate) "
+        f"dalam {batch.elapsed:.2f} detik "
+        f"- {batch.throughput:.1f} CV/detik dengan {batch.workers} worker",
+        file=sys.stderr,
+    )
+    if args.metrics:
+        METRICS.write_jsonl(args.metrics, processed=batch.processed, failed=batch.failed, skipped=batch.skipped,
+                            deduplicated=batch.deduplicated, elapsed=batch.elapsed, throughput=batch.throughput, workers=batch.workers)
+    if cascade is not None:
+        for tier in cascade.report():
+            cost = "n/a" if tier["estimated_cost"] is None else f"${tier['estimated_cost']:.4f}"
+            print(
+                f"  Tier {tier['tier']}: {tier['calls']} call ({tier['failures']} gagal, "
+                f"{tier['escalated']} dieskalasi), latensi rata-rata {tier['avg_latency']:.2f} detik, "
+                f"~{tier['estimated_tokens']} token, estimasi biaya {cost}",
+                file=sys.stderr,
+            )
+    return 0 if batch.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Benchmark backend ekstraksi PDF: halaman/detik, peak RSS, dan yield teks.
+
+Setiap backend dijalankan di subprocess terpisah agar peak RSS terukur sendiri.
+
+    python -m benchmarks.bench_extractors --documents 5 --pages 1 5 20
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import extractors
+from benchmarks.corpus import generate_corpus
+
+
+def _peak_rss_mb():
+    # ru_maxrss dalam kilobytes di Linux, bytes di macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_backend(backend, corpus):
+    """Ekstrak seluruh korpus dengan satu backend (dijalankan di dalam subprocess)"""
+    extractor = extractors.EXTRACTORS[backend]
+    baseline_rss = _peak_rss_mb()
+    pages = 0
+    extracted_chars = 0
+    failures = 0
+    start = time.perf_counter()
+    for path, _, _ in corpus:
+        try:
+            for page_text in extractor.iter_pages(path):
+                pages += 1
+                extracted_chars += len("".join(page_text.split()))
+        except Exception:
+            failures += 1
+    elapsed = time.perf_counter() - start
+    expected_chars = sum(chars for _, _, chars in corpus)
+    return {
+        "backend": backend,
+        "pages": pages,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        # Kenaikan peak RSS selama ekstraksi (di atas memori setelah import library)
+        "extraction_rss_mb": round(_peak_rss_mb() - baseline_rss, 1),
+        "text_yield": round(extracted_chars / expected_chars, 3) if expected_chars else 0.0,
+        "failures": failures,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark backend ekstraksi PDF")
+    parser.add_argument("--documents", type=int, default=5, help="Jumlah dokumen per ukuran halaman")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20], help="Ukuran dokumen (halaman)")
+    parser.add_argument("--backends", nargs="+", default=None, help="Backend yang diuji (default: semua)")
+    parser.add_argument("--corpus-dir", default=None, help="Direktori korpus (default: direktori sementara)")
+    parser.add_argument("--output", default=None, help="Simpan hasil sebagai JSON")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        corpus = json.loads(sys.stdin.read())
+        print(json.dumps(run_backend(args.worker, corpus)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = generate_corpus(args.corpus_dir or tmp_dir, args.pages, args.documents)
+        backends = args.backends or [extractor.name for extractor in extractors.available_extractors()]
+
+        results = []
+        for backend in backends:
+            process = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_extractors", "--worker", backend],
+                input=json.dumps(corpus), capture_output=True, text=True, check=True,
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            )
+            results.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    total_pages = sum(pages for _, pages, _ in corpus)
+    print(f"Korpus: {len(corpus)} dokumen, {total_pages} halaman")
+    print(f"{'backend':<12}{'pages/sec':>12}{'peak RSS MB':>14}{'+RSS MB':>10}{'text yield':>12}{'failures':>10}")
+    for result in sorted(results, key=lambda r: -r["pages_per_sec"]):
+        print(f"{result['backend']:<12}{result['pages_per_sec']:>12}{result['peak_rss_mb']:>14}"
+              f"{result['extraction_rss_mb']:>10}{result['text_yield']:>12}{result['failures']:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"corpus_documents": len(corpus), "corpus_pages": total_pages, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""Benchmark pipeline evaluasi CV: durasi per tahap, throughput, latensi p50/p99, dan peak memori.
+
+Korpus CV sintetis (Indonesia/Inggris, 1-20 halaman) dibuat lokal. Mode `rule-based`
+mengukur ekstraksi dan scoring tanpa AI; mode `ai` mengirim CV ke server tiruan
+OpenRouter (mock_openrouter.py) dengan latensi yang bisa diatur. Durasi per tahap
+diambil dari `Evaluation.timings` (lihat metrics.py).
+
+Hasil dibandingkan dengan baseline tersimpan; metrik yang memburuk melebihi toleransi
+ditandai sebagai regresi dan exit code menjadi 1.
+
+    python -m benchmarks.bench_pipeline                         # bandingkan dengan baseline
+    python -m benchmarks.bench_pipeline --update-baseline       # simpan hasil sebagai baseline
+    python -m benchmarks.bench_pipeline --modes ai --ai-latency 0.5 --concurrency 8 --stream
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import LANGUAGES, generate_cv_corpus
+from benchmarks.mock_openrouter import MockOpenRouter
+from evaluator import CVEvaluator, OpenRouterClient
+
+DEFAULT_BASELINE = os.path.join(".cache", "bench_pipeline_baseline.json")
+MODES = ("rule-based", "ai")
+# Tahap yang total durasinya lebih kecil dari ini (detik) tidak dibandingkan karena didominasi noise
+MIN_STAGE_SECONDS = 0.005
+
+
+def _peak_rss_mb():
+    # ru_maxrss dalam kilobytes di Linux, bytes di macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, q):
+    """Persentil `q` (0-100) dengan metode nearest-rank"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p99": percentile(values, 99),
+        "max": max(values, default=0.0),
+    }
+
+
+def build_evaluator(mode, mock=None):
+    client = None
+    if mode == "ai":
+        client = OpenRouterClient("benchmark", "openai/gpt-4o-mini", base_url=mock.url)
+    # Tanpa cache dan OCR: setiap CV melewati seluruh tahap
+    return CVEvaluator(client, ocr=False)
+
+
+def run_mode(mode, corpus, repeat=1, concurrency=1, stream=False, mock=None):
+    """Evaluasi seluruh korpus `repeat` kali. Return ringkasan throughput, latensi, dan durasi per tahap"""
+    evaluator = build_evaluator(mode, mock)
+    on_update = (lambda fields: None) if stream else None
+    # Warm-up: index n-gram aturan scoring dan koneksi HTTP dibuat di luar pengukuran
+    evaluator.evaluate(corpus[0]["path"], "benchmark", on_update)
+
+    def evaluate(item):
+        index, document = item
+        start = time.perf_counter()
+        evaluation = evaluator.evaluate(document["path"], "benchmark", on_update)
+        return index, document, time.perf_counter() - start, evaluation
+
+    documents = [(index, document) for _ in range(repeat) for index, document in enumerate(corpus)]
+    latencies, stages, by_pages, failures = [], {}, {}, 0
+    # Durasi tercepat per (dokumen, tahap) dari semua putaran: pembanding baseline yang stabil
+    best = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, document, latency, evaluation in executor.map(evaluate, documents):
+            if evaluation.results is None or evaluation.source != ("ai" if mode == "ai" else "rule-based"):
+                failures += 1
+            latencies.append(latency)
+            by_pages.setdefault(document["pages"], []).append(latency)
+            for stage, seconds in evaluation.timings.items():
+                stages.setdefault(stage, []).append(seconds)
+                best[index, stage] = min(seconds, best.get((index, stage), seconds))
+    elapsed = time.perf_counter() - start
+
+    pages = sum(document["pages"] for _, document in documents)
+    return {
+        "documents": len(documents),
+        "failures": failures,
+        "seconds": elapsed,
+        "docs_per_sec": len(documents) / elapsed,
+        "pages_per_sec": pages / elapsed,
+        "latency": summarize(latencies),
+        "latency_by_pages": {str(size): percentile(values, 50) for size, values in sorted(by_pages.items())},
+        "stages": {
+            stage: dict(summarize(values), best_total=sum(seconds for (_, name), seconds in best.items()
+                                                          if name == stage))
+            for stage, values in sorted(stages.items())
+        },
+        "peak_memory_mb": measure_memory(evaluator, corpus, on_update),
+    }
+
+
+def measure_memory(evaluator, corpus, on_update=None):
+    """Peak alokasi Python (tracemalloc) saat mengevaluasi satu CV, maksimum atas seluruh korpus (MB)"""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    peak = 0
+    try:
+        for document in corpus:
+            tracemalloc.reset_peak()
+            evaluator.evaluate(document["path"], "benchmark", on_update)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        if started:
+            tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def compare(current, baseline, tolerance=0.2, min_stage_seconds=MIN_STAGE_SECONDS):
+    """Bandingkan hasil dengan baseline. Return list (mode, metrik, baseline, sekarang, perubahan relatif) yang memburuk"""
+    regressions = []
+
+    def check(mode, metric, old, new, higher_is_worse=True, tolerance=tolerance):
+        if not old:
+            return
+        change = (new - old) / old
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append((mode, metric, old, new, change))
+
+    for mode, result in current["modes"].items():
+        old = baseline["modes"].get(mode)
+        if old is None:
+            continue
+        check(mode, "docs_per_sec", old["docs_per_sec"], result["docs_per_sec"], higher_is_worse=False)
+        check(mode, "latency.p50", old["latency"]["p50"], result["latency"]["p50"])
+        # p99 dari puluhan sampel jauh lebih bising daripada p50, sehingga toleransinya dilonggarkan
+        check(mode, "latency.p99", old["latency"]["p99"], result["latency"]["p99"], tolerance=tolerance * 2)
+        check(mode, "peak_memory_mb", old["peak_memory_mb"], result["peak_memory_mb"])
+        for stage, summary in result["stages"].items():
+            old_stage = old["stages"].get(stage)
+            if old_stage and old_stage["best_total"] >= min_stage_seconds:
+                check(mode, f"stage.{stage}.best_total", old_stage["best_total"], summary["best_total"])
+    return regressions
+
+
+def print_report(results):
+    config = results["config"]
+    print(f"Korpus: {config['documents']} CV ({', '.join(config['languages'])}; "
+          f"{', '.join(str(pages) for pages in config['pages'])} halaman) x {config['repeat']} putaran, "
+          f"concurrency {config['concurrency']}")
+    for mode, result in results["modes"].items():
+        latency = result["latency"]
+        print(f"\n[{mode}] {result['docs_per_sec']:.1f} CV/detik, {result['pages_per_sec']:.1f} halaman/detik, "
+              f"latensi p50 {latency['p50'] * 1000:.1f} ms / p99 {latency['p99'] * 1000:.1f} ms, "
+              f"peak memori {result['peak_memory_mb']:.1f} MB, {result['failures']} gagal")
+        print("  Latensi p50 per ukuran: " + ", ".join(
+            f"{pages} hlm {seconds * 1000:.1f} ms" for pages, seconds in result["latency_by_pages"].items()))
+        print(f"  {'tahap':<22}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'n':>6}")
+        for stage, summary in result["stages"].items():
+            print(f"  {stage:<22}{summary['p50'] * 1000:>10.2f}{summary['p99'] * 1000:>10.2f}"
+                  f"{summary['mean'] * 1000:>10.2f}{summary['count']:>6}")
+    print(f"\nPeak RSS proses: {results['peak_rss_mb']:.1f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline evaluasi CV")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5, 10, 20], help="Ukuran CV (halaman)")
+    parser.add_argument("--languages", nargs="+", choices=LANGUAGES, default=list(LANGUAGES))
+    parser.add_argument("--documents", type=int, default=3, help="Jumlah CV per bahasa per ukuran")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah putaran atas korpus")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jumlah evaluasi bersamaan")
+    parser.add_argument("--ai-latency", type=float, default=0.05, help="Latensi token pertama mock OpenRouter (detik)")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0, help="Laju token mock OpenRouter")
+    parser.add_argument("--stream", action="store_true", help="Mode AI memakai response streaming")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", default=None, help="Direktori korpus (default: direktori sementara)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="File baseline JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="Simpan hasil run ini sebagai baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Perubahan relatif yang dianggap regresi (default 0.2 = 20%%)")
+    parser.add_argument("--output", default=None, help="Simpan hasil run ini sebagai JSON")
+    args = parser.parse_args(argv)
+
+    config = {
+        "pages": args.pages, "languages": args.languages, "documents": 0, "repeat": args.repeat,
+        "concurrency": args.concurrency, "ai_latency": args.ai_latency,
+        "tokens_per_second": args.tokens_per_second, "stream": args.stream, "seed": args.seed,
+    }
+    results = {"config": config, "python": platform.python_version(), "timestamp": time.time(), "modes": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = generate_cv_corpus(args.corpus_dir or tmp_dir, args.pages, args.languages, args.documents, args.seed)
+        config["documents"] = len(corpus)
+        for mode in args.modes:
+            if mode == "ai":
+                with MockOpenRouter(latency=args.ai_latency, tokens_per_second=args.tokens_per_second,
+                                    seed=args.seed) as mock:
+                    results["modes"][mode] = run_mode(mode, corpus, args.repeat, args.concurrency, args.stream, mock)
+            else:
+                results["modes"][mode] = run_mode(mode, corpus, args.repeat, args.concurrency)
+    results["peak_rss_mb"] = _peak_rss_mb()
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            print(f"\nKonfigurasi berbeda dengan baseline {args.baseline}; perbandingan dilewati "
+                  f"(jalankan dengan --update-baseline untuk baseline baru)")
+        else:
+            regressions = compare(results, baseline, args.tolerance)
+            print(f"\nDibandingkan dengan baseline {args.baseline} (toleransi {args.tolerance:.0%}): "
+                  f"{len(regressions)} regresi")
+            for mode, metric, old, new, change in regressions:
+                print(f"  REGRESI [{mode}] {metric}: {old:.4g} -> {new:.4g} ({change:+.0%})")
+            status = 1 if regressions else 0
+    else:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline disimpan ke {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Server tiruan OpenRouter (chat completions) untuk benchmark dan uji lokal.
+
+Mendukung response biasa dan streaming server-sent events (`"stream": true`),
+dengan latensi token pertama, laju token, dan error sementara yang bisa diatur.
+
+    python -m benchmarks.mock_openrouter --port 8787 --latency 0.5 --tokens-per-second 80
+    # lalu arahkan OpenRouterClient(base_url="http://127.0.0.1:8787/v1/chat/completions")
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from prompt_budget import CHARS_PER_TOKEN
+
+
+def sample_analysis(prompt):
+    """Hasil analisis yang deterministik terhadap isi prompt"""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    sections = {name: rng.randint(10, 25) for name in ("structure", "experience", "skills", "branding")}
+    return {
+        "overall_score": sum(sections.values()),
+        "section_scores": sections,
+        "strengths": ["Pengalaman relevan dengan deskripsi yang jelas", "Skills teknis lengkap"],
+        "weaknesses": ["Pencapaian belum dikuantifikasi", "Ringkasan profil terlalu singkat"],
+        "suggestions": [
+            "Tambahkan angka pada setiap pencapaian",
+            "Sertakan link portfolio atau LinkedIn",
+            "Urutkan pengalaman dari yang terbaru",
+        ],
+        "job_roles": [
+            {"role": "Data Analyst", "match_percentage": rng.randint(60, 95), "reason": "Skills analitik kuat"},
+            {"role": "Business Analyst", "match_percentage": rng.randint(50, 85), "reason": "Pengalaman stakeholder"},
+        ],
+        "detected_skills": ["Python", "SQL", "Excel", "Tableau"],
+    }
+
+
+class MockOpenRouter:
+    """Server tiruan di thread background. Dipakai sebagai context manager; `url` berisi endpoint"""
+
+    def __init__(self, latency=0.2, tokens_per_second=200.0, error_rate=0.0, chunk_tokens=4,
+                 host="127.0.0.1", port=0, seed=0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.chunk_tokens = chunk_tokens
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            return self._rng.random() < self.error_rate
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type="application/json", headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if mock._should_fail():
+                    time.sleep(mock.latency / 2)
+                    self._send(503, json.dumps({"error": {"code": 503, "message": "Provider overloaded"}}),
+                               headers={"Retry-After": "0.1"})
+                    return
+
+                prompt = payload["messages"][-1]["content"]
+                content = json.dumps(sample_analysis(prompt), ensure_ascii=False, indent=2)
+                time.sleep(mock.latency)
+                if payload.get("stream"):
+                    self._stream(content)
+                    return
+                time.sleep(len(content) / CHARS_PER_TOKEN / mock.tokens_per_second)
+                self._send(200, json.dumps({"choices": [{"message": {"role": "assistant", "content": content}}]}))
+
+            def _stream(self, content):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                step = mock.chunk_tokens * CHARS_PER_TOKEN
+                for start in range(0, len(content), step):
+                    delta = {"choices": [{"delta": {"content": content[start:start + step]}}]}
+                    self._write_chunk(f"data: {json.dumps(delta, ensure_ascii=False)}\n\n")
+                    time.sleep(mock.chunk_tokens / mock.tokens_per_second)
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server tiruan OpenRouter untuk uji lokal")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.5, help="Detik sebelum token pertama")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proporsi request yang dibalas 503")
+    args = parser.parse_args(argv)
+
+    mock = MockOpenRouter(args.latency, args.tokens_per_second, args.error_rate, host=args.host, port=args.port)
+    print(f"Mock OpenRouter di {mock.url}")
+    try:
+        mock._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
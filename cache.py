@@ -0,0 +1,189 @@
+"""Cache hasil evaluasi berbasis hash konten, disimpan di SQLite lokal.
+
+Cache dapat dipakai bersama oleh beberapa proses (mode WAL) dan tetap ada
+setelah aplikasi di-restart. Nilai disimpan sebagai JSON.
+
+Pembacaan tidak menulis ke database: waktu akses (untuk LRU) dan counter
+hit/miss ditampung di memori lalu ditulis dalam satu transaksi paling lama
+setiap `flush_interval` detik (dan saat put, stats, atau close).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import METRICS
+
+DEFAULT_CACHE_PATH = os.environ.get("CV_EVAL_CACHE", os.path.join(".cache", "cv_evaluator.sqlite3"))
+
+
+def content_hash(data):
+    """SHA-256 dari bytes file (kunci content-addressed)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_content_hash(source, chunk_size=1024 * 1024):
+    """SHA-256 dari path file atau file-like object, dibaca per chunk tanpa menyalin seluruh isi"""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    elif hasattr(source, "getbuffer"):
+        digest.update(source.getbuffer())
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            digest.update(chunk)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=256 * 1024 * 1024, ttl=7 * 24 * 3600,
+                 flush_interval=5.0, expire_interval=60.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.expire_interval = expire_interval
+        self._lock = threading.Lock()
+        # Update yang belum ditulis: key -> waktu akses terakhir, dan selisih counter stats
+        self._pending_access = {}
+        self._pending_stats = {"hits": 0, "misses": 0}
+        self._last_flush = time.monotonic()
+        self._last_expire = float("-inf")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_created ON entries (created_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0)")
+        # Perkiraan total ukuran entri; SUM(size) hanya dihitung ulang jika perkiraan melewati batas.
+        # Entri yang ditulis proses lain ikut terhitung saat pembersihan entri kedaluwarsa berkala.
+        self._approx_bytes = self._total_bytes()
+
+    def get(self, key):
+        """Ambil nilai dari cache, atau None jika tidak ada / sudah kedaluwarsa"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+
+            # Counter per jenis kunci (text, result, ocr) untuk proses ini; tabel stats untuk total
+            kind = key.split(":", 1)[0]
+            if row is None:
+                self._pending_stats["misses"] += 1
+                METRICS.incr(f"cache_{kind}_misses")
+            else:
+                self._pending_access[key] = now
+                self._pending_stats["hits"] += 1
+                METRICS.incr(f"cache_{kind}_hits")
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key, value):
+        """Simpan nilai (harus bisa di-serialize ke JSON) lalu evict entri LRU jika melebihi batas"""
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now)
+            )
+            self._pending_access.pop(key, None)
+            self._approx_bytes += len(data)
+            self._evict()
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        """Tulis waktu akses dan counter hit/miss yang masih ditampung"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending_access and not any(self._pending_stats.values()):
+            return
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                "UPDATE entries SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+            )
+            self._conn.executemany(
+                "UPDATE stats SET value = value + ? WHERE name = ?",
+                [(count, name) for name, count in self._pending_stats.items() if count]
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._pending_access.clear()
+        self._pending_stats = dict.fromkeys(self._pending_stats, 0)
+
+    def _total_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        """Hapus entri kedaluwarsa (berkala), lalu entri yang paling lama tidak diakses sampai ukuran di bawah batas"""
+        now = time.monotonic()
+        if self.ttl and now - self._last_expire >= self.expire_interval:
+            self._last_expire = now
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl,))
+            self._approx_bytes = self._total_bytes()
+        if self._approx_bytes <= self.max_bytes:
+            return
+        # Waktu akses yang masih ditampung ditulis dulu agar urutan LRU akurat
+        self._flush()
+        total = self._total_bytes()
+        if total > self.max_bytes:
+            for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self._approx_bytes = total
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("UPDATE stats SET value = 0")
+            self._pending_access.clear()
+            self._pending_stats = dict.fromkeys(self._pending_stats, 0)
+            self._approx_bytes = 0
+
+    def stats(self):
+        """Statistik cache: hits, misses, jumlah entri, dan total ukuran (bytes)"""
+        with self._lock:
+            self._flush()
+            counters = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"hits": counters["hits"], "misses": counters["misses"], "entries": entries, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
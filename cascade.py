@@ -0,0 +1,147 @@
+"""Cascade model untuk screening massal: tier murah menilai semua CV, tier mahal hanya sebagian.
+
+Setiap tier menilai CV lalu memutuskan apakah CV dieskalasi ke tier berikutnya:
+CV dengan skor di rentang borderline (`borderline`) atau di atas ambang kandidat
+teratas (`top`) dinilai ulang oleh model yang lebih baik. Tier pertama bisa berupa
+analisis rule-based (tanpa biaya) atau model budget.
+
+Spesifikasi tier untuk CLI: "model[:min-max[:top]]", mis.
+    rule-based:45-70:80  meta-llama/llama-3.1-8b-instruct:55-75:85  anthropic/claude-3.5-sonnet
+"""
+import json
+import threading
+import time
+
+from evaluator import OpenRouterClient
+from prompt_budget import estimate_tokens
+
+RULE_BASED = "rule-based"
+
+
+class CascadeTier:
+    def __init__(self, name, client=None, borderline=None, top=None):
+        self.name = name
+        self.client = client          # None = analisis rule-based
+        self.borderline = borderline  # (min, max) skor yang dieskalasi
+        self.top = top                # skor minimal kandidat teratas yang dieskalasi
+
+    def should_escalate(self, score):
+        if self.borderline and self.borderline[0] <= score <= self.borderline[1]:
+            return True
+        return self.top is not None and score >= self.top
+
+    @property
+    def price_per_million(self):
+        """Harga per 1M token dari model_info (0 untuk rule-based, None jika tidak diketahui)"""
+        if self.client is None:
+            return 0.0
+        cost = self.client.model_info.get(self.client.model, {}).get("cost")
+        try:
+            return float(cost.lstrip("$"))
+        except (AttributeError, ValueError):
+            return None
+
+
+def parse_tier_spec(spec, api_key=None):
+    """Buat CascadeTier dari string "model[:min-max[:top]]" """
+    parts = spec.split(":")
+    name = parts[0]
+    borderline = None
+    if len(parts) > 1 and parts[1]:
+        low, high = parts[1].split("-")
+        borderline = (float(low), float(high))
+    top = float(parts[2]) if len(parts) > 2 and parts[2] else None
+    client = None if name == RULE_BASED else OpenRouterClient(api_key, name)
+    return CascadeTier(name, client, borderline, top)
+
+
+class _TierStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.escalated = 0
+        self.latency = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+class ModelCascade:
+    def __init__(self, tiers, evaluator, scheduler=None):
+        if not tiers:
+            raise ValueError("Cascade membutuhkan minimal satu tier")
+        self.tiers = tiers
+        # Evaluator dipakai untuk analisis rule-based dan versi aturan scoring
+        self.evaluator = evaluator
+        self.scheduler = scheduler
+        self._stats = {tier.name: _TierStats() for tier in tiers}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        """Versi scoring cascade: susunan tier + ambang + versi prompt & aturan"""
+        tiers = ",".join(f"{tier.name}:{tier.borderline}:{tier.top}" for tier in self.tiers)
+        return f"cascade:{tiers}:{OpenRouterClient.PROMPT_VERSION}:{self.evaluator.rules_version}"
+
+    def _score(self, tier, text, user):
+        if tier.client is None:
+            return self.evaluator.fallback_analysis(text)
+        if self.scheduler is not None:
+            return self.scheduler.analyze(text, user=user, client=tier.client)
+        return tier.client.analyze_cv_with_ai(text)
+
+    def evaluate_text(self, text, user="default"):
+        """Nilai teks CV melalui tier-tier cascade. Return hasil dari tier tertinggi yang berhasil.
+
+        Raise exception dari tier pertama jika tier tersebut gagal; kegagalan tier
+        berikutnya hanya dicatat dan hasil tier sebelumnya dipakai.
+        """
+        results = None
+        for index, tier in enumerate(self.tiers):
+            stats = self._stats[tier.name]
+            start = time.perf_counter()
+            try:
+                tier_results = self._score(tier, text, user)
+            except Exception:
+                with self._lock:
+                    stats.calls += 1
+                    stats.failures += 1
+                    stats.latency += time.perf_counter() - start
+                if results is None:
+                    raise
+                break
+
+            with self._lock:
+                stats.calls += 1
+                stats.latency += time.perf_counter() - start
+                if tier.client is not None:
+                    prompt = tier.client._build_payload(text)["messages"][0]["content"]
+                    stats.prompt_tokens += estimate_tokens(prompt)
+                    stats.completion_tokens += estimate_tokens(json.dumps(tier_results, ensure_ascii=False))
+            results = dict(tier_results, cascade_tier=tier.name)
+
+            is_last = index == len(self.tiers) - 1
+            if is_last or not tier.should_escalate(results["overall_score"]):
+                break
+            with self._lock:
+                stats.escalated += 1
+        return results
+
+    def report(self):
+        """Statistik per tier: jumlah call, gagal, eskalasi, latensi rata-rata, token & estimasi biaya (USD)"""
+        report = []
+        with self._lock:
+            for tier in self.tiers:
+                stats = self._stats[tier.name]
+                price = tier.price_per_million
+                tokens = stats.prompt_tokens + stats.completion_tokens
+                report.append({
+                    "tier": tier.name,
+                    "calls": stats.calls,
+                    "failures": stats.failures,
+                    "escalated": stats.escalated,
+                    "avg_latency": stats.latency / stats.calls if stats.calls else 0.0,
+                    "total_latency": stats.latency,
+                    "estimated_tokens": tokens,
+                    "estimated_cost": None if price is None else tokens * price / 1_000_000,
+                })
+        return report
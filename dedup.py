@@ -0,0 +1,200 @@
+"""Deteksi CV near-duplicate (MinHash + LSH) agar salinan CV yang sedikit diedit tidak dinilai ulang.
+
+Teks CV (hasil ekstraksi) dipecah menjadi shingle beberapa kata, lalu diringkas
+menjadi signature MinHash berukuran tetap. Signature dibagi menjadi beberapa band;
+CV yang salah satu band-nya identik menjadi kandidat, dan kandidat dengan estimasi
+kemiripan Jaccard di atas `threshold` dianggap satu cluster. CV pertama dalam
+cluster menjadi representatif yang dinilai; CV lain ditautkan ke hasilnya.
+
+Index disimpan di SQLite (default `.cache/dedup.sqlite3`, env CV_EVAL_DEDUP), sehingga
+memori tetap kecil untuk ratusan ribu CV, CV baru bisa ditambahkan bertahap, dan
+cluster tetap sama antar run.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+DEFAULT_DEDUP_PATH = os.environ.get("CV_EVAL_DEDUP", os.path.join(".cache", "dedup.sqlite3"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+# Shingle diproses per blok agar memori sementara tetap kecil untuk CV panjang
+_CHUNK = 4096
+# Batas kandidat per query (bucket yang sangat padat, mis. CV hampir kosong)
+_MAX_CANDIDATES = 1000
+
+
+def shingle_hashes(text, size=3):
+    """Hash 32-bit dari setiap shingle `size` kata berurutan (teks dinormalisasi ke lowercase)"""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    if len(words) < size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+         for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+
+
+class NearDuplicateIndex:
+    def __init__(self, path=DEFAULT_DEDUP_PATH, threshold=0.8, num_perm=128, bands=16, shingle_size=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm harus habis dibagi bands")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Permutasi (a * x + b) mod p; a, b < 2^32 sehingga perkalian tidak overflow di uint64
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                doc_id TEXT PRIMARY KEY,
+                cluster TEXT NOT NULL,
+                similarity REAL NOT NULL,
+                signature BLOB
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_signatures_cluster ON signatures (cluster)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS bands (
+                bucket INTEGER NOT NULL,
+                doc_id TEXT NOT NULL,
+                PRIMARY KEY (bucket, doc_id)
+            ) WITHOUT ROWID
+        """)
+        self._check_params({"num_perm": num_perm, "bands": bands, "shingle_size": shingle_size, "seed": seed})
+
+    def _check_params(self, params):
+        """Signature hanya sebanding jika dibuat dengan parameter yang sama"""
+        stored = dict(self._conn.execute("SELECT name, value FROM meta").fetchall())
+        if not stored:
+            self._conn.executemany("INSERT INTO meta (name, value) VALUES (?, ?)",
+                                   [(name, str(value)) for name, value in params.items()])
+            return
+        if stored != {name: str(value) for name, value in params.items()}:
+            raise ValueError(f"Index dedup {self.path} dibuat dengan parameter berbeda ({stored}); "
+                             f"hapus file tersebut untuk membangun ulang")
+
+    def signature(self, text):
+        """Signature MinHash (uint32 sebanyak num_perm), atau None jika teks tidak punya kata"""
+        hashes = shingle_hashes(text, self.shingle_size)
+        if not len(hashes):
+            return None
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(hashes), _CHUNK):
+            chunk = hashes[start:start + _CHUNK]
+            permuted = (self._a[:, None] * chunk[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+            np.minimum(signature, (permuted & _MAX_HASH).min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+    def _buckets(self, signature):
+        """Satu key bucket per band (hash 64-bit dari nomor band + isi band)"""
+        buckets = []
+        for band in range(self.bands):
+            data = band.to_bytes(2, "little") + signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            buckets.append(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little", signed=True))
+        return buckets
+
+    def _candidates(self, signature, buckets, exclude=None):
+        """(doc_id, cluster, estimasi kemiripan) untuk CV yang berbagi minimal satu band"""
+        placeholders = ",".join("?" * len(buckets))
+        rows = self._conn.execute(
+            f"SELECT s.doc_id, s.cluster, s.signature FROM signatures s WHERE s.doc_id IN "
+            f"(SELECT DISTINCT doc_id FROM bands WHERE bucket IN ({placeholders}) LIMIT {_MAX_CANDIDATES})",
+            buckets
+        ).fetchall()
+        return [
+            (doc_id, cluster, float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature)))
+            for doc_id, cluster, blob in rows if doc_id != exclude
+        ]
+
+    def query(self, text):
+        """CV terindeks yang mirip dengan `text`: list (doc_id, cluster, kemiripan) di atas threshold"""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        with self._lock:
+            candidates = self._candidates(signature, self._buckets(signature))
+        matches = [candidate for candidate in candidates if candidate[2] >= self.threshold]
+        return sorted(matches, key=lambda match: -match[2])
+
+    def add(self, doc_id, text):
+        """Tambahkan CV ke index. Return (cluster, kemiripan dengan CV yang paling mirip).
+
+        `cluster` adalah doc_id representatif; sama dengan `doc_id` jika tidak ada
+        CV lain yang cukup mirip. CV yang sudah terindeks mengembalikan cluster lamanya.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT cluster, similarity FROM signatures WHERE doc_id = ?",
+                                     (doc_id,)).fetchone()
+            if row is not None:
+                return row[0], row[1]
+
+            signature = self.signature(text)
+            if signature is None:
+                self._conn.execute("INSERT INTO signatures (doc_id, cluster, similarity) VALUES (?, ?, 1.0)",
+                                   (doc_id, doc_id))
+                return doc_id, 1.0
+
+            buckets = self._buckets(signature)
+            cluster, similarity = doc_id, 1.0
+            best = max(self._candidates(signature, buckets, exclude=doc_id), key=lambda c: c[2], default=None)
+            if best is not None and best[2] >= self.threshold:
+                cluster, similarity = best[1], best[2]
+
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO signatures (doc_id, cluster, similarity, signature) VALUES (?, ?, ?, ?)",
+                    (doc_id, cluster, similarity, signature.tobytes())
+                )
+                self._conn.executemany("INSERT OR IGNORE INTO bands (bucket, doc_id) VALUES (?, ?)",
+                                       [(bucket, doc_id) for bucket in buckets])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cluster, similarity
+
+    def cluster_of(self, doc_id):
+        with self._lock:
+            row = self._conn.execute("SELECT cluster FROM signatures WHERE doc_id = ?", (doc_id,)).fetchone()
+        return row[0] if row else None
+
+    def members(self, cluster):
+        """doc_id anggota cluster (termasuk representatif)"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT doc_id FROM signatures WHERE cluster = ? ORDER BY doc_id", (cluster,))]
+
+    def stats(self):
+        """Jumlah CV terindeks dan jumlah cluster"""
+        with self._lock:
+            documents, clusters = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT cluster) FROM signatures").fetchone()
+        return {"documents": documents, "clusters": clusters}
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,17 @@
+"""Exception yang dipakai bersama oleh client OpenRouter dan modul-modul pemrosesan."""
+
+
+class OpenRouterError(Exception):
+    """Error dari OpenRouter API (HTTP error, timeout, atau koneksi gagal)"""
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        # Detik tunggu yang diminta server lewat header Retry-After (jika ada)
+        self.retry_after = retry_after
+
+
+class ResponseParseError(OpenRouterError):
+    """Response AI tidak berisi JSON valid sesuai skema hasil, juga setelah diminta perbaikan"""
+    def __init__(self, message, raw_response=None):
+        super().__init__(message)
+        self.raw_response = raw_response
@@ -0,0 +1,540 @@
+"""Logika evaluasi CV tanpa UI: client OpenRouter dan evaluator rule-based/AI.
+
+Modul ini tidak bergantung pada Streamlit sehingga bisa dipakai dari CLI batch,
+service HTTP, maupun pipeline lain. Error dilaporkan lewat exception atau lewat
+objek `Evaluation`, bukan ditampilkan langsung.
+"""
+import json
+import os
+import re
+import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import extractors
+from cache import file_content_hash
+from errors import OpenRouterError, ResponseParseError
+from metrics import METRICS, profile
+from ocr import PageOCR, ocr_available
+from prompt_budget import compress_cv, estimate_tokens
+from response_parser import PartialJSONParser, normalize_field, parse_analysis
+from scoring_rules import load_rules
+from taxonomy import load_taxonomy
+
+# Batas ekstraksi default untuk upload interaktif (UI dan service HTTP); 0 = tanpa batas.
+# Batch memakai --max-pages/--max-chars.
+INTERACTIVE_MAX_PAGES = int(os.environ.get("CV_EVAL_MAX_PAGES", 10)) or None
+INTERACTIVE_MAX_CHARS = int(os.environ.get("CV_EVAL_MAX_CHARS", 50000)) or None
+
+
+def _parse_retry_after(value):
+    """Header Retry-After (detik atau HTTP-date) -> detik, None jika tidak ada/tidak valid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+class OpenRouterClient:
+    # Naikkan jika isi prompt berubah agar hasil lama di cache tidak dipakai lagi
+    PROMPT_VERSION = "3"
+
+    # Budget token teks CV untuk model yang tidak ada di model_info
+    DEFAULT_INPUT_TOKENS = 1500
+
+    ANALYSIS_PROMPT = textwrap.dedent("""
+        Analisis CV berikut dan berikan penilaian dalam format JSON yang tepat:
+
+        CV TEXT:
+        {cv_text}
+
+        Berikan response dalam format JSON dengan struktur berikut:
+        {{
+            "overall_score": <nilai 0-100>,
+            "section_scores": {{
+                "structure": <nilai 0-25>,
+                "experience": <nilai 0-25>,
+                "skills": <nilai 0-25>,
+                "branding": <nilai 0-25>
+            }},
+            "strengths": [
+                "kekuatan 1",
+                "kekuatan 2"
+            ],
+            "weaknesses": [
+                "kelemahan 1",
+                "kelemahan 2"
+            ],
+            "suggestions": [
+                "saran 1",
+                "saran 2",
+                "saran 3"
+            ],
+            "job_roles": [
+                {{
+                    "role": "nama role",
+                    "match_percentage": <nilai 0-100>,
+                    "reason": "alasan mengapa cocok"
+                }}
+            ],
+            "detected_skills": [
+                "skill1", "skill2", "skill3"
+            ]
+        }}
+
+        Kriteria penilaian:
+        - Structure (25): Kelengkapan section, format, organisasi
+        - Experience (25): Deskripsi kerja, pencapaian, impact
+        - Skills (25): Technical skills, tools, expertise
+        - Branding (25): Contact info, LinkedIn, portfolio, summary
+
+        Berikan analisis yang mendalam dan konstruktif dalam bahasa Indonesia.
+    """).strip()
+
+    def __init__(self, api_key, model="anthropic/claude-3.5-sonnet",
+                 base_url="https://openrouter.ai/api/v1/chat/completions",
+                 timeout=60, max_concurrency=8):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "HTTP-Referer": "http://localhost:8501",
+            "X-Title": "CV Evaluator App",
+            "Content-Type": "application/json"
+        }
+        
+        # Session dengan connection pool keep-alive, dipakai bersama oleh semua request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # Model pricing info (per 1M tokens) dan budget token teks CV per request
+        self.model_info = {
+            "anthropic/claude-3.5-sonnet": {"name": "Claude 3.5 Sonnet", "cost": "$3", "quality": "Premium", "input_tokens": 1500},
+            "openai/gpt-4o-mini": {"name": "GPT-4o Mini", "cost": "$0.15", "quality": "Good", "input_tokens": 3000, "json_mode": True},
+            "google/gemini-flash-1.5": {"name": "Gemini Flash", "cost": "$0.075", "quality": "Good", "input_tokens": 3000, "json_mode": True},
+            "meta-llama/llama-3.1-8b-instruct": {"name": "Llama 3.1 8B", "cost": "$0.055", "quality": "Budget", "input_tokens": 2000},
+            "microsoft/wizardlm-2-8x22b": {"name": "WizardLM", "cost": "$0.50", "quality": "Good", "input_tokens": 2000},
+            "mistralai/mixtral-8x7b-instruct": {"name": "Mixtral 8x7B", "cost": "$0.24", "quality": "Good", "input_tokens": 2000}
+        }
+        # Statistik parsing response per model (lihat _record_parse)
+        self._stats_lock = threading.Lock()
+    
+    def _build_payload(self, cv_text):
+        """Susun payload chat completion untuk analisis CV"""
+        # Teks CV dirapikan dan dipadatkan per section agar muat di budget token model
+        budget = self.model_info.get(self.model, {}).get("input_tokens", self.DEFAULT_INPUT_TOKENS)
+        prompt = self.ANALYSIS_PROMPT.format(cv_text=compress_cv(cv_text, budget))
+
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ],
+            "max_tokens": 2000,
+            "temperature": 0.3
+        }
+        # Model yang mendukung JSON mode langsung mengembalikan objek JSON tanpa teks tambahan
+        if self.model_info.get(self.model, {}).get("json_mode"):
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    def _build_repair_payload(self, ai_response, error):
+        """Payload murah untuk memperbaiki response yang gagal diparse (tanpa mengirim ulang CV)"""
+        schema = self.ANALYSIS_PROMPT[self.ANALYSIS_PROMPT.index("{{"):self.ANALYSIS_PROMPT.rindex("}}") + 2]
+        prompt = (
+            f"Response berikut seharusnya berupa JSON analisis CV, tetapi tidak valid ({error}).\n\n"
+            f"RESPONSE:\n{ai_response[:6000]}\n\n"
+            f"Kirim ulang HANYA objek JSON valid dengan struktur berikut, tanpa teks lain:\n"
+            f"{schema.replace('{{', '{').replace('}}', '}')}"
+        )
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 2000,
+            "temperature": 0
+        }
+        if self.model_info.get(self.model, {}).get("json_mode"):
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    def _record_parse(self, outcome):
+        """Catat hasil parsing ("ok", "repaired", "failed") di model_info[model]["parse_stats"]"""
+        with self._stats_lock:
+            info = self.model_info.setdefault(self.model, {})
+            stats = info.setdefault("parse_stats", {"responses": 0, "parse_failures": 0, "repaired": 0, "failed": 0})
+            stats["responses"] += 1
+            if outcome != "ok":
+                stats["parse_failures"] += 1
+                stats[outcome] += 1
+            # Persentase response yang tidak bisa langsung diparse (sebelum perbaikan)
+            info["parse_failure_rate"] = stats["parse_failures"] / stats["responses"]
+
+    def _raise_for_status(self, response):
+        if response.status_code >= 400:
+            raise OpenRouterError(
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code,
+                retry_after=_parse_retry_after(response.headers.get("Retry-After"))
+            )
+
+    @staticmethod
+    def _count_tokens(payload, content, usage=None):
+        """Catat token terkirim/diterima: dari `usage` response jika ada, selain itu estimasi"""
+        usage = usage or {}
+        prompt = "".join(message["content"] for message in payload["messages"])
+        METRICS.incr("tokens_sent", usage.get("prompt_tokens") or estimate_tokens(prompt))
+        METRICS.incr("tokens_received", usage.get("completion_tokens") or estimate_tokens(content))
+
+    def _post(self, payload):
+        """Kirim satu request chat completion, return isi pesan. Raise OpenRouterError jika gagal."""
+        METRICS.incr("ai_requests")
+        try:
+            with METRICS.timer("http_request"):
+                response = self.session.post(self.base_url, json=payload, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise OpenRouterError(str(e)) from e
+        
+        self._raise_for_status(response)
+        try:
+            data = response.json()
+            content = data['choices'][0]['message']['content'] or ""
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise OpenRouterError(f"Format response tidak dikenal: {response.text[:200]}") from e
+        self._count_tokens(payload, content, data.get("usage"))
+        return content
+
+    def _post_stream(self, payload, on_update):
+        """Kirim request dengan streaming (server-sent events), return isi pesan lengkap.
+
+        `on_update(fields)` dipanggil dengan semua field hasil yang sudah lengkap
+        setiap kali ada field top-level baru yang selesai di-generate.
+        """
+        METRICS.incr("ai_requests")
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.base_url, json=dict(payload, stream=True),
+                                         timeout=self.timeout, stream=True)
+        except requests.exceptions.RequestException as e:
+            raise OpenRouterError(str(e)) from e
+        
+        with response:
+            self._raise_for_status(response)
+            # SSE tanpa charset akan dianggap ISO-8859-1 oleh requests
+            response.encoding = "utf-8"
+            parser = PartialJSONParser()
+            fields = {}
+            parts = []
+            try:
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    # Baris kosong dan komentar (": OPENROUTER PROCESSING") dilewati
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        # Stream tetap dibaca sampai habis agar koneksi bisa dipakai ulang
+                        continue
+                    event = json.loads(data)
+                    if "error" in event:
+                        error = event["error"]
+                        raise OpenRouterError(f"Stream error: {error.get('message', error)}",
+                                              status_code=error.get("code") if isinstance(error.get("code"), int) else None)
+                    delta = (event.get("choices") or [{}])[0].get("delta", {}).get("content") or ""
+                    parts.append(delta)
+                    updated = False
+                    for key, value in parser.feed(delta):
+                        value = normalize_field(key, value)
+                        if value is not None:
+                            fields[key] = value
+                            updated = True
+                    if updated:
+                        if len(fields) == 1:
+                            METRICS.observe("stream_first_field", time.perf_counter() - start)
+                        on_update(dict(fields))
+            except requests.exceptions.RequestException as e:
+                raise OpenRouterError(str(e)) from e
+            except ValueError as e:
+                raise OpenRouterError(f"Format stream tidak dikenal: {e}") from e
+        content = "".join(parts)
+        METRICS.observe("http_stream", time.perf_counter() - start)
+        self._count_tokens(payload, content)
+        return content
+
+    def _request_analysis(self, cv_text, on_update=None):
+        """Kirim satu request analisis dan parse hasilnya. Raise OpenRouterError jika gagal.
+
+        Jika `on_update` diberikan, response di-stream dan hasil parsial dikirim ke callback tersebut.
+        """
+        payload = self._build_payload(cv_text)
+        if on_update is None:
+            ai_response = self._post(payload)
+        else:
+            ai_response = self._post_stream(payload, on_update)
+        try:
+            with METRICS.timer("json_parse"):
+                results = parse_analysis(ai_response)
+        except ValueError as e:
+            error = e
+        else:
+            self._record_parse("ok")
+            return results
+
+        # Satu kali percobaan perbaikan yang murah sebelum menyerah
+        METRICS.incr("ai_repairs")
+        repaired_response = self._post(self._build_repair_payload(ai_response, error))
+        try:
+            with METRICS.timer("json_parse"):
+                results = parse_analysis(repaired_response)
+        except ValueError as e:
+            self._record_parse("failed")
+            raise ResponseParseError(f"Response AI tidak valid: {e}", raw_response=ai_response) from e
+        self._record_parse("repaired")
+        results["ai_raw_response"] = ai_response
+        return results
+
+    def analyze_cv_with_ai(self, cv_text, on_update=None):
+        """Analisis CV menggunakan AI dari OpenRouter. Raise OpenRouterError jika gagal."""
+        return self._request_analysis(cv_text, on_update)
+
+    def analyze_many(self, cv_texts, max_concurrency=None):
+        """Analisis banyak CV secara paralel, yield (index, hasil, error) begitu tiap request selesai"""
+        workers = max_concurrency or self.max_concurrency
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._request_analysis, cv_text): index
+                for index, cv_text in enumerate(cv_texts)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield index, future.result(), None
+                except Exception as e:
+                    yield index, None, e
+
+class Evaluation:
+    """Hasil evaluasi satu CV beserta sumbernya dan error yang terjadi selama proses"""
+    def __init__(self, results=None, source=None, errors=None, timings=None):
+        self.results = results      # dict hasil, None jika CV gagal diproses
+        self.source = source        # "ai", "rule-based", atau "cache"
+        self.errors = errors or []  # mis. error AI sebelum fallback ke rule-based
+        self.timings = timings or {}  # durasi per tahap (detik), lihat metrics.py
+
+class CVEvaluator:
+    # Naikkan jika aturan scoring rule-based berubah
+    RULES_VERSION = "3"
+
+    def __init__(self, openrouter_client=None, cache=None, taxonomy=None, max_pages=None, max_chars=None,
+                 scheduler=None, ocr=None, scoring_rules=None):
+        self.openrouter_client = openrouter_client
+        self.cache = cache
+        # Jika ada, request AI lewat scheduler (rate limit, retry, circuit breaker)
+        self.scheduler = scheduler
+        # Batas ekstraksi PDF (None = seluruh dokumen)
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        # OCR halaman hasil scan: None = otomatis jika Tesseract tersedia, False = nonaktif
+        if ocr is None and ocr_available():
+            ocr = PageOCR(cache=cache)
+        self.ocr = ocr or None
+        
+        # Taksonomi role dan skill dimuat dari file eksternal (default: role_skills.json)
+        self.taxonomy = taxonomy or load_taxonomy()
+        self.role_skills = self.taxonomy.role_skills
+        # Tabel aturan scoring rule-based (default: scoring_rules.json)
+        self.scoring_rules = scoring_rules or load_rules()
+
+    def iter_pdf_pages(self, pdf_source, backend=None):
+        """Yield teks PDF per halaman. Halaman berikutnya baru diparse saat diminta.
+
+        `pdf_source` bisa berupa path file (dibuka langsung oleh library PDF tanpa
+        menyalin isi file ke memori) atau file-like object seperti UploadedFile.
+        """
+        return extractors.iter_pages(pdf_source, backend)
+
+    def extract_text_from_pdf(self, pdf_file, max_pages=None, max_chars=None):
+        """Ekstrak teks dari file PDF dengan multiple library support
+
+        Backend tercepat dicoba dulu, lalu fallback ke backend berikutnya jika gagal
+        atau teks yang dihasilkan terlalu sedikit. Parsing berhenti begitu batas
+        halaman (`max_pages`) atau karakter (`max_chars`) tercapai; default memakai
+        batas yang diset di constructor. Raise PDFExtractionError jika semua backend gagal.
+        """
+        max_pages = max_pages if max_pages is not None else self.max_pages
+        max_chars = max_chars if max_chars is not None else self.max_chars
+        with METRICS.timer("pdf_extract"):
+            text, _ = extractors.extract_text(pdf_file, max_pages=max_pages, max_chars=max_chars, ocr=self.ocr)
+        return text
+
+    @staticmethod
+    def clean_text(text):
+        """Membersihkan dan memproses teks"""
+        with METRICS.timer("clean_text"):
+            # Konversi ke lowercase untuk processing
+            text_clean = text.lower()
+            # Hapus karakter khusus berlebihan tapi pertahankan struktur
+            text_clean = re.sub(r'[^\w\s@.-]', ' ', text_clean)
+            # Hapus spasi berlebihan
+            text_clean = re.sub(r'\s+', ' ', text_clean)
+            return text_clean.strip()
+
+    def fallback_analysis(self, text):
+        """Analisis fallback menggunakan rule-based system (aturan dari scoring_rules.json)"""
+        # CV ditokenisasi sekali; semua aturan, skill, dan rekomendasi role memakai token yang sama
+        with METRICS.timer("tokenize"):
+            document = self.rule_engine.tokenize(text)
+        with METRICS.timer("score_rules"):
+            section_scores, skill_matches = self.rule_engine.score(document)
+        
+        return {
+            "overall_score": sum(section_scores.values()),
+            "section_scores": section_scores,
+            "strengths": ["CV terstruktur dengan baik", "Informasi lengkap tersedia"],
+            "weaknesses": ["Bisa ditingkatkan dengan AI analysis"],
+            "suggestions": [
+                "Gunakan OpenRouter API untuk analisis yang lebih mendalam",
+                "Tambahkan lebih banyak detail pencapaian",
+                "Sertakan portfolio online"
+            ],
+            "job_roles": self._recommend_roles_basic(skill_matches),
+            "detected_skills": self._extract_skills_basic(skill_matches)
+        }
+
+    def _recommend_roles_basic(self, skill_matches):
+        """Rekomendasi role dasar"""
+        roles = []
+        for role, match_count, percentage in self.taxonomy.rank_roles(skill_matches, top_k=3):
+            roles.append({
+                "role": role,
+                "match_percentage": round(percentage, 1),
+                "reason": f"Ditemukan {match_count} skills yang relevan"
+            })
+        return roles
+    
+    def _extract_skills_basic(self, skill_matches):
+        """Ekstrak skills dasar"""
+        return skill_matches.skills[:10]  # Return top 10 (paling sering muncul)
+
+    @property
+    def rule_engine(self):
+        return self.scoring_rules.engine(self.taxonomy)
+
+    @property
+    def rules_version(self):
+        """Versi aturan scoring: versi kode + fingerprint taksonomi + fingerprint tabel aturan"""
+        return f"{self.RULES_VERSION}-{self.taxonomy.fingerprint[:12]}-{self.scoring_rules.fingerprint[:12]}"
+
+    def _text_cache_key(self, file_hash):
+        """Kunci cache teks hasil ekstraksi; batas ekstraksi ikut menjadi bagian kunci"""
+        if self.max_pages or self.max_chars:
+            return f"text:{file_hash}:{self.max_pages}:{self.max_chars}"
+        return f"text:{file_hash}"
+
+    def scoring_version(self, use_ai):
+        """Versi yang menentukan hasil scoring: model + versi prompt (AI) atau versi aturan (rule-based).
+
+        Hasil AI tidak bergantung pada taksonomi, sehingga perubahan taksonomi hanya
+        membatalkan hasil rule-based dan perubahan prompt hanya membatalkan hasil AI.
+        """
+        if use_ai:
+            return f"ai:{self.openrouter_client.model}:{OpenRouterClient.PROMPT_VERSION}"
+        return f"rule-based:{self.rules_version}"
+
+    @property
+    def text_limits(self):
+        """Batas ekstraksi dalam bentuk string (bagian dari kunci teks hasil ekstraksi)"""
+        return f"{self.max_pages}:{self.max_chars}"
+
+    def _result_cache_key(self, file_hash, use_ai):
+        """Kunci cache hasil: hash file + batas ekstraksi + versi scoring"""
+        return f"result:{file_hash}:{self.text_limits}:{self.scoring_version(use_ai)}"
+
+    def load_text(self, pdf_file, file_hash=None):
+        """Teks CV dari cache (jika ada `file_hash` dan cache) atau hasil ekstraksi.
+
+        Raise PDFExtractionError jika ekstraksi gagal atau teksnya kosong.
+        """
+        use_cache = file_hash is not None and self.cache is not None
+        text = self.cache.get(self._text_cache_key(file_hash)) if use_cache else None
+        if text is None:
+            text = self.extract_text_from_pdf(pdf_file)
+            if text and use_cache:
+                self.cache.put(self._text_cache_key(file_hash), text)
+        if not text:
+            raise extractors.PDFExtractionError("Teks PDF kosong")
+        return text
+
+    def evaluate(self, pdf_file, user="default", on_update=None):
+        """Evaluasi CV secara keseluruhan, return objek Evaluation
+
+        `user` dipakai scheduler untuk membagi antrean request AI secara adil antar user.
+        Jika `on_update` diberikan, response AI di-stream dan hasil parsial dikirim ke callback.
+        Durasi tiap tahap tersedia di `Evaluation.timings`.
+        """
+        with profile("evaluate"), METRICS.trace() as timings:
+            with METRICS.timer("evaluate"):
+                evaluation = self._evaluate(pdf_file, user, on_update)
+        evaluation.timings = timings
+        METRICS.incr(f"evaluations_{evaluation.source or 'failed'}")
+        return evaluation
+
+    def _evaluate(self, pdf_file, user, on_update):
+        file_hash = None
+        if self.cache is not None:
+            with METRICS.timer("file_hash"):
+                file_hash = file_content_hash(pdf_file)
+            
+            cached = self.cache.get(self._result_cache_key(file_hash, bool(self.openrouter_client)))
+            if cached is not None:
+                return Evaluation(cached, source="cache")
+        
+        # Ekstrak teks
+        try:
+            text = self.load_text(pdf_file, file_hash)
+        except extractors.PDFExtractionError as e:
+            return Evaluation(errors=[e])
+        
+        # Jika ada OpenRouter client, gunakan AI analysis
+        errors = []
+        if self.openrouter_client:
+            try:
+                # Termasuk waktu tunggu antrean scheduler, retry, dan parsing response
+                with METRICS.timer("ai_analysis"):
+                    if self.scheduler is not None:
+                        ai_results = self.scheduler.analyze(text, user=user, client=self.openrouter_client,
+                                                            on_update=on_update)
+                    else:
+                        ai_results = self.openrouter_client.analyze_cv_with_ai(text, on_update)
+                if ai_results:
+                    if file_hash:
+                        self.cache.put(self._result_cache_key(file_hash, True), ai_results)
+                    return Evaluation(ai_results, source="ai")
+            except Exception as e:
+                errors.append(e)
+        
+        # Fallback ke rule-based analysis
+        with METRICS.timer("rule_based"):
+            results = self.fallback_analysis(text)
+        if file_hash:
+            self.cache.put(self._result_cache_key(file_hash, False), results)
+        return Evaluation(results, source="rule-based", errors=errors)
+
+    def evaluate_cv(self, pdf_file, user="default"):
+        """Evaluasi CV secara keseluruhan, return dict hasil atau None jika gagal"""
+        return self.evaluate(pdf_file, user).results
@@ -0,0 +1,180 @@
+"""Registry backend ekstraksi teks PDF dengan fallback per dokumen.
+
+Setiap backend adalah generator yang menerima path atau file-like object dan
+yield teks per halaman. Backend dicoba sesuai prioritas (paling cepat dulu);
+jika gagal atau hasil teksnya terlalu sedikit, dokumen dicoba ulang dengan
+backend berikutnya. Urutan bisa diubah lewat environment variable
+CV_EVAL_PDF_BACKENDS (mis. "pdfplumber,pymupdf").
+
+Halaman tanpa text layer (hasil scan) dapat diisi dengan OCR (lihat ocr.py).
+"""
+import os
+
+from metrics import METRICS
+from ocr import needs_ocr
+
+EXTRACTORS = {}
+
+# Dokumen dengan teks lebih sedikit dari ini dianggap gagal diekstrak oleh backend
+MIN_TEXT_CHARS = 50
+
+
+class PDFExtractionError(Exception):
+    """Semua backend gagal mengekstrak teks dari dokumen"""
+
+
+class Extractor:
+    def __init__(self, name, priority, iter_pages):
+        self.name = name
+        self.priority = priority
+        self.iter_pages = iter_pages
+
+
+def register_extractor(name, priority):
+    """Decorator untuk mendaftarkan generator `iter_pages(source)` sebagai backend"""
+    def decorator(iter_pages):
+        EXTRACTORS[name] = Extractor(name, priority, iter_pages)
+        return iter_pages
+    return decorator
+
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def _rewind(source):
+    if not _is_path(source):
+        source.seek(0)
+
+
+try:
+    import fitz  # PyMuPDF
+
+    @register_extractor("pymupdf", priority=10)
+    def _iter_pages_pymupdf(source):
+        if _is_path(source):
+            doc = fitz.open(source)
+        else:
+            # getbuffer() memberi view ke buffer upload tanpa menyalin bytes
+            data = source.getbuffer() if hasattr(source, "getbuffer") else source.read()
+            doc = fitz.open(stream=data, filetype="pdf")
+        with doc:
+            for page in doc:
+                yield page.get_text()
+except ImportError:
+    pass
+
+try:
+    from PyPDF2 import PdfReader
+
+    @register_extractor("pypdf2", priority=20)
+    def _iter_pages_pypdf2(source):
+        for page in PdfReader(source).pages:
+            yield (page.extract_text() or "") + "\n"
+except ImportError:
+    pass
+
+try:
+    import pdfplumber
+
+    @register_extractor("pdfplumber", priority=30)
+    def _iter_pages_pdfplumber(source):
+        with pdfplumber.open(source) as pdf:
+            for page in pdf.pages:
+                yield (page.extract_text() or "") + "\n"
+                page.close()  # Bebaskan cache objek halaman
+except ImportError:
+    pass
+
+
+def available_extractors(order=None):
+    """Daftar backend yang terinstall, urut sesuai `order`/CV_EVAL_PDF_BACKENDS atau prioritas"""
+    order = order or os.environ.get("CV_EVAL_PDF_BACKENDS")
+    if order:
+        names = order.split(",") if isinstance(order, str) else order
+        return [EXTRACTORS[name.strip()] for name in names if name.strip() in EXTRACTORS]
+    return sorted(EXTRACTORS.values(), key=lambda extractor: extractor.priority)
+
+
+def iter_pages(source, backend=None):
+    """Yield teks per halaman dengan satu backend (default: backend prioritas tertinggi)"""
+    extractors = available_extractors([backend] if backend else None)
+    if not extractors:
+        raise PDFExtractionError("Tidak ada library PDF yang tersedia")
+    _rewind(source)
+    yield from extractors[0].iter_pages(source)
+
+
+def _extract_with(extractor, source, max_pages=None, max_chars=None):
+    """Teks per halaman sampai batas halaman/karakter tercapai"""
+    _rewind(source)
+    pages = extractor.iter_pages(source)
+    parts = []
+    total_chars = 0
+    try:
+        for page_number, page_text in enumerate(pages, 1):
+            parts.append(page_text)
+            total_chars += len(page_text)
+            if (max_pages and page_number >= max_pages) or (max_chars and total_chars >= max_chars):
+                break
+    finally:
+        pages.close()
+    return parts
+
+
+def _join(parts, max_chars=None):
+    text = "".join(parts)
+    return text[:max_chars] if max_chars else text
+
+
+def _apply_ocr(ocr, source, parts):
+    """Isi halaman tanpa text layer dengan hasil OCR. Return True jika ada halaman yang terisi"""
+    empty_pages = [number for number, page_text in enumerate(parts) if needs_ocr(page_text)]
+    if not empty_pages:
+        return False
+    with METRICS.timer("ocr"):
+        texts = ocr.ocr_pages(source, empty_pages)
+    METRICS.incr("ocr_pages", len(texts))
+    for number, page_text in texts.items():
+        parts[number] = page_text + "\n"
+    return bool(texts)
+
+
+def extract_text(source, max_pages=None, max_chars=None, min_chars=MIN_TEXT_CHARS, order=None, ocr=None):
+    """Ekstrak teks dengan fallback antar backend. Return (teks, nama backend).
+
+    Backend berikutnya dicoba jika backend saat ini error atau menghasilkan teks
+    kurang dari `min_chars` karakter non-spasi. Jika semua backend menghasilkan
+    teks sedikit, hasil terbanyak yang dikembalikan. Jika `ocr` (ocr.PageOCR)
+    diberikan, halaman tanpa text layer pada hasil tersebut di-OCR dan nama
+    backend diberi akhiran "+ocr".
+    """
+    extractors = available_extractors(order)
+    if not extractors:
+        raise PDFExtractionError("Tidak ada library PDF yang tersedia")
+
+    best_parts, best_backend = [], None
+    errors = []
+    for extractor in extractors:
+        try:
+            with METRICS.timer(f"pdf_extract_{extractor.name}"):
+                parts = _extract_with(extractor, source, max_pages, max_chars)
+        except Exception as e:
+            METRICS.incr(f"pdf_backend_errors_{extractor.name}")
+            errors.append(f"{extractor.name}: {e}")
+            continue
+        text = _join(parts, max_chars)
+        if len("".join(text.split())) >= min_chars:
+            best_parts, best_backend = parts, extractor.name
+            break
+        if best_backend is None or len(text.strip()) > len(_join(best_parts, max_chars).strip()):
+            best_parts, best_backend = parts, extractor.name
+
+    if best_backend is None:
+        raise PDFExtractionError("; ".join(errors))
+    if ocr is not None and _apply_ocr(ocr, source, best_parts):
+        best_backend += "+ocr"
+    text = _join(best_parts, max_chars)
+    METRICS.incr("pages_extracted", len(best_parts))
+    METRICS.incr("chars_extracted", len(text))
+    return text, best_backend
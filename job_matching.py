@@ -0,0 +1,172 @@
+"""Pencocokan banyak CV terhadap banyak job description dengan TF-IDF sparse.
+
+Vektor CV hanya diproyeksikan ke kosakata job description (term di luar
+kosakata tidak mempengaruhi dot product, hanya norma vektor), lalu matriks
+similarity CV x job dihitung per batch dengan perkalian matriks sparse SciPy.
+"""
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+
+def _tokenize(clean_text, ngram_max=2):
+    """Unigram + n-gram dari teks yang sudah dibersihkan (output clean_text)"""
+    words = [word for word in (word.strip(".-") for word in clean_text.split()) if len(word) > 1]
+    terms = list(words)
+    for n in range(2, ngram_max + 1):
+        terms.extend(map(" ".join, zip(*(words[i:] for i in range(n)))))
+    return Counter(terms)
+
+
+class MatchResult:
+    def __init__(self, similarity, job_names):
+        self.similarity = similarity  # matriks (jumlah CV x jumlah job), cosine 0-1
+        self.job_names = job_names
+
+    def top_jobs_per_cv(self, top_k=3):
+        """Untuk setiap CV: daftar job terbaik dalam format `job_roles` hasil evaluasi"""
+        k = min(top_k, self.similarity.shape[1])
+        if k == 0:
+            return [[] for _ in range(self.similarity.shape[0])]
+        top = np.argpartition(-self.similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(self.similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for job_indices, scores in zip(top, top_scores):
+            results.append([
+                {
+                    "role": self.job_names[j],
+                    "match_percentage": round(float(score) * 100, 1),
+                    "reason": "Kemiripan TF-IDF dengan job description"
+                }
+                for j, score in zip(job_indices, scores) if score > 0
+            ])
+        return results
+
+    def top_cvs_per_job(self, top_k=10):
+        """Untuk setiap job: daftar (index CV, skor) terbaik, urut menurun"""
+        n_cvs = self.similarity.shape[0]
+        k = min(top_k, n_cvs)
+        results = {}
+        for j, job in enumerate(self.job_names):
+            column = self.similarity[:, j]
+            if k == 0:
+                results[job] = []
+                continue
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top], kind="stable")]
+            results[job] = [(int(i), round(float(column[i]) * 100, 1)) for i in top if column[i] > 0]
+        return results
+
+
+# Matcher per proses worker (dikirim sekali oleh initializer)
+_worker_matcher = None
+
+
+def _init_worker(matcher):
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _vectorize_in_worker(cv_texts):
+    return _worker_matcher._vectorize_batch(cv_texts)
+
+
+class JobMatcher:
+    def __init__(self, jobs, clean_text, ngram_max=2, batch_size=1024):
+        """jobs: dict {nama job: deskripsi}, clean_text: fungsi pembersih teks (CVEvaluator.clean_text)
+
+        clean_text harus bisa di-pickle (fungsi level modul atau staticmethod) jika match()
+        dijalankan dengan beberapa worker.
+        """
+        self.job_names = list(jobs)
+        self.clean_text = clean_text
+        self.ngram_max = ngram_max
+        self.batch_size = batch_size
+
+        job_terms = [_tokenize(clean_text(jobs[name]), ngram_max) for name in self.job_names]
+        doc_freq = Counter(term for terms in job_terms for term in terms)
+        self.vocabulary = {term: index for index, term in enumerate(sorted(doc_freq))}
+
+        # Smooth IDF; term di luar kosakata memakai IDF maksimum (df = 0)
+        n_docs = len(self.job_names)
+        self.idf = np.ones(len(self.vocabulary), dtype=np.float32)
+        for term, index in self.vocabulary.items():
+            self.idf[index] = math.log((1 + n_docs) / (1 + doc_freq[term])) + 1
+        self.oov_idf = math.log(1 + n_docs) + 1
+
+        # Matriks job sparse (kosakata x job), tiap kolom dinormalisasi L2
+        rows, cols, values = [], [], []
+        for j, terms in enumerate(job_terms):
+            for term, count in terms.items():
+                index = self.vocabulary[term]
+                rows.append(index)
+                cols.append(j)
+                values.append((1 + math.log(count)) * self.idf[index])
+        job_matrix = sparse.csc_matrix(
+            (np.asarray(values, dtype=np.float32), (rows, cols)),
+            shape=(len(self.vocabulary), n_docs)
+        )
+        norms = np.sqrt(np.asarray(job_matrix.multiply(job_matrix).sum(axis=0))).ravel()
+        self.job_matrix = job_matrix @ sparse.diags(1 / np.where(norms > 0, norms, 1).astype(np.float32))
+
+    @classmethod
+    def from_taxonomy(cls, taxonomy, clean_text, **kwargs):
+        """Job description sederhana dari taksonomi: nama role + daftar skill"""
+        jobs = {role: f"{role} " + " ".join(skills) for role, skills in taxonomy.role_skills.items()}
+        return cls(jobs, clean_text, **kwargs)
+
+    def _vectorize_batch(self, cv_texts):
+        """Matriks TF-IDF sparse (CV x kosakata job), dinormalisasi dengan norma vektor CV penuh"""
+        vocabulary_get = self.vocabulary.get
+        indptr, index_chunks, weight_chunks = [0], [], []
+        norms = np.ones(len(cv_texts), dtype=np.float32)
+        for row, text in enumerate(cv_texts):
+            terms = _tokenize(self.clean_text(text), self.ngram_max)
+            counts = np.fromiter(terms.values(), dtype=np.float32, count=len(terms))
+            term_indices = np.fromiter((vocabulary_get(term, -1) for term in terms), dtype=np.int64, count=len(terms))
+            in_vocabulary = term_indices >= 0
+            # Index hanya untuk term dalam kosakata (kosakata bisa kosong, mis. JD berisi stop-word saja)
+            idf = np.full(len(terms), self.oov_idf, dtype=np.float32)
+            idf[in_vocabulary] = self.idf[term_indices[in_vocabulary]]
+            weights = (1 + np.log(counts)) * idf
+            norm = np.sqrt(np.dot(weights, weights))
+            if norm > 0:
+                norms[row] = norm
+            index_chunks.append(term_indices[in_vocabulary])
+            weight_chunks.append(weights[in_vocabulary])
+            indptr.append(indptr[-1] + len(index_chunks[-1]))
+
+        indices = np.concatenate(index_chunks) if index_chunks else np.zeros(0, dtype=np.int64)
+        values = np.concatenate(weight_chunks) if weight_chunks else np.zeros(0, dtype=np.float32)
+        matrix = sparse.csr_matrix(
+            (values.astype(np.float32), indices, indptr),
+            shape=(len(cv_texts), len(self.vocabulary))
+        )
+        return sparse.diags(1 / norms) @ matrix
+
+    def match(self, cv_texts, workers=1):
+        """Hitung matriks similarity seluruh CV x seluruh job (per batch)
+
+        Tokenisasi CV adalah bagian paling mahal dan bisa dibagi ke beberapa proses
+        dengan `workers`; perkalian matriks tetap di proses utama.
+        """
+        cv_texts = list(cv_texts)
+        similarity = np.zeros((len(cv_texts), len(self.job_names)), dtype=np.float32)
+        starts = range(0, len(cv_texts), self.batch_size)
+        batches = (cv_texts[start:start + self.batch_size] for start in starts)
+
+        if workers > 1 and len(cv_texts) > self.batch_size:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+                for start, matrix in zip(starts, executor.map(_vectorize_in_worker, batches)):
+                    similarity[start:start + matrix.shape[0]] = (matrix @ self.job_matrix).toarray()
+        else:
+            for start, batch in zip(starts, batches):
+                similarity[start:start + len(batch)] = (self._vectorize_batch(batch) @ self.job_matrix).toarray()
+        return MatchResult(similarity, self.job_names)
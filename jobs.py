@@ -0,0 +1,140 @@
+"""Job store persisten (SQLite) untuk evaluasi CV massal yang bisa dilanjutkan.
+
+Setiap dokumen (dikunci dengan hash isi PDF) memiliki state:
+    pending          -> belum diproses
+    extracted        -> teks sudah diekstrak, belum dinilai
+    scored_ai        -> dinilai oleh AI
+    scored_fallback  -> dinilai rule-based (tanpa AI, atau AI gagal)
+    failed           -> ekstraksi gagal
+
+Setiap hasil disimpan bersama versi scoring (`CVEvaluator.scoring_version`),
+sehingga run berikutnya hanya memproses dokumen yang belum selesai atau yang
+versinya berubah (mis. taksonomi atau prompt diperbarui). Teks hasil ekstraksi
+ikut disimpan agar penilaian ulang tidak perlu membaca PDF lagi.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from cache import file_content_hash
+
+DEFAULT_STORE_PATH = os.environ.get("CV_EVAL_JOBS", os.path.join(".cache", "jobs.sqlite3"))
+
+PENDING = "pending"
+EXTRACTED = "extracted"
+SCORED_AI = "scored_ai"
+SCORED_FALLBACK = "scored_fallback"
+FAILED = "failed"
+
+SCORED_STATES = (SCORED_AI, SCORED_FALLBACK)
+
+
+class JobStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                content_hash TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                text TEXT,
+                text_limits TEXT,
+                version TEXT,
+                results TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_state ON documents (state)")
+        # Path -> hash; ukuran & mtime dipakai agar file yang tidak berubah tidak di-hash ulang
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            )
+        """)
+
+    def sync(self, paths):
+        """Daftarkan file ke store. Return list (path, content_hash) sesuai urutan `paths`"""
+        entries = []
+        with self._lock:
+            known = {row[0]: row[1:] for row in self._conn.execute(
+                "SELECT path, content_hash, size, mtime_ns FROM files")}
+            self._conn.execute("BEGIN")
+            try:
+                for path in paths:
+                    stat = os.stat(path)
+                    cached = known.get(path)
+                    if cached and cached[1] == stat.st_size and cached[2] == stat.st_mtime_ns:
+                        file_hash = cached[0]
+                    else:
+                        file_hash = file_content_hash(path)
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO files (path, content_hash, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                            (path, file_hash, stat.st_size, stat.st_mtime_ns)
+                        )
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO documents (content_hash, state, updated_at) VALUES (?, ?, ?)",
+                        (file_hash, PENDING, time.time())
+                    )
+                    entries.append((path, file_hash))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return entries
+
+    def get(self, content_hash):
+        """Data dokumen sebagai dict, atau None jika belum terdaftar"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM documents WHERE content_hash = ?", (content_hash,))
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        if row is None:
+            return None
+        document = dict(zip(columns, row))
+        document["results"] = json.loads(document["results"]) if document["results"] else None
+        return document
+
+    def _update(self, content_hash, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE documents SET {assignments} WHERE content_hash = ?",
+                               (*fields.values(), content_hash))
+
+    def mark_extracted(self, content_hash, text, text_limits):
+        self._update(content_hash, state=EXTRACTED, text=text, text_limits=text_limits)
+
+    def mark_scored(self, content_hash, state, version, results, error=None):
+        """Simpan hasil penilaian; `error` mencatat kegagalan AI sebelum fallback"""
+        self._update(content_hash, state=state, version=version, error=error,
+                     results=json.dumps(results, ensure_ascii=False))
+
+    def mark_failed(self, content_hash, error):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE documents SET state = ?, error = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE content_hash = ?",
+                (FAILED, error, time.time(), content_hash)
+            )
+
+    def counts(self):
+        """Jumlah dokumen per state"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT state, COUNT(*) FROM documents GROUP BY state").fetchall())
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,213 @@
+"""Instrumentasi performa: timer per tahap, counter, dan mode profiling.
+
+Semua modul mencatat ke registry global `METRICS`:
+
+    with METRICS.timer("pdf_extract"):
+        ...
+    METRICS.incr("pages_extracted", len(pages))
+
+Snapshot bisa diekspor sebagai teks Prometheus (`to_prometheus`) atau JSON
+Lines (`write_jsonl`). `trace()` mengumpulkan durasi tiap tahap untuk satu
+request (mis. satu CV) di thread/konteks yang sama.
+
+Mode profiling (CV_EVAL_PROFILE=<direktori>) menjalankan cProfile dan
+tracemalloc untuk setiap request yang dibungkus `profile()`, lalu menulis file
+.prof dan laporan teks hot path ke direktori tersebut.
+"""
+import contextvars
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_DIR = os.environ.get("CV_EVAL_PROFILE")
+
+_current_trace = contextvars.ContextVar("cv_eval_trace", default=None)
+# Nomor urut file profil agar beberapa request dalam detik yang sama tidak saling menimpa
+_profile_seq = itertools.count(1)
+
+# tracemalloc bersifat global per proses: profil yang berjalan bersamaan (thread lain atau
+# bersarang) berbagi satu sesi tracing. `_active_peaks` menyimpan peak tiap profil aktif
+# sebelum peak global di-reset oleh profil yang mulai belakangan.
+_tracemalloc_lock = threading.Lock()
+_active_peaks = {}
+_owns_tracemalloc = False
+
+
+class _Timer:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {}
+        self.started_at = time.time()
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        """Catat durasi satu tahap (detik)"""
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = _Timer()
+            timer.count += 1
+            timer.total += seconds
+            timer.max = max(timer.max, seconds)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace[name] = trace.get(name, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    @contextmanager
+    def trace(self):
+        """Kumpulkan durasi per tahap selama blok berjalan ke dict yang di-yield"""
+        timings = {}
+        token = _current_trace.set(timings)
+        try:
+            yield timings
+        finally:
+            _current_trace.reset(token)
+
+    def snapshot(self):
+        """Salinan counter dan timer: {"counters": {...}, "timers": {nama: {count, total, avg, max}}}"""
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {
+                name: {"count": timer.count, "total": timer.total,
+                       "avg": timer.total / timer.count if timer.count else 0.0, "max": timer.max}
+                for name, timer in self._timers.items()
+            }
+        return {"timestamp": time.time(), "counters": counters, "timers": timers}
+
+    def to_prometheus(self, prefix="cv_eval"):
+        """Snapshot dalam format teks Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        if snapshot["timers"]:
+            metric = f"{prefix}_stage_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for name, timer in sorted(snapshot["timers"].items()):
+                label = _metric_name(name)
+                lines.append(f'{metric}_count{{stage="{label}"}} {timer["count"]}')
+                lines.append(f'{metric}_sum{{stage="{label}"}} {timer["total"]:.6f}')
+            lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+            for name, timer in sorted(snapshot["timers"].items()):
+                lines.append(f'{prefix}_stage_max_seconds{{stage="{_metric_name(name)}"}} {timer["max"]:.6f}')
+        return "\n".join(lines) + "\n"
+
+    def write_jsonl(self, path, **extra):
+        """Tambahkan satu baris snapshot (plus field `extra`) ke file JSON Lines"""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**self.snapshot(), **extra}, ensure_ascii=False) + "\n")
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+            self.started_at = time.time()
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+METRICS = Metrics()
+
+
+def _start_memory_tracking():
+    """Mulai (atau ikut) sesi tracemalloc. Return token untuk _stop_memory_tracking"""
+    global _owns_tracemalloc
+    with _tracemalloc_lock:
+        if not _active_peaks:
+            _owns_tracemalloc = not tracemalloc.is_tracing()
+            if _owns_tracemalloc:
+                tracemalloc.start()
+        else:
+            _, peak = tracemalloc.get_traced_memory()
+            for token in _active_peaks:
+                _active_peaks[token] = max(_active_peaks[token], peak)
+        tracemalloc.reset_peak()
+        token = object()
+        _active_peaks[token] = 0
+        return token
+
+
+def _stop_memory_tracking(token):
+    """Return (snapshot, peak bytes selama profil); tracing dihentikan oleh profil aktif terakhir"""
+    global _owns_tracemalloc
+    with _tracemalloc_lock:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, _active_peaks.pop(token))
+        if not _active_peaks and _owns_tracemalloc:
+            tracemalloc.stop()
+            _owns_tracemalloc = False
+    return snapshot, peak
+
+
+@contextmanager
+def profile(name, directory=None, top=30):
+    """Profil blok dengan cProfile + tracemalloc jika mode profiling aktif; selain itu tanpa overhead"""
+    directory = directory or PROFILE_DIR
+    if not directory:
+        yield
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    memory_token = _start_memory_tracking()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: hanya satu profiler aktif per proses; profil lain sedang berjalan
+        profiler = None
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        snapshot, peak = _stop_memory_tracking(memory_token)
+
+        base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_profile_seq)}-{_metric_name(name)}")
+        report = io.StringIO()
+        report.write(f"{name}: {elapsed:.3f} detik, peak memori {peak / 1024 / 1024:.1f} MB\n\n")
+        if profiler is not None:
+            profiler.dump_stats(base + ".prof")
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(top)
+        else:
+            report.write("cProfile dilewati: profil lain sedang aktif di proses ini\n\n")
+        report.write("Alokasi memori terbesar:\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            report.write(f"  {stat}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
@@ -0,0 +1,178 @@
+"""OCR untuk halaman PDF tanpa text layer (CV hasil scan).
+
+Hanya halaman yang teksnya kosong dan berisi gambar yang diproses. Setiap
+halaman dirender dengan PyMuPDF lalu dibaca dengan Tesseract di process pool,
+sehingga beberapa halaman diproses paralel. Hasil OCR di-cache per hash gambar
+halaman, dan setiap dokumen punya batas waktu agar satu scan tebal tidak
+menahan pipeline: sisa waktu diteruskan sebagai timeout Tesseract, dan halaman
+yang belum selesai saat batas waktu habis dilewati.
+
+Membutuhkan `pytesseract` dan binary Tesseract (dengan data bahasa `ind`/`eng`).
+OCR dapat dimatikan dengan environment variable CV_EVAL_OCR=0.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:
+    pytesseract = None
+
+from cache import ResultCache
+
+OCR_DPI = 200
+OCR_LANG = os.environ.get("CV_EVAL_OCR_LANG", "ind+eng")
+# Batas waktu OCR per dokumen (detik)
+DEFAULT_TIME_BUDGET = float(os.environ.get("CV_EVAL_OCR_TIME_BUDGET", 60))
+# Halaman dengan karakter non-spasi lebih sedikit dari ini dianggap tidak punya text layer
+MIN_PAGE_CHARS = 20
+
+
+def ocr_available():
+    """True jika PyMuPDF, pytesseract, dan binary Tesseract tersedia (dan OCR tidak dimatikan)"""
+    if os.environ.get("CV_EVAL_OCR", "1") == "0" or fitz is None or pytesseract is None:
+        return False
+    return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+
+def needs_ocr(page_text):
+    return len("".join(page_text.split())) < MIN_PAGE_CHARS
+
+
+class OCRTimeout(Exception):
+    """Batas waktu OCR dokumen habis sebelum halaman selesai dibaca"""
+
+
+def _ocr_image(image, lang, timeout):
+    # pytesseract menghentikan proses tesseract dan raise RuntimeError jika melewati timeout
+    try:
+        return pytesseract.image_to_string(image, lang=lang, timeout=timeout)
+    except RuntimeError as e:
+        if "timeout" in str(e).lower():
+            raise OCRTimeout(str(e))
+        raise
+
+
+# Cache OCR per proses worker (dibuat sekali oleh initializer)
+_worker_cache = None
+
+
+def _init_worker(cache_path=None):
+    global _worker_cache
+    _worker_cache = ResultCache(cache_path) if cache_path else None
+
+
+def _ocr_page(path, page_number, dpi, lang, deadline):
+    """Render satu halaman lalu OCR (dijalankan di proses worker). Return teks halaman.
+
+    `deadline` memakai time.time() agar bisa dibandingkan antar proses; raise OCRTimeout jika terlewati.
+    """
+    if time.time() >= deadline:
+        raise OCRTimeout("Batas waktu OCR dokumen habis")
+    with fitz.open(path) as doc:
+        pixmap = doc[page_number].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    key = f"ocr:{hashlib.sha256(pixmap.samples).hexdigest()}:{dpi}:{lang}"
+    if _worker_cache is not None:
+        cached = _worker_cache.get(key)
+        if cached is not None:
+            return cached
+    image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise OCRTimeout("Batas waktu OCR dokumen habis")
+    text = _ocr_image(image, lang, remaining)
+    if _worker_cache is not None:
+        _worker_cache.put(key, text)
+    return text
+
+
+class PageOCR:
+    def __init__(self, workers=None, dpi=OCR_DPI, lang=OCR_LANG, time_budget=DEFAULT_TIME_BUDGET, cache=None):
+        # workers=0: OCR dijalankan di proses pemanggil (mis. di dalam worker batch.py)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.dpi = dpi
+        self.lang = lang
+        self.time_budget = time_budget
+        self.cache_path = cache.path if cache is not None else None
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.cache_path,))
+        return self._executor
+
+    def ocr_pages(self, source, page_numbers):
+        """OCR halaman `page_numbers` (0-based) yang berisi gambar. Return dict nomor halaman -> teks.
+
+        Halaman yang belum selesai saat batas waktu dokumen habis tidak ada di hasil.
+        """
+        deadline = time.time() + self.time_budget
+        temp_path = None
+        if isinstance(source, (str, os.PathLike)):
+            path = source
+        else:
+            # Worker membuka dokumen dari file, sehingga isi upload cukup ditulis sekali
+            source.seek(0)
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+                shutil.copyfileobj(source, f)
+                temp_path = path = f.name
+
+        try:
+            with fitz.open(path) as doc:
+                pages = [number for number in page_numbers if doc[number].get_images()]
+            if not pages:
+                return {}
+            if self.workers == 0:
+                return self._ocr_inline(path, pages, deadline)
+            return self._ocr_parallel(path, pages, deadline)
+        finally:
+            if temp_path:
+                os.unlink(temp_path)
+
+    def _ocr_inline(self, path, pages, deadline):
+        if _worker_cache is None and self.cache_path:
+            _init_worker(self.cache_path)
+        texts = {}
+        for number in pages:
+            try:
+                texts[number] = _ocr_page(path, number, self.dpi, self.lang, deadline)
+            except OCRTimeout:
+                break
+        return texts
+
+    def _ocr_parallel(self, path, pages, deadline):
+        executor = self._get_executor()
+        futures = {executor.submit(_ocr_page, path, number, self.dpi, self.lang, deadline): number
+                   for number in pages}
+        texts = {}
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    texts[futures[future]] = future.result()
+                except Exception:
+                    pass  # Halaman yang gagal atau melewati batas waktu di-OCR dibiarkan kosong
+        # Halaman yang belum mulai dibatalkan; yang sedang berjalan berhenti sendiri lewat timeout Tesseract
+        for future in pending:
+            future.cancel()
+        return texts
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
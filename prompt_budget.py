@@ -0,0 +1,116 @@
+"""Kompresi teks CV sebelum dikirim ke LLM agar muat dalam budget token per model.
+
+Teks dibagi per section (nama section sama dengan yang dipakai aturan scoring
+rule-based, lihat scoring_rules.py), dibersihkan dari noise (nomor halaman, baris
+kosong, spasi berlebih) dan baris yang berulang (header/footer tiap halaman).
+Jika masih melebihi budget, setiap section mendapat jatah sesuai bobotnya,
+sehingga pengalaman dan skills tidak terpotong hanya karena letaknya di akhir CV.
+"""
+import math
+import re
+
+# Variasi judul section (Inggris/Indonesia) -> nama section
+SECTION_ALIASES = {
+    "profile": ("profile", "profil", "summary", "ringkasan", "about me", "tentang saya", "objective"),
+    "experience": ("experience", "work experience", "pengalaman", "pengalaman kerja", "employment",
+                   "work history", "riwayat pekerjaan", "projects", "proyek", "organisasi", "organization"),
+    "education": ("education", "pendidikan", "riwayat pendidikan", "certifications", "sertifikasi",
+                  "training", "pelatihan"),
+    "skills": ("skills", "skill", "keahlian", "keterampilan", "kemampuan", "technical skills", "tools"),
+    "contact": ("contact", "kontak", "contact information", "informasi kontak"),
+}
+
+# Bobot jatah token per section saat CV melebihi budget
+SECTION_WEIGHTS = {"experience": 4, "skills": 3, "profile": 2, "education": 1, "contact": 1, "other": 1}
+
+# Estimasi kasar jumlah karakter per token (tanpa tokenizer spesifik model)
+CHARS_PER_TOKEN = 4
+
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+_NOISE_LINE = re.compile(r"^(page|halaman)?\s*\d+(\s*(/|of|dari)\s*\d+)?$|^[\W_]+$", re.IGNORECASE)
+_SPACES = re.compile(r"[ \t\u00a0]+")
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def heading_section(line):
+    """Nama section jika baris adalah judul section, selain itu None"""
+    if len(line) > 40:
+        return None
+    key = line.lower().strip(" :-–•*#|")
+    return _HEADING_LOOKUP.get(key)
+
+
+def split_sections(text):
+    """Bagi teks CV menjadi list (nama section, [baris]) sesuai urutan di dokumen.
+
+    Baris noise dibuang, spasi dirapikan, dan baris yang sama persis hanya disimpan sekali.
+    """
+    sections = [["other", []]]
+    seen = set()
+    for raw_line in text.splitlines():
+        line = _SPACES.sub(" ", raw_line).strip()
+        if not line or _NOISE_LINE.match(line):
+            continue
+        section = heading_section(line)
+        if section:
+            sections.append([section, [line]])
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        sections[-1][1].append(line)
+    return [(name, lines) for name, lines in sections if lines]
+
+
+def _allocate(sizes, weights, budget):
+    """Bagi budget ke section secara proporsional bobot; sisa jatah section kecil dibagi ulang"""
+    allocation = [0] * len(sizes)
+    remaining = set(range(len(sizes)))
+    while remaining and budget > 0:
+        total_weight = sum(weights[i] for i in remaining)
+        fits = {i for i in remaining if sizes[i] <= budget * weights[i] / total_weight}
+        if not fits:
+            for i in remaining:
+                allocation[i] = int(budget * weights[i] / total_weight)
+            break
+        for i in fits:
+            allocation[i] = sizes[i]
+            budget -= sizes[i]
+        remaining -= fits
+    return allocation
+
+
+def compress_cv(text, max_tokens):
+    """Susun ulang teks CV agar maksimal `max_tokens` (estimasi), prioritas pada section paling informatif"""
+    sections = split_sections(text)
+    blocks = ["\n".join(lines) for _, lines in sections]
+    compact = "\n\n".join(blocks)
+    budget_chars = max_tokens * CHARS_PER_TOKEN
+    if len(compact) <= budget_chars:
+        return compact
+
+    # Kurangi separator antar section dari budget
+    budget_chars -= 2 * (len(blocks) - 1)
+    weights = [SECTION_WEIGHTS.get(name, 1) for name, _ in sections]
+    allocation = _allocate([len(block) for block in blocks], weights, budget_chars)
+
+    kept = []
+    for (_, lines), chars in zip(sections, allocation):
+        block_lines, used = [], 0
+        for line in lines:
+            separator = 1 if block_lines else 0
+            if used + separator + len(line) > chars:
+                # Baris terakhir dipotong jika masih ada ruang berarti
+                room = chars - used - separator
+                if room > 40:
+                    block_lines.append(line[:room])
+                break
+            block_lines.append(line)
+            used += separator + len(line)
+        if block_lines:
+            kept.append("\n".join(block_lines))
+    return "\n\n".join(kept)
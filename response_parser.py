@@ -0,0 +1,253 @@
+"""Ekstraksi dan validasi JSON hasil analisis dari response model AI.
+
+Model kadang menambahkan teks atau code fence di sekitar JSON. Alih-alih regex
+greedy (`\\{.*\\}`) yang bisa menelan beberapa objek sekaligus, `JSONObjectScanner`
+membaca teks sekali jalan (linear), melacak string dan escape, dan menghasilkan
+setiap objek top-level yang kurung kurawalnya seimbang. Scanner bisa diberi
+potongan teks bertahap (mis. dari response streaming).
+
+`PartialJSONParser` membaca response streaming dan mengembalikan setiap field
+top-level begitu nilainya lengkap, sehingga UI bisa menampilkan skor sebelum
+seluruh response selesai.
+
+`validate_analysis` memastikan hasil memiliki bentuk yang dipakai UI dan
+merapikan nilainya (angka dari string, skor dibatasi ke rentangnya).
+"""
+import json
+
+
+class ResponseValidationError(ValueError):
+    """JSON dari model tidak sesuai skema hasil analisis"""
+
+
+class JSONObjectScanner:
+    """Scanner kurung kurawal seimbang untuk teks yang datang bertahap"""
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        """Proses potongan teks berikutnya, return list string objek JSON top-level yang selesai"""
+        objects = []
+        for char in chunk:
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = ["{"]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    objects.append("".join(self._buffer))
+                    self._buffer = []
+        return objects
+
+
+class PartialJSONParser:
+    """Parser inkremental objek JSON top-level: (key, value) dikembalikan begitu value lengkap"""
+
+    def __init__(self):
+        self.fields = {}
+        self.done = False
+        self._started = False
+        self._key = None
+        self._reading = None  # None, "key", atau "value"
+        self._token = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def _read_string_char(self, char):
+        """Tambahkan karakter di dalam string; return True jika string berakhir"""
+        self._token.append(char)
+        if self._escaped:
+            self._escaped = False
+        elif char == "\\":
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+            return True
+        return False
+
+    def feed(self, chunk):
+        """Proses potongan teks berikutnya, return list (key, value) yang baru lengkap"""
+        completed = []
+        for char in chunk:
+            if self.done:
+                break
+            if not self._started:
+                self._started = char == "{"
+                continue
+
+            if self._reading is None:
+                if char == '"' and self._key is None:
+                    self._reading, self._token, self._in_string = "key", ['"'], True
+                elif char == ":" and self._key is not None:
+                    self._reading, self._token, self._depth = "value", [], 0
+                elif char == "}":
+                    self.done = True
+            elif self._reading == "key":
+                if self._read_string_char(char):
+                    self._key = json.loads("".join(self._token))
+                    self._reading = None
+            elif self._in_string:
+                self._read_string_char(char)
+            elif self._depth == 0 and char in ",}":
+                try:
+                    value = json.loads("".join(self._token))
+                except json.JSONDecodeError:
+                    pass  # Value rusak dilewati; hasil akhir tetap divalidasi dari teks lengkap
+                else:
+                    self.fields[self._key] = value
+                    completed.append((self._key, value))
+                self._key, self._reading = None, None
+                self.done = char == "}"
+            else:
+                self._token.append(char)
+                if char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    self._depth -= 1
+        return completed
+
+
+def extract_json_object(text):
+    """Objek JSON top-level pertama yang valid di dalam `text`, atau raise ValueError"""
+    text = text.strip()
+    # Fast path: seluruh response sudah berupa JSON (mis. model dengan JSON mode)
+    if text.startswith("{"):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+
+    last_error = None
+    for candidate in JSONObjectScanner().feed(text):
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError as e:
+            last_error = e
+            continue
+        if isinstance(data, dict):
+            return data
+    raise ValueError(f"Tidak ada objek JSON valid di response ({last_error or 'tidak ditemukan kurung kurawal'})")
+
+
+def _number(value, maximum, field, problems):
+    if isinstance(value, str):
+        value = value.strip().rstrip("%")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        problems.append(f"{field} harus berupa angka")
+        return 0
+    number = min(max(number, 0.0), float(maximum))
+    return int(number) if number.is_integer() else round(number, 1)
+
+
+def _strings(value, field, problems):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        problems.append(f"{field} harus berupa list")
+        return []
+    return [str(item) for item in value if isinstance(item, (str, int, float))]
+
+
+def _job_role(role, index, problems):
+    return {
+        "role": str(role["role"]),
+        "match_percentage": _number(role.get("match_percentage", 0), 100,
+                                    f"job_roles[{index}].match_percentage", problems),
+        "reason": str(role.get("reason") or ""),
+    }
+
+
+def validate_analysis(data):
+    """Validasi dan normalisasi hasil analisis AI. Raise ResponseValidationError jika tidak sesuai skema"""
+    if not isinstance(data, dict):
+        raise ResponseValidationError("Response harus berupa objek JSON")
+
+    problems = []
+    result = {}
+    if "overall_score" in data:
+        result["overall_score"] = _number(data["overall_score"], 100, "overall_score", problems)
+    else:
+        problems.append("overall_score wajib ada")
+
+    section_scores = data.get("section_scores")
+    if isinstance(section_scores, dict):
+        result["section_scores"] = {}
+        for section in ("structure", "experience", "skills", "branding"):
+            if section in section_scores:
+                result["section_scores"][section] = _number(
+                    section_scores[section], 25, f"section_scores.{section}", problems)
+            else:
+                problems.append(f"section_scores.{section} wajib ada")
+    else:
+        problems.append("section_scores wajib berupa objek")
+
+    for field in ("strengths", "weaknesses", "suggestions", "detected_skills"):
+        result[field] = _strings(data.get(field), field, problems)
+
+    job_roles = data.get("job_roles") or []
+    result["job_roles"] = []
+    if not isinstance(job_roles, list):
+        problems.append("job_roles harus berupa list")
+        job_roles = []
+    for index, role in enumerate(job_roles):
+        if not isinstance(role, dict) or not role.get("role"):
+            problems.append(f"job_roles[{index}].role wajib ada")
+            continue
+        result["job_roles"].append(_job_role(role, index, problems))
+
+    if problems:
+        raise ResponseValidationError("; ".join(problems))
+    return result
+
+
+def normalize_field(key, value):
+    """Normalisasi satu field hasil parsial (untuk ditampilkan sebelum validasi penuh), None jika tidak valid"""
+    problems = []
+    if key == "overall_score":
+        value = _number(value, 100, key, problems)
+    elif key == "section_scores" and isinstance(value, dict):
+        value = {section: _number(score, 25, section, problems) for section, score in value.items()}
+    elif key in ("strengths", "weaknesses", "suggestions", "detected_skills"):
+        value = _strings(value, key, problems)
+    elif key == "job_roles" and isinstance(value, list):
+        # Entri dengan persentase tidak valid dilewati agar role lain tetap tampil
+        roles = []
+        for index, role in enumerate(value):
+            if isinstance(role, dict) and role.get("role"):
+                role_problems = []
+                entry = _job_role(role, index, role_problems)
+                if not role_problems:
+                    roles.append(entry)
+        value = roles
+    else:
+        return None
+    return None if problems else value
+
+
+def parse_analysis(text):
+    """Ekstrak lalu validasi hasil analisis dari teks response model"""
+    return validate_analysis(extract_json_object(text))
@@ -0,0 +1,294 @@
+"""Results store kolumnar (Parquet) untuk ranking dan filter hasil evaluasi tanpa menilai ulang.
+
+Satu baris per CV: skor per section, skill terdeteksi, dan role yang cocok beserta
+persentasenya. Baris ditulis bertahap: `append()` mengumpulkan baris di memori dan
+`flush()` (otomatis setiap `flush_rows` baris atau `flush_seconds` detik) menulis satu
+file part Parquet baru ke direktori store, sehingga batch yang terhenti tetap
+menyimpan hasil yang sudah selesai dan beberapa proses bisa menulis bersamaan.
+`compact()` menggabungkan part menjadi satu file, otomatis saat jumlah part melebihi
+`max_files`.
+
+Untuk query, kolom dimuat sekali per versi direktori (daftar file berubah = dimuat
+ulang) dan skill/role diratakan menjadi kode dictionary, sehingga filter seperti
+"50 Data Analyst teratas dengan SQL dan Tableau" cukup operasi numpy atas array
+integer:
+
+    store = ResultsStore()
+    store.query(role="Data Analyst", skills=["SQL", "Tableau"], limit=50)
+
+Jika CV yang sama (hash isi) dinilai lebih dari sekali dalam satu campaign, hanya baris
+terbaru yang dipakai; ranking campaign lain tidak terpengaruh.
+Butuh pyarrow (`pip install pyarrow`).
+"""
+import glob
+import itertools
+import os
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_RESULTS_PATH = os.environ.get("CV_EVAL_RESULTS", os.path.join(".cache", "results"))
+
+SECTIONS = ("structure", "experience", "skills", "branding")
+# Nomor urut file part agar beberapa flush dalam nanodetik yang sama tidak saling menimpa
+_part_seq = itertools.count(1)
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow diperlukan untuk results store: pip install pyarrow")
+    return pa, pc, pq
+
+
+def results_schema():
+    pa, _, _ = _pyarrow()
+    return pa.schema([
+        ("content_hash", pa.string()),
+        ("name", pa.string()),
+        ("campaign", pa.string()),
+        ("source", pa.string()),
+        ("model", pa.string()),
+        ("evaluated_at", pa.float64()),
+        ("overall_score", pa.float32()),
+        *[(section, pa.float32()) for section in SECTIONS],
+        ("detected_skills", pa.list_(pa.string())),
+        ("roles", pa.list_(pa.struct([("role", pa.string()), ("match_percentage", pa.float32())]))),
+    ])
+
+
+def result_row(results, content_hash, name=None, campaign=None, source=None, model=None, evaluated_at=None):
+    """Ubah dict hasil evaluasi (format evaluator/response_parser) menjadi satu baris store"""
+    section_scores = results.get("section_scores") or {}
+    return {
+        "content_hash": content_hash,
+        "name": name,
+        "campaign": campaign,
+        "source": source,
+        "model": model,
+        "evaluated_at": time.time() if evaluated_at is None else evaluated_at,
+        "overall_score": results.get("overall_score"),
+        **{section: section_scores.get(section) for section in SECTIONS},
+        "detected_skills": [str(skill) for skill in results.get("detected_skills") or []],
+        "roles": [
+            {"role": str(role["role"]), "match_percentage": role.get("match_percentage")}
+            for role in results.get("job_roles") or [] if role.get("role")
+        ],
+    }
+
+
+class _Snapshot:
+    """Tabel hasil (baris terbaru per CV) beserta index skill/role untuk satu versi direktori"""
+
+    def __init__(self, table):
+        _, pc, _ = _pyarrow()
+        self.table = table
+        self.overall = table["overall_score"].to_numpy(zero_copy_only=False).astype(np.float32)
+        self.overall = np.nan_to_num(self.overall, nan=-1.0)
+        self.campaigns = pc.dictionary_encode(table["campaign"].combine_chunks())
+
+        skills = table["detected_skills"].combine_chunks()
+        self.skill_rows = pc.list_parent_indices(skills).to_numpy()
+        self.skill_codes, self.skill_index = self._encode(pc.list_flatten(skills))
+
+        roles = table["roles"].combine_chunks()
+        flat_roles = pc.list_flatten(roles)
+        self.role_rows = pc.list_parent_indices(roles).to_numpy()
+        self.role_codes, self.role_index = self._encode(flat_roles.field("role"))
+        self.role_match = np.nan_to_num(
+            flat_roles.field("match_percentage").to_numpy(zero_copy_only=False).astype(np.float32), nan=0.0)
+
+    @staticmethod
+    def _encode(values):
+        """Kode integer per nilai (case-insensitive) dan peta nilai lowercase -> kode"""
+        _, pc, _ = _pyarrow()
+        encoded = pc.dictionary_encode(pc.utf8_lower(values))
+        codes = encoded.indices.to_numpy(zero_copy_only=False)
+        index = {value: code for code, value in enumerate(encoded.dictionary.to_pylist())}
+        return codes, index
+
+    def rows_with(self, codes, rows, index, value):
+        """Mask baris yang punya `value` (skill atau role)"""
+        mask = np.zeros(self.table.num_rows, dtype=bool)
+        code = index.get(" ".join(str(value).lower().split()))
+        if code is not None:
+            mask[rows[codes == code]] = True
+        return mask
+
+
+class ResultsStore:
+    def __init__(self, path=DEFAULT_RESULTS_PATH, flush_rows=1000, flush_seconds=5.0, max_files=32):
+        _pyarrow()
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_files = max_files
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._snapshot = None
+        self._snapshot_key = None
+        # Tabel per file part yang sudah dibaca: path -> (mtime, tabel)
+        self._file_tables = {}
+
+    def append(self, results, content_hash, name=None, campaign=None, source=None, model=None):
+        """Tambahkan hasil evaluasi satu CV (ditulis ke disk saat flush)"""
+        row = result_row(results, content_hash, name, campaign, source, model)
+        with self._lock:
+            self._buffer.append(row)
+            due = (len(self._buffer) >= self.flush_rows
+                   or time.monotonic() - self._last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Tulis baris yang masih di buffer sebagai satu file part Parquet"""
+        pa, _, _ = _pyarrow()
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if not rows:
+            return
+        table = pa.Table.from_pylist(rows, schema=results_schema())
+        self._write(table, f"part-{time.time_ns()}-{os.getpid()}-{next(_part_seq)}.parquet")
+        if self.max_files and len(self._files()) > self.max_files:
+            self.compact()
+
+    def _write(self, table, name):
+        _, _, pq = _pyarrow()
+        # Tulis ke file sementara lalu rename agar pembaca tidak pernah melihat file setengah jadi
+        temp_path = os.path.join(self.path, f".{name}.tmp")
+        pq.write_table(table, temp_path, compression="zstd")
+        os.replace(temp_path, os.path.join(self.path, name))
+
+    def _files(self):
+        return sorted(glob.glob(os.path.join(self.path, "*.parquet")))
+
+    def _read_file(self, path, mtime):
+        """Tabel satu file part; file yang tidak berubah tidak dibaca ulang"""
+        _, _, pq = _pyarrow()
+        cached = self._file_tables.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = self._file_tables[path] = (mtime, pq.read_table(path, schema=results_schema()))
+        return cached[1]
+
+    def _read(self, files):
+        pa, pc, _ = _pyarrow()
+        if not files:
+            return results_schema().empty_table()
+        table = pa.concat_tables([self._read_file(path, mtime) for path, mtime in files])
+        # Baris terbaru per (campaign, CV): urutkan dari yang terbaru lalu ambil kemunculan pertama tiap key
+        order = pc.sort_indices(table, sort_keys=[("evaluated_at", "descending")]).to_numpy()
+        keys = pc.binary_join_element_wise(pc.fill_null(table["campaign"], ""), table["content_hash"], "\x1f")
+        keys = pc.dictionary_encode(keys.combine_chunks()).indices.to_numpy(zero_copy_only=False)
+        _, first = np.unique(keys[order], return_index=True)
+        return table.take(np.sort(order[first]))
+
+    def snapshot(self):
+        """Tabel hasil (dimuat ulang hanya jika file di direktori store berubah)"""
+        while True:
+            try:
+                files = tuple((path, os.path.getmtime(path)) for path in self._files())
+                if files != self._snapshot_key:
+                    self._snapshot = _Snapshot(self._read(files))
+                    self._snapshot_key = files
+                    # Lepaskan tabel file yang sudah tidak ada (mis. setelah compact)
+                    current = {path for path, _ in files}
+                    self._file_tables = {path: entry for path, entry in self._file_tables.items()
+                                         if path in current}
+                return self._snapshot
+            except FileNotFoundError:
+                # Part dihapus oleh compact() proses lain di tengah pembacaan
+                continue
+
+    def table(self):
+        """Semua hasil sebagai pyarrow.Table (baris terbaru per CV)"""
+        return self.snapshot().table
+
+    def count(self):
+        return self.snapshot().table.num_rows
+
+    def content_hashes(self, campaign=None):
+        """Hash CV yang sudah tersimpan untuk `campaign` (None = tanpa campaign)"""
+        table = self.snapshot().table
+        campaigns = table["campaign"].to_pylist()
+        return {content_hash for content_hash, row_campaign in zip(table["content_hash"].to_pylist(), campaigns)
+                if row_campaign == campaign}
+
+    def campaigns(self):
+        return sorted(value for value in self.snapshot().campaigns.dictionary.to_pylist() if value)
+
+    def roles(self):
+        """Nama role yang pernah muncul (lowercase)"""
+        return sorted(self.snapshot().role_index)
+
+    def skills(self):
+        """Nama skill yang pernah terdeteksi (lowercase)"""
+        return sorted(self.snapshot().skill_index)
+
+    def query(self, role=None, skills=(), min_score=None, campaign=None, limit=50):
+        """Ranking CV: filter role/skill (semua harus ada)/skor minimal/campaign, urut skor tertinggi.
+
+        Dengan `role`, CV diurutkan berdasarkan persentase kecocokan role tersebut
+        (kolom `role_match`), lalu skor keseluruhan. Return pyarrow.Table.
+        """
+        pa, _, _ = _pyarrow()
+        snapshot = self.snapshot()
+        mask = np.ones(snapshot.table.num_rows, dtype=bool)
+        for skill in skills:
+            mask &= snapshot.rows_with(snapshot.skill_codes, snapshot.skill_rows, snapshot.skill_index, skill)
+        if min_score is not None:
+            mask &= snapshot.overall >= min_score
+        if campaign is not None:
+            codes = snapshot.campaigns.indices.to_numpy(zero_copy_only=False)
+            index = {value: code for code, value in enumerate(snapshot.campaigns.dictionary.to_pylist())}
+            mask &= codes == index.get(campaign, -1)
+
+        role_match = None
+        if role is not None:
+            key = " ".join(str(role).lower().split())
+            role_match = np.full(snapshot.table.num_rows, -1.0, dtype=np.float32)
+            selected = snapshot.role_codes == snapshot.role_index.get(key, -1)
+            # Jika satu CV punya role yang sama lebih dari sekali, ambil persentase tertinggi
+            np.maximum.at(role_match, snapshot.role_rows[selected], snapshot.role_match[selected])
+            mask &= role_match >= 0
+
+        rows = np.flatnonzero(mask)
+        primary = role_match[rows] if role_match is not None else snapshot.overall[rows]
+        # Urutan: primary menurun, lalu skor keseluruhan menurun (lexsort: kunci terakhir paling utama)
+        if limit is not None and len(rows) > limit:
+            keep = np.argpartition(-primary, limit - 1)[:limit]
+            threshold = primary[keep].min()
+            keep = np.flatnonzero(primary >= threshold)
+            rows, primary = rows[keep], primary[keep]
+        order = np.lexsort((-snapshot.overall[rows], -primary))[:limit]
+        result = snapshot.table.take(rows[order])
+        if role_match is not None:
+            result = result.append_column("role_match", pa.array(primary[order], type=pa.float32()))
+        return result
+
+    def compact(self):
+        """Gabungkan semua part menjadi satu file (baris lama CV yang dinilai ulang dibuang)"""
+        self.flush()
+        files = self._files()
+        if len(files) <= 1:
+            return
+        try:
+            table = self._read([(path, os.path.getmtime(path)) for path in files])
+        except FileNotFoundError:
+            # Proses lain sedang compact
+            return
+        self._write(table, f"part-{time.time_ns()}-{os.getpid()}-{next(_part_seq)}.parquet")
+        for path in files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,329 @@
+"""Scheduler request OpenRouter: rate limit, retry dengan backoff, dan circuit breaker.
+
+- Token bucket membatasi laju request ke provider dan dihentikan sementara
+  sesuai header Retry-After saat menerima 429.
+- Error sementara (429, 5xx, timeout/koneksi) di-retry dengan exponential
+  backoff + jitter; error permanen (401, 402, 400, response tidak valid)
+  langsung dikembalikan.
+- Circuit breaker per model menahan request saat model terus gagal.
+- Antrean dibatasi dan adil antar user (round-robin), sehingga satu user yang
+  mengupload banyak CV tidak memblokir user lain.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from errors import OpenRouterError, ResponseParseError
+from metrics import METRICS
+
+# Status HTTP yang layak di-retry
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class QueueFullError(Exception):
+    """Antrean scheduler penuh dan tidak ada slot dalam waktu tunggu"""
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate                      # token per detik
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self):
+        """Ambil satu token. Return 0 jika berhasil, atau detik yang perlu ditunggu"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def pause(self, seconds):
+        """Hentikan pemberian token selama `seconds` (mis. dari header Retry-After)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_in(self):
+        """0 jika request boleh dikirim, selain itu detik sampai breaker boleh dicoba lagi"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - now
+                if remaining > 0:
+                    return remaining
+                self.state = self.HALF_OPEN
+            # Half-open: hanya satu request percobaan dalam satu waktu
+            if self._probe_in_flight:
+                return min(1.0, self.reset_timeout)
+            self._probe_in_flight = True
+            return 0.0
+
+    def release(self):
+        """Batalkan izin request (request tidak jadi dikirim / gagal karena alasan non-provider)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class _Job:
+    def __init__(self, cv_text, user, client, on_update=None):
+        self.cv_text = cv_text
+        self.user = user
+        self.client = client
+        self.on_update = on_update
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+        self.dequeued_at = None  # diisi _next_job setiap kali job diambil dari antrean
+        self.not_before = 0.0
+        self.attempts = 0
+
+
+class RequestScheduler:
+    def __init__(self, client, requests_per_second=2.0, burst=None, max_queue=1000, workers=8,
+                 max_retries=5, base_delay=1.0, max_delay=60.0,
+                 breaker_failure_threshold=5, breaker_reset_timeout=30.0):
+        self.client = client
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_queue = max_queue
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self.breakers = {}
+
+        # Antrean per user, dilayani round-robin
+        self._queues = OrderedDict()
+        self._queued = 0
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._threads = []
+        self._closed = False
+
+        # Metrik
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self._wait_times = deque(maxlen=1000)
+
+    def _breaker(self, model):
+        with self._condition:
+            if model not in self.breakers:
+                self.breakers[model] = CircuitBreaker(self.breaker_failure_threshold, self.breaker_reset_timeout)
+            return self.breakers[model]
+
+    def _start_workers(self):
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"openrouter-scheduler-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, cv_text, user="default", client=None, timeout=None, on_update=None):
+        """Masukkan CV ke antrean. Return Future berisi hasil analisis AI.
+
+        Jika antrean penuh, tunggu slot sampai `timeout` detik (None = tunggu terus)
+        lalu raise QueueFullError. `on_update` diteruskan ke client untuk hasil parsial (streaming).
+        """
+        job = _Job(cv_text, user, client or self.client, on_update)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Scheduler sudah ditutup")
+            while self._queued >= self.max_queue:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise QueueFullError(f"Antrean penuh ({self.max_queue} request)")
+                self._condition.wait(remaining)
+            self._queues.setdefault(user, deque()).append(job)
+            self._queued += 1
+            self._start_workers()
+            self._condition.notify_all()
+        return job.future
+
+    def analyze(self, cv_text, user="default", client=None, on_update=None):
+        """Versi blocking dari submit(); raise OpenRouterError jika akhirnya gagal"""
+        return self.submit(cv_text, user, client, on_update=on_update).result()
+
+    def _next_job(self):
+        """Ambil job berikutnya secara round-robin antar user; None jika scheduler ditutup"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                now = time.monotonic()
+                earliest = None
+                for user in list(self._queues):
+                    queue = self._queues[user]
+                    job = queue[0]
+                    if job.not_before <= now:
+                        queue.popleft()
+                        # Pindahkan user ke belakang agar user lain dilayani berikutnya
+                        del self._queues[user]
+                        if queue:
+                            self._queues[user] = queue
+                        self._queued -= 1
+                        self._in_flight += 1
+                        job.dequeued_at = now
+                        self._condition.notify_all()
+                        return job
+                    earliest = job.not_before if earliest is None else min(earliest, job.not_before)
+                self._condition.wait(None if earliest is None else earliest - now)
+
+    def _requeue(self, job, delay):
+        with self._condition:
+            job.not_before = time.monotonic() + delay
+            self._queues.setdefault(job.user, deque()).appendleft(job)
+            self._queued += 1
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _finish(self, job, result=None, error=None):
+        with self._condition:
+            self._in_flight -= 1
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+        # Waktu dari submit sampai selesai, termasuk antrean dan retry
+        METRICS.observe("scheduler_total", time.monotonic() - job.submitted_at)
+        if error is None:
+            job.future.set_result(result)
+        else:
+            job.future.set_exception(error)
+
+    def _record_wait(self, job):
+        """Waktu antre sebelum request pertama dikirim (termasuk tertahan rate limit/breaker)"""
+        wait = job.dequeued_at - job.submitted_at
+        with self._condition:
+            self._wait_times.append(wait)
+        METRICS.observe("scheduler_wait", wait)
+
+    def _backoff(self, attempt):
+        """Exponential backoff dengan full jitter"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _worker_loop(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+
+            breaker = self._breaker(job.client.model)
+            wait = breaker.retry_in()
+            if wait > 0:
+                self._requeue(job, wait)
+                continue
+
+            wait = self.bucket.try_acquire()
+            if wait > 0:
+                breaker.release()
+                self._requeue(job, wait)
+                continue
+
+            job.attempts += 1
+            if job.attempts == 1:
+                self._record_wait(job)
+            try:
+                result = job.client._request_analysis(job.cv_text, job.on_update)
+            except OpenRouterError as e:
+                # Response yang gagal diparse sudah dicoba diperbaiki oleh client, tidak di-retry penuh
+                retryable = not isinstance(e, ResponseParseError) and (
+                    e.status_code is None or e.status_code in RETRYABLE_STATUS)
+                if e.status_code == 429:
+                    self.rate_limited += 1
+                    METRICS.incr("ai_rate_limited")
+                    self.bucket.pause(e.retry_after or self._backoff(job.attempts))
+                    # Rate limit bukan tanda model rusak: lepaskan izin probe half-open tanpa mencatat gagal
+                    breaker.release()
+                elif retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.release()
+
+                if retryable and job.attempts <= self.max_retries:
+                    self.retries += 1
+                    METRICS.incr("ai_retries")
+                    delay = e.retry_after if e.retry_after else self._backoff(job.attempts)
+                    self._requeue(job, delay)
+                else:
+                    self._finish(job, error=e)
+                continue
+            except Exception as e:
+                # Bug di callback/parser bukan tanda model rusak: jangan buka breaker
+                breaker.release()
+                self._finish(job, error=e)
+                continue
+
+            breaker.record_success()
+            self._finish(job, result=result)
+
+    def metrics(self):
+        """Snapshot metrik: kedalaman antrean, request berjalan, waktu tunggu, status breaker"""
+        with self._condition:
+            waits = sorted(self._wait_times)
+            queue_depth = self._queued
+            in_flight = self._in_flight
+        return {
+            "queue_depth": queue_depth,
+            "in_flight": in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+            "wait_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            "breakers": {model: breaker.state for model, breaker in self.breakers.items()},
+        }
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1)
@@ -0,0 +1,234 @@
+"""Scoring rule-based berbasis tabel aturan deklaratif (default: scoring_rules.json).
+
+Format (JSON atau YAML):
+    {
+        "version": "1",
+        "categories": {
+            "experience": {"max": 25, "rules": [
+                {"type": "term", "terms": ["year", "years"], "points": 2},
+                {"type": "term", "terms": ["%"], "sections": ["experience"], "points": 1,
+                 "per_occurrence": true, "max": 5}
+            ]},
+            "skills": {"max": 25, "rules": [{"type": "skill", "sections": ["skills"], "points": 1}]},
+            ...
+        }
+    }
+
+Jenis aturan:
+    section  `points` jika CV punya judul section `section`, `mention_points` jika hanya disebut
+    term     `points` jika salah satu `terms` muncul (atau per kemunculan dengan `per_occurrence`)
+    skill    `points` per skill taksonomi (unik) yang muncul
+`sections` membatasi aturan term/skill ke section tertentu (nama section di
+prompt_budget.SECTION_ALIASES, atau "other" untuk teks di luar judul section);
+`max` membatasi poin satu aturan.
+
+CV ditokenisasi sekali (`RuleEngine.tokenize`) menjadi array token beserta batas
+section (dari judul section). Term aturan dan skill taksonomi (termasuk yang
+terdiri dari beberapa kata) dikompilasi menjadi index n-gram per token pertama,
+sehingga semua aturan dinilai dalam satu kali iterasi atas array token.
+"""
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+from prompt_budget import SECTION_ALIASES, heading_section
+from taxonomy import SkillMatches
+
+DEFAULT_RULES_PATH = os.environ.get(
+    "CV_EVAL_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_rules.json")
+)
+
+OTHER_SECTION = "other"
+RULE_TYPES = ("section", "term", "skill")
+# Token: satu kata, atau satu karakter tanda baca (sehingga "c++", "node.js", "@", "%" bisa dicocokkan)
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def _normalize(term):
+    return " ".join(str(term).lower().split())
+
+
+class ScoringRules:
+    def __init__(self, categories, version="1", fingerprint=None):
+        self.categories = categories  # {kategori: {"max": ..., "rules": [...]}}
+        self.version = str(version)
+        if fingerprint is None:
+            fingerprint = hashlib.sha256(json.dumps(categories, sort_keys=True).encode("utf-8")).hexdigest()
+        self.fingerprint = fingerprint
+        self._engines = {}
+
+    @classmethod
+    def from_dict(cls, data, fingerprint=None):
+        """Validasi tabel aturan. Raise ValueError jika aturan tidak dikenal atau tidak lengkap"""
+        categories = data.get("categories")
+        if not isinstance(categories, dict) or not categories:
+            raise ValueError("Tabel aturan scoring harus punya 'categories'")
+        known_sections = set(SECTION_ALIASES) | {OTHER_SECTION}
+        for name, category in categories.items():
+            for index, rule in enumerate(category.get("rules", [])):
+                where = f"{name}.rules[{index}]"
+                if rule.get("type") not in RULE_TYPES:
+                    raise ValueError(f"{where}: type harus salah satu dari {', '.join(RULE_TYPES)}")
+                if rule["type"] == "section" and rule.get("section") not in SECTION_ALIASES:
+                    raise ValueError(f"{where}: section tidak dikenal: {rule.get('section')}")
+                if rule["type"] == "term" and not rule.get("terms"):
+                    raise ValueError(f"{where}: terms wajib diisi")
+                unknown = set(rule.get("sections") or ()) - known_sections
+                if unknown:
+                    raise ValueError(f"{where}: section tidak dikenal: {', '.join(sorted(unknown))}")
+        return cls(categories, data.get("version", "1"), fingerprint)
+
+    def engine(self, taxonomy):
+        """RuleEngine untuk taksonomi ini (index term dibangun sekali lalu dipakai ulang)"""
+        engine = self._engines.get(taxonomy.fingerprint)
+        if engine is None:
+            engine = self._engines[taxonomy.fingerprint] = RuleEngine(self, taxonomy)
+        return engine
+
+
+class TokenizedCV:
+    """Representasi CV untuk scoring: array token dan batas section (index token)"""
+
+    def __init__(self, tokens, sections):
+        self.tokens = tokens      # list token lowercase (kata atau satu karakter tanda baca)
+        self.sections = sections  # list (nama section, index token awal, index token akhir) urut posisi
+
+    @property
+    def headings(self):
+        return {name for name, _, _ in self.sections if name != OTHER_SECTION}
+
+
+def _tokens(text):
+    return _TOKEN.findall(text.lower())
+
+
+class RuleEngine:
+    def __init__(self, rules, taxonomy):
+        self.rules = rules
+        self.taxonomy = taxonomy
+        self._compiled = []     # (kategori, aturan) sesuai index aturan
+        self._skill_rules = []  # index aturan jenis skill
+        # term -> index aturan; skill taksonomi dipetakan lewat taxonomy.surfaces
+        term_rules = {}
+        for category, spec in rules.categories.items():
+            for rule in spec.get("rules", []):
+                index = len(self._compiled)
+                self._compiled.append((category, rule))
+                if rule["type"] == "skill":
+                    self._skill_rules.append(index)
+                    continue
+                terms = rule["terms"] if rule["type"] == "term" else SECTION_ALIASES[rule["section"]]
+                for term in {_normalize(term) for term in terms}:
+                    term_rules.setdefault(term, []).append(index)
+
+        # Index n-gram: token pertama -> [(token lengkap, index aturan, id skill)], n-gram terpanjang dulu
+        self._ngrams = {}
+        for term in set(term_rules) | set(taxonomy.surfaces):
+            term_tokens = tuple(_tokens(term))
+            if term_tokens:
+                self._ngrams.setdefault(term_tokens[0], []).append(
+                    (term_tokens, term_rules.get(term, ()), taxonomy.surfaces.get(term)))
+        for candidates in self._ngrams.values():
+            candidates.sort(key=lambda candidate: -len(candidate[0]))
+
+    def tokenize(self, text):
+        """Pecah teks menjadi token sekali jalan dan catat batas section dari judul section"""
+        tokens, sections = [], []
+        section, section_start = OTHER_SECTION, 0
+        for line in text.splitlines():
+            line_tokens = _tokens(line)
+            if not line_tokens:
+                continue
+            heading = heading_section(" ".join(line.split())) if len(line_tokens) <= 8 else None
+            if heading:
+                if len(tokens) > section_start:
+                    sections.append((section, section_start, len(tokens)))
+                section, section_start = heading, len(tokens)
+            tokens.extend(line_tokens)
+        if len(tokens) > section_start:
+            sections.append((section, section_start, len(tokens)))
+        return TokenizedCV(tokens, sections)
+
+    def score(self, document):
+        """Nilai CV yang sudah ditokenisasi dalam satu kali iterasi token.
+
+        Return (skor per kategori, SkillMatches seluruh CV).
+        """
+        ngrams, compiled, skills = self._ngrams, self._compiled, self.taxonomy.skills
+        counts = [0] * len(compiled)
+        rule_skills = {index: set() for index in self._skill_rules}
+        skill_occurrences = []
+
+        tokens, sections = document.tokens, document.sections
+        section_index = 0
+        section, section_end = (sections[0][0], sections[0][2]) if sections else (OTHER_SECTION, 0)
+        for position, token in enumerate(tokens):
+            candidates = ngrams.get(token)
+            if candidates is None:
+                continue
+            while position >= section_end:
+                section_index += 1
+                section, _, section_end = sections[section_index]
+            for term_tokens, rule_indices, skill_id in candidates:
+                length = len(term_tokens)
+                if length > 1 and tuple(tokens[position:position + length]) != term_tokens:
+                    continue
+                for index in rule_indices:
+                    allowed = compiled[index][1].get("sections")
+                    if not allowed or section in allowed:
+                        counts[index] += 1
+                if skill_id is not None:
+                    skill = skills[skill_id]
+                    skill_occurrences.append((skill, position, position + length))
+                    for index in self._skill_rules:
+                        allowed = compiled[index][1].get("sections")
+                        if not allowed or section in allowed:
+                            rule_skills[index].add(skill)
+
+        totals = {category: 0.0 for category in self.rules.categories}
+        headings = document.headings
+        for index, (category, rule) in enumerate(compiled):
+            points = rule.get("points", 0)
+            if rule["type"] == "section":
+                if rule["section"] in headings:
+                    earned = points
+                else:
+                    earned = rule.get("mention_points", 0) if counts[index] else 0
+            elif rule["type"] == "skill":
+                earned = points * len(rule_skills[index])
+            elif rule.get("per_occurrence"):
+                earned = points * counts[index]
+            else:
+                earned = points if counts[index] else 0
+            if rule.get("max") is not None:
+                earned = min(earned, rule["max"])
+            totals[category] += earned
+
+        scores = {
+            category: int(min(round(total), self.rules.categories[category].get("max", 25)))
+            for category, total in totals.items()
+        }
+        return scores, SkillMatches(skill_occurrences)
+
+
+@lru_cache(maxsize=8)
+def _load_rules(path, mtime):
+    with open(path, "rb") as f:
+        raw = f.read()
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt in ("yaml", "yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML diperlukan untuk memuat aturan scoring YAML: pip install pyyaml")
+        data = yaml.safe_load(raw)
+    else:
+        data = json.loads(raw)
+    return ScoringRules.from_dict(data, fingerprint=hashlib.sha256(raw).hexdigest())
+
+
+def load_rules(path=DEFAULT_RULES_PATH):
+    """Muat tabel aturan scoring dari file (dipakai ulang selama file tidak berubah)"""
+    return _load_rules(os.path.abspath(path), os.path.getmtime(path))
@@ -0,0 +1,268 @@
+"""Service HTTP untuk scoring CV, terpisah dari UI Streamlit.
+
+Menjalankan service:
+    python service.py --host 0.0.0.0 --port 8000 --workers 8
+
+Endpoint:
+    POST /jobs                 Body PDF mentah (Content-Type: application/pdf) atau multipart
+                               field "file". Query opsional: model, user. Header opsional
+                               X-OpenRouter-Key (default: env OPENROUTER_API_KEY).
+                               -> 202 {"job_id": ..., "status": "queued"}
+    GET  /jobs/{job_id}        Status dan hasil job. Query `wait=<detik>` untuk long-polling.
+    GET  /jobs/{job_id}/events Server-sent events berisi status job sampai selesai.
+    GET  /health               Jumlah job berjalan/antre.
+    GET  /metrics              Timer per tahap dan counter dalam format teks Prometheus.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from cache import ResultCache
+from evaluator import INTERACTIVE_MAX_CHARS, INTERACTIVE_MAX_PAGES, CVEvaluator, OpenRouterClient
+from metrics import METRICS
+from ocr import PageOCR, ocr_available
+from scheduler import RequestScheduler
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # Sama dengan batas uploader di UI
+DEFAULT_MODEL = os.environ.get("CV_EVAL_MODEL", "openai/gpt-4o-mini")
+
+
+def serialize_error(error):
+    return {
+        "type": type(error).__name__,
+        "message": str(error),
+        "status_code": getattr(error, "status_code", None),
+    }
+
+
+class ScoringJob:
+    def __init__(self, pdf_bytes, model, user, api_key):
+        self.job_id = uuid.uuid4().hex
+        self.pdf_bytes = pdf_bytes
+        self.model = model
+        self.user = user
+        self.api_key = api_key
+        self.status = "queued"
+        self.evaluation = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    def to_dict(self):
+        data = {"job_id": self.job_id, "status": self.status, "created_at": self.created_at,
+                "finished_at": self.finished_at}
+        if self.evaluation is not None:
+            data["source"] = self.evaluation.source
+            data["results"] = self.evaluation.results
+            data["errors"] = [serialize_error(e) for e in self.evaluation.errors]
+            data["timings"] = self.evaluation.timings
+        if self.error is not None:
+            data["errors"] = [serialize_error(self.error)]
+        return data
+
+
+class ScoringService:
+    def __init__(self, workers=8, max_pending=200, job_ttl=3600, api_key=None, cache_path=None,
+                 max_pages=INTERACTIVE_MAX_PAGES, max_chars=INTERACTIVE_MAX_CHARS):
+        self.max_pending = max_pending
+        # Batas ekstraksi per upload agar PDF ratusan halaman tidak diparse (dan di-OCR) seluruhnya
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.job_ttl = job_ttl
+        self.api_key = api_key or os.environ.get("OPENROUTER_API_KEY")
+        self.cache = ResultCache(cache_path) if cache_path else ResultCache()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cv-scoring")
+        self.jobs = {}
+        self.pending = 0
+        self._evaluators = {}
+        self._schedulers = {}
+        # Satu process pool OCR untuk semua evaluator (False = OCR nonaktif)
+        self.ocr = PageOCR(cache=self.cache) if ocr_available() else False
+
+    def _evaluator(self, api_key, model):
+        """Evaluator per (API key, model); scheduler dipakai bersama per API key"""
+        key = (api_key, model if api_key else None)
+        if key not in self._evaluators:
+            client, scheduler = None, None
+            if api_key:
+                client = OpenRouterClient(api_key, model)
+                if api_key not in self._schedulers:
+                    self._schedulers[api_key] = RequestScheduler(OpenRouterClient(api_key))
+                scheduler = self._schedulers[api_key]
+            self._evaluators[key] = CVEvaluator(client, cache=self.cache, scheduler=scheduler, ocr=self.ocr,
+                                                max_pages=self.max_pages, max_chars=self.max_chars)
+        return self._evaluators[key]
+
+    def submit(self, pdf_bytes, model=None, user="default", api_key=None):
+        """Daftarkan job baru; return None jika antrean penuh"""
+        if self.pending >= self.max_pending:
+            return None
+        self._expire_jobs()
+        job = ScoringJob(pdf_bytes, model or DEFAULT_MODEL, user, api_key or self.api_key)
+        self.jobs[job.job_id] = job
+        self.pending += 1
+        asyncio.get_running_loop().create_task(self._run(job))
+        return job
+
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+        try:
+            evaluator = self._evaluator(job.api_key, job.model)
+            job.status = "running"
+            job.evaluation = await loop.run_in_executor(
+                self.executor, evaluator.evaluate, io.BytesIO(job.pdf_bytes), job.user
+            )
+            job.status = "done" if job.evaluation.results is not None else "failed"
+        except Exception as e:
+            job.error = e
+            job.status = "failed"
+        finally:
+            job.pdf_bytes = None
+            job.finished_at = time.time()
+            # Termasuk waktu antre di executor
+            METRICS.observe("job_total", job.finished_at - job.created_at)
+            self.pending -= 1
+            job.done.set()
+
+    def _expire_jobs(self):
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job.finished_at and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for scheduler in self._schedulers.values():
+            scheduler.close()
+        if self.ocr:
+            self.ocr.close()
+        self.cache.flush()
+
+
+def create_app(service=None):
+    service = service or ScoringService()
+
+    async def submit_job(request):
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None:
+                return JSONResponse({"error": "Field 'file' wajib diisi"}, status_code=400)
+            pdf_bytes = await upload.read()
+        else:
+            pdf_bytes = await request.body()
+
+        if not pdf_bytes:
+            return JSONResponse({"error": "Body PDF kosong"}, status_code=400)
+        if len(pdf_bytes) > MAX_UPLOAD_BYTES:
+            return JSONResponse({"error": "Ukuran file melebihi 10MB"}, status_code=413)
+
+        job = service.submit(
+            pdf_bytes,
+            model=request.query_params.get("model"),
+            user=request.query_params.get("user", request.client.host if request.client else "default"),
+            api_key=request.headers.get("x-openrouter-key"),
+        )
+        if job is None:
+            return JSONResponse({"error": "Antrean penuh, coba lagi nanti"}, status_code=503,
+                                headers={"Retry-After": "5"})
+        return JSONResponse({"job_id": job.job_id, "status": job.status}, status_code=202)
+
+    async def get_job(request):
+        job = service.jobs.get(request.path_params["job_id"])
+        if job is None:
+            return JSONResponse({"error": "Job tidak ditemukan"}, status_code=404)
+        try:
+            wait = float(request.query_params.get("wait", 0))
+        except ValueError:
+            wait = math.nan
+        if math.isnan(wait):
+            return JSONResponse({"error": "Parameter 'wait' harus berupa angka detik"}, status_code=400)
+        # Nilai negatif berarti tidak menunggu; maksimal 60 detik
+        wait = min(max(wait, 0.0), 60.0)
+        if wait > 0:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return JSONResponse(job.to_dict())
+
+    async def job_events(request):
+        job = service.jobs.get(request.path_params["job_id"])
+        if job is None:
+            return JSONResponse({"error": "Job tidak ditemukan"}, status_code=404)
+
+        async def stream():
+            last_status = None
+            while True:
+                if job.status != last_status:
+                    last_status = job.status
+                    yield f"event: status\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+                if job.done.is_set():
+                    return
+                try:
+                    await asyncio.wait_for(job.done.wait(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    async def health(request):
+        return JSONResponse({"status": "ok", "pending": service.pending, "jobs": len(service.jobs)})
+
+    async def metrics(request):
+        return PlainTextResponse(METRICS.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        service.close()
+
+    app = Starlette(
+        routes=[
+            Route("/jobs", submit_job, methods=["POST"]),
+            Route("/jobs/{job_id}", get_job, methods=["GET"]),
+            Route("/jobs/{job_id}/events", job_events, methods=["GET"]),
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.service = service
+    return app
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Service HTTP scoring CV")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="Jumlah worker evaluasi")
+    parser.add_argument("--max-pending", type=int, default=200, help="Batas job antre + berjalan")
+    parser.add_argument("--cache", default=None, help="Path cache SQLite hasil evaluasi")
+    parser.add_argument("--max-pages", type=int, default=INTERACTIVE_MAX_PAGES,
+                        help="Batas halaman yang diekstrak per CV (default env CV_EVAL_MAX_PAGES atau 10, 0 = tanpa batas)")
+    parser.add_argument("--max-chars", type=int, default=INTERACTIVE_MAX_CHARS,
+                        help="Batas karakter yang diekstrak per CV (default env CV_EVAL_MAX_CHARS atau 50000, 0 = tanpa batas)")
+    args = parser.parse_args(argv)
+
+    service = ScoringService(workers=args.workers, max_pending=args.max_pending, cache_path=args.cache,
+                             max_pages=args.max_pages or None, max_chars=args.max_chars or None)
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
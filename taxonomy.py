@@ -0,0 +1,235 @@
+"""Taksonomi role dan skill yang dimuat dari file eksternal (JSON, YAML, atau CSV).
+
+Format JSON/YAML:
+    {
+        "roles": {"Data Analyst": ["python", "sql", ...], ...},
+        "synonyms": {"power bi": ["powerbi"], ...}
+    }
+
+Format CSV (satu baris per pasangan role-skill, sinonim dipisah "|"):
+    role,skill,synonyms
+    Data Analyst,power bi,powerbi|power-bi
+
+Taksonomi dikompilasi menjadi inverted index (skill -> role) dan matriks
+sparse role x skill (format CSR dengan array NumPy), sehingga ranking semua
+role terhadap skill yang terdeteksi cukup satu operasi vektor. Hasil kompilasi
+di-cache ke disk (.npz) berdasarkan hash isi file taksonomi.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+DEFAULT_TAXONOMY_PATH = os.environ.get(
+    "CV_EVAL_TAXONOMY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "role_skills.json")
+)
+# Relatif terhadap direktori modul agar app, batch, dan service memakai cache yang sama dari CWD mana pun
+DEFAULT_INDEX_DIR = os.environ.get(
+    "CV_EVAL_TAXONOMY_INDEX", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "taxonomy")
+)
+
+# Naikkan jika format index hasil kompilasi berubah
+INDEX_FORMAT_VERSION = "1"
+
+
+def _normalize(name):
+    return " ".join(str(name).lower().split())
+
+
+def parse_taxonomy(data, fmt):
+    """Parse isi file taksonomi menjadi (roles, synonyms)"""
+    if fmt == "csv":
+        roles, synonyms = {}, {}
+        for row in csv.DictReader(io.StringIO(data)):
+            skill = _normalize(row["skill"])
+            roles.setdefault(row["role"].strip(), []).append(skill)
+            for synonym in (row.get("synonyms") or "").split("|"):
+                if synonym.strip():
+                    synonyms.setdefault(skill, []).append(synonym)
+        return roles, synonyms
+
+    if fmt in ("yaml", "yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML diperlukan untuk memuat taksonomi YAML: pip install pyyaml")
+        raw = yaml.safe_load(data)
+    else:
+        raw = json.loads(data)
+    return raw.get("roles", {}), raw.get("synonyms", {})
+
+
+class SkillMatches:
+    """Hasil pencocokan skill: daftar kemunculan (skill, start, end) dalam urutan posisi
+
+    Posisi adalah index token CV (lihat scoring_rules.RuleEngine).
+    """
+
+    def __init__(self, occurrences):
+        self.occurrences = occurrences
+        self.counts = {}
+        for skill, _, _ in occurrences:
+            self.counts[skill] = self.counts.get(skill, 0) + 1
+
+    @property
+    def skills(self):
+        """Skill unik, urut berdasarkan frekuensi lalu kemunculan pertama"""
+        return sorted(self.counts, key=lambda skill: -self.counts[skill])
+
+    def __contains__(self, skill):
+        return skill in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class Taxonomy:
+    def __init__(self, roles, skills, surfaces, role_indptr, role_skill_indices,
+                 skill_indptr, skill_role_indices, fingerprint):
+        self.roles = roles                              # nama role, index = id role
+        self.skills = skills                            # nama skill kanonik, index = id skill
+        self.surfaces = surfaces                        # bentuk teks (skill + sinonim) -> id skill
+        self.role_indptr = role_indptr                  # CSR role x skill
+        self.role_skill_indices = role_skill_indices
+        self.skill_indptr = skill_indptr                # inverted index skill -> role (CSC)
+        self.skill_role_indices = skill_role_indices
+        self.role_sizes = np.diff(role_indptr)
+        self.fingerprint = fingerprint
+        self._skill_ids = {skill: index for index, skill in enumerate(skills)}
+
+    @classmethod
+    def from_dict(cls, roles, synonyms=None, fingerprint=None):
+        """Kompilasi taksonomi dari dict {role: [skill, ...]} dan {skill: [sinonim, ...]}"""
+        synonyms = synonyms or {}
+        role_names, role_skill_sets = [], []
+        for role, role_skills in roles.items():
+            skills = sorted({_normalize(skill) for skill in role_skills if str(skill).strip()})
+            if skills:
+                role_names.append(role)
+                role_skill_sets.append(skills)
+
+        skills = sorted({skill for skill_set in role_skill_sets for skill in skill_set})
+        skill_ids = {skill: index for index, skill in enumerate(skills)}
+        surfaces = {skill: skill_ids[skill] for skill in skills}
+        for skill, aliases in synonyms.items():
+            skill = _normalize(skill)
+            if skill in skill_ids:
+                for alias in aliases:
+                    surfaces.setdefault(_normalize(alias), skill_ids[skill])
+
+        # CSR disusun langsung dari array NumPy (bukan scipy.sparse, walaupun scipy dipakai job_matching.py):
+        # matriksnya kecil, scoring cukup dengan np.add.reduceat, dan array-nya langsung disimpan ke .npz
+        role_indptr = np.zeros(len(role_names) + 1, dtype=np.int64)
+        role_indptr[1:] = np.cumsum([len(skill_set) for skill_set in role_skill_sets])
+        role_skill_indices = np.fromiter(
+            (skill_ids[skill] for skill_set in role_skill_sets for skill in skill_set),
+            dtype=np.int64, count=int(role_indptr[-1])
+        )
+
+        # Transpose CSR -> inverted index skill -> role
+        role_of_entry = np.repeat(np.arange(len(role_names), dtype=np.int64), np.diff(role_indptr))
+        order = np.argsort(role_skill_indices, kind="stable")
+        skill_role_indices = role_of_entry[order]
+        skill_indptr = np.zeros(len(skills) + 1, dtype=np.int64)
+        skill_indptr[1:] = np.cumsum(np.bincount(role_skill_indices, minlength=len(skills)))
+
+        if fingerprint is None:
+            fingerprint = hashlib.sha256(
+                json.dumps([roles, synonyms], sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        return cls(role_names, skills, surfaces, role_indptr, role_skill_indices,
+                   skill_indptr, skill_role_indices, fingerprint)
+
+    @cached_property
+    def role_skills(self):
+        """Taksonomi dalam bentuk dict {role: [skill, ...]}"""
+        return {
+            role: [self.skills[i] for i in self.role_skill_indices[self.role_indptr[r]:self.role_indptr[r + 1]]]
+            for r, role in enumerate(self.roles)
+        }
+
+    def skill_ids(self, skill_matches):
+        return np.fromiter((self._skill_ids[skill] for skill in skill_matches.counts),
+                           dtype=np.int64, count=len(skill_matches))
+
+    def roles_for_skill(self, skill):
+        """Daftar role yang membutuhkan skill (lookup inverted index)"""
+        skill_id = self._skill_ids.get(_normalize(skill))
+        if skill_id is None:
+            return []
+        start, end = self.skill_indptr[skill_id], self.skill_indptr[skill_id + 1]
+        return [self.roles[r] for r in self.skill_role_indices[start:end]]
+
+    def role_match_counts(self, skill_matches):
+        """Jumlah skill yang cocok untuk setiap role, dihitung sekaligus untuk semua role"""
+        detected = np.zeros(len(self.skills), dtype=np.int64)
+        detected[self.skill_ids(skill_matches)] = 1
+        if not len(self.roles):
+            return np.zeros(0, dtype=np.int64)
+        return np.add.reduceat(detected[self.role_skill_indices], self.role_indptr[:-1])
+
+    def rank_roles(self, skill_matches, top_k=3):
+        """Ranking semua role berdasarkan persentase skill yang cocok"""
+        counts = self.role_match_counts(skill_matches)
+        percentages = np.minimum(counts / np.maximum(self.role_sizes, 1) * 100, 100)
+        candidates = np.flatnonzero(counts)
+        order = candidates[np.lexsort((-counts[candidates], -percentages[candidates]))][:top_k]
+        return [(self.roles[r], int(counts[r]), float(percentages[r])) for r in order]
+
+    def save_index(self, path):
+        """Simpan index hasil kompilasi ke file .npz (atomic, aman untuk banyak proses)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        names = json.dumps({"roles": self.roles, "skills": self.skills, "surfaces": self.surfaces,
+                            "fingerprint": self.fingerprint})
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, names=np.array(names), role_indptr=self.role_indptr,
+                     role_skill_indices=self.role_skill_indices, skill_indptr=self.skill_indptr,
+                     skill_role_indices=self.skill_role_indices)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_index(cls, path):
+        with np.load(path) as data:
+            names = json.loads(str(data["names"]))
+            return cls(names["roles"], names["skills"], names["surfaces"], data["role_indptr"],
+                       data["role_skill_indices"], data["skill_indptr"], data["skill_role_indices"],
+                       names["fingerprint"])
+
+
+@lru_cache(maxsize=8)
+def _load_taxonomy(path, mtime, index_dir):
+    with open(path, "rb") as f:
+        raw = f.read()
+    fingerprint = hashlib.sha256(raw).hexdigest()
+    index_path = os.path.join(index_dir, f"{fingerprint[:32]}-v{INDEX_FORMAT_VERSION}.npz") if index_dir else None
+
+    if index_path and os.path.exists(index_path):
+        try:
+            taxonomy = Taxonomy.load_index(index_path)
+        except (OSError, ValueError, KeyError):
+            pass  # Index rusak, kompilasi ulang
+        else:
+            if taxonomy.fingerprint == fingerprint:
+                return taxonomy
+
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    roles, synonyms = parse_taxonomy(raw.decode("utf-8"), fmt)
+    taxonomy = Taxonomy.from_dict(roles, synonyms, fingerprint=fingerprint)
+    if index_path:
+        try:
+            taxonomy.save_index(index_path)
+        except OSError:
+            pass  # Cache index hanya optimasi
+    return taxonomy
+
+
+def load_taxonomy(path=DEFAULT_TAXONOMY_PATH, index_dir=DEFAULT_INDEX_DIR):
+    """Muat taksonomi dari file; index yang sudah dikompilasi dipakai ulang dari disk/memori"""
+    return _load_taxonomy(os.path.abspath(path), os.path.getmtime(path), index_dir)
@@ -0,0 +1,41 @@
+import json
+import os
+
+from batch import BatchEvaluator, main, scoring_model
+from benchmarks.corpus import generate_cv_corpus
+
+
+def test_scoring_model_from_store_version():
+    assert scoring_model("ai:openai/gpt-4o-mini:3", {}) == "openai/gpt-4o-mini"
+    assert scoring_model("ai:meta-llama/llama-3.1-8b-instruct:free:3", {}) == "meta-llama/llama-3.1-8b-instruct:free"
+    assert scoring_model("rule-based:3-abc-def", {}) is None
+    assert scoring_model("cascade:...", {"cascade_tier": "anthropic/claude-3.5-sonnet"}) == "anthropic/claude-3.5-sonnet"
+    assert scoring_model("cascade:...", {"cascade_tier": "rule-based"}) is None
+
+
+def test_rule_based_run_yields_one_record_per_pdf(tmp_path):
+    corpus = generate_cv_corpus(str(tmp_path), page_counts=(1, 3), documents_per_size=2)
+    batch = BatchEvaluator(workers=2, max_in_flight=2)
+    records = list(batch.run([str(tmp_path)]))
+
+    assert sorted(record["path"] for record in records) == sorted(doc["path"] for doc in corpus)
+    assert (batch.processed, batch.failed, batch.skipped) == (len(corpus), 0, 0)
+    for record in records:
+        assert record["status"] == "ok" and record["source"] == "rule-based" and record["model"] is None
+        assert 0 <= record["results"]["overall_score"] <= 100
+        assert set(record["results"]["section_scores"]) == {"structure", "experience", "skills", "branding"}
+        assert record["elapsed"] > 0
+
+
+def test_main_writes_jsonl_and_reports_failures(tmp_path):
+    generate_cv_corpus(str(tmp_path), page_counts=(1,), languages=("id",), documents_per_size=2)
+    (tmp_path / "rusak.pdf").write_bytes(b"bukan pdf")
+    output = tmp_path / "hasil.jsonl"
+
+    assert main([str(tmp_path), "--workers", "2", "--output", str(output)]) == 1
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 3
+    by_name = {os.path.basename(record["path"]): record for record in records}
+    assert by_name["rusak.pdf"]["status"] == "failed" and by_name["rusak.pdf"]["error"]
+    assert all(record["status"] == "ok" for name, record in by_name.items() if name != "rusak.pdf")
@@ -0,0 +1,59 @@
+import sqlite3
+
+from cache import ResultCache
+
+
+def count_writes(cache):
+    """Hitung statement tulis yang dijalankan lewat koneksi cache"""
+    writes = []
+    cache._conn.set_trace_callback(
+        lambda sql: writes.append(sql) if sql.lstrip().upper().startswith(("UPDATE", "DELETE", "INSERT")) else None
+    )
+    return writes
+
+
+def test_get_does_not_write_until_flush(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), flush_interval=3600)
+    cache.put("result:a", {"score": 1})
+    writes = count_writes(cache)
+
+    for _ in range(50):
+        assert cache.get("result:a") == {"score": 1}
+    assert cache.get("result:missing") is None
+    assert writes == []
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (50, 1)
+    assert len(writes) == 3  # satu UPDATE accessed_at, satu UPDATE stats per counter (hits, misses)
+    cache.close()
+
+
+def test_close_flushes_pending_stats(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(path, flush_interval=3600)
+    cache.put("result:a", 1)
+    cache.get("result:a")
+    cache.close()
+
+    with sqlite3.connect(path) as conn:
+        assert dict(conn.execute("SELECT name, value FROM stats")) == {"hits": 1, "misses": 0}
+
+
+def test_eviction_uses_buffered_access_times(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), max_bytes=100, flush_interval=3600)
+    cache.put("result:old", "x" * 40)
+    cache.put("result:new", "y" * 40)
+    cache.get("result:old")  # old jadi yang terakhir diakses, tapi waktu aksesnya masih ditampung
+    cache.put("result:third", "z" * 40)
+
+    assert cache.get("result:old") == "x" * 40
+    assert cache.get("result:new") is None
+    assert cache.stats()["bytes"] <= 100
+    cache.close()
+
+
+def test_created_at_is_indexed(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    plan = cache._conn.execute("EXPLAIN QUERY PLAN DELETE FROM entries WHERE created_at < 0").fetchall()
+    assert any("idx_entries_created" in row[-1] for row in plan)
+    cache.close()
@@ -0,0 +1,78 @@
+import pytest
+
+from cascade import RULE_BASED, CascadeTier, ModelCascade, parse_tier_spec
+
+
+class FakeClient:
+    model_info = {}
+
+    def __init__(self, model, score=None, error=None):
+        self.model = model
+        self.score = score
+        self.error = error
+        self.calls = 0
+
+    def _build_payload(self, text):
+        return {"messages": [{"content": text}]}
+
+    def analyze_cv_with_ai(self, text):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return {"overall_score": self.score}
+
+
+class FakeEvaluator:
+    rules_version = "test"
+
+    def __init__(self, score):
+        self.score = score
+
+    def fallback_analysis(self, text):
+        return {"overall_score": self.score}
+
+
+def test_parse_tier_spec():
+    tier = parse_tier_spec("rule-based:45-70:80")
+    assert (tier.name, tier.client, tier.borderline, tier.top) == (RULE_BASED, None, (45.0, 70.0), 80.0)
+
+    tier = parse_tier_spec("meta-llama/llama-3.1-8b-instruct::85", api_key="key")
+    assert tier.client.model == "meta-llama/llama-3.1-8b-instruct"
+    assert (tier.borderline, tier.top) == (None, 85.0)
+
+    tier = parse_tier_spec("anthropic/claude-3.5-sonnet", api_key="key")
+    assert (tier.borderline, tier.top) == (None, None)
+
+
+@pytest.mark.parametrize("score, escalate", [(40, False), (45, True), (70, True), (75, False), (80, True)])
+def test_should_escalate_borderline_and_top(score, escalate):
+    assert CascadeTier("x", borderline=(45, 70), top=80).should_escalate(score) is escalate
+
+
+def test_only_escalated_cvs_reach_the_next_tier():
+    strong = FakeClient("strong/model", score=90)
+    cascade = ModelCascade([CascadeTier(RULE_BASED, borderline=(45, 70)), CascadeTier("strong/model", strong)],
+                           FakeEvaluator(score=30))
+
+    assert cascade.evaluate_text("cv") == {"overall_score": 30, "cascade_tier": RULE_BASED}
+    assert strong.calls == 0
+
+    cascade.evaluator.score = 60
+    assert cascade.evaluate_text("cv") == {"overall_score": 90, "cascade_tier": "strong/model"}
+    assert strong.calls == 1
+
+    report = {row["tier"]: row for row in cascade.report()}
+    assert (report[RULE_BASED]["calls"], report[RULE_BASED]["escalated"]) == (2, 1)
+    assert report["strong/model"]["calls"] == 1
+
+
+def test_failed_later_tier_keeps_previous_result_but_first_tier_failure_raises():
+    failing = FakeClient("strong/model", error=RuntimeError("down"))
+    cascade = ModelCascade([CascadeTier(RULE_BASED, top=50), CascadeTier("strong/model", failing)],
+                           FakeEvaluator(score=60))
+    assert cascade.evaluate_text("cv")["cascade_tier"] == RULE_BASED
+    assert {row["tier"]: row["failures"] for row in cascade.report()} == {RULE_BASED: 0, "strong/model": 1}
+
+    cascade = ModelCascade([CascadeTier("strong/model", failing)], FakeEvaluator(score=60))
+    with pytest.raises(RuntimeError):
+        cascade.evaluate_text("cv")
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from dedup import NearDuplicateIndex, shingle_hashes
+
+WORDS = ("python sql tableau analisis data penjualan dashboard laporan tim proyek kubernetes "
+         "docker golang microservice marketing konten desain figma riset pengguna akuntansi pajak").split()
+
+
+def cv_text(seed, length=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def edited(text, every=50):
+    """Salinan dengan sedikit kata diganti (mis. nama dan nomor telepon)"""
+    words = text.split()
+    return " ".join("diganti" if i % every == 0 else word for i, word in enumerate(words))
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "dedup.sqlite3"), threshold=0.7)
+    yield index
+    index.close()
+
+
+def test_shingle_hashes_are_case_insensitive_and_handle_short_text():
+    assert set(shingle_hashes("Data Analyst SQL")) == set(shingle_hashes("data analyst sql"))
+    assert len(shingle_hashes("dua kata")) == 1
+    assert len(shingle_hashes("")) == 0
+
+
+def test_near_duplicates_join_the_first_cv_cluster(index):
+    original, other = cv_text(1), cv_text(2)
+    assert index.add("a.pdf", original) == ("a.pdf", 1.0)
+    cluster, similarity = index.add("b.pdf", edited(original))
+    assert cluster == "a.pdf" and similarity >= 0.7
+    assert index.add("c.pdf", other)[0] == "c.pdf"
+
+    assert index.members("a.pdf") == ["a.pdf", "b.pdf"]
+    assert index.stats() == {"documents": 3, "clusters": 2}
+    assert {match[0] for match in index.query(edited(original, every=40))} == {"a.pdf", "b.pdf"}
+
+
+def test_re_adding_keeps_cluster_and_empty_text_is_its_own_cluster(index):
+    index.add("a.pdf", cv_text(1))
+    index.add("b.pdf", edited(cv_text(1)))
+    assert index.add("b.pdf", cv_text(2))[0] == "a.pdf"
+    assert index.add("kosong.pdf", "") == ("kosong.pdf", 1.0)
+    assert index.query("") == []
+
+
+def test_clusters_persist_and_params_are_checked(tmp_path):
+    path = str(tmp_path / "dedup.sqlite3")
+    index = NearDuplicateIndex(path, threshold=0.7)
+    index.add("a.pdf", cv_text(1))
+    index.close()
+
+    index = NearDuplicateIndex(path, threshold=0.7)
+    assert index.add("b.pdf", edited(cv_text(1)))[0] == "a.pdf"
+    index.close()
+
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(path, num_perm=64, bands=8)
@@ -0,0 +1,62 @@
+import random
+import time
+
+import pytest
+
+from benchmarks.mock_openrouter import MockOpenRouter, sample_analysis
+from errors import OpenRouterError
+from evaluator import OpenRouterClient
+from response_parser import validate_analysis
+
+TEXTS = [f"CV kandidat {i}: pengalaman {i} tahun sebagai data analyst dengan SQL dan Python" for i in range(8)]
+
+
+def make_client(mock, **kwargs):
+    return OpenRouterClient("test-key", "test/model", base_url=mock.url, **kwargs)
+
+
+def expected_result(client, text):
+    return validate_analysis(sample_analysis(client._build_payload(text)["messages"][-1]["content"]))
+
+
+def test_analyze_many_returns_one_result_per_cv_and_overlaps_requests():
+    latency = 0.3
+    with MockOpenRouter(latency=latency, tokens_per_second=1e6) as mock:
+        client = make_client(mock, max_concurrency=len(TEXTS))
+        start = time.perf_counter()
+        outcomes = list(client.analyze_many(TEXTS))
+        elapsed = time.perf_counter() - start
+
+    assert sorted(index for index, _, _ in outcomes) == list(range(len(TEXTS)))
+    results = {index: result for index, result, error in outcomes if error is None}
+    assert [results[i] for i in range(len(TEXTS))] == [expected_result(client, text) for text in TEXTS]
+    # Serial: len(TEXTS) * latency = 2.4 detik
+    assert elapsed < len(TEXTS) * latency / 2
+
+
+def test_analyze_many_reports_errors_per_item():
+    error_rate, seed = 0.4, 3
+    rng = random.Random(seed)
+    expected_failures = sum(rng.random() < error_rate for _ in TEXTS)
+    assert 0 < expected_failures < len(TEXTS)
+
+    with MockOpenRouter(latency=0.05, tokens_per_second=1e6, error_rate=error_rate, seed=seed) as mock:
+        client = make_client(mock)
+        outcomes = list(client.analyze_many(TEXTS))
+
+    assert len(outcomes) == len(TEXTS)
+    failed = [(index, error) for index, result, error in outcomes if error is not None]
+    assert len(failed) == expected_failures
+    assert all(isinstance(error, OpenRouterError) and error.status_code == 503 for _, error in failed)
+    for index, result, error in outcomes:
+        if error is None:
+            assert result == expected_result(client, TEXTS[index])
+
+
+def test_request_timeout_becomes_item_error():
+    with MockOpenRouter(latency=1.0) as mock:
+        client = make_client(mock, timeout=0.1)
+        outcomes = list(client.analyze_many(TEXTS[:3]))
+
+    assert sorted(index for index, _, _ in outcomes) == [0, 1, 2]
+    assert all(result is None and isinstance(error, OpenRouterError) for _, result, error in outcomes)
@@ -0,0 +1,111 @@
+import io
+
+import pytest
+
+import extractors
+from benchmarks.corpus import generate_cv_pdf
+from extractors import Extractor, PDFExtractionError, extract_text
+
+TEXT = "Pengalaman kerja sebagai data analyst dengan SQL, Python dan Tableau selama lima tahun.\n"
+
+
+def fake_backend(pages=None, error=None, consumed=None):
+    def iter_pages(source):
+        if error:
+            raise error
+        for page in pages:
+            if consumed is not None:
+                consumed.append(page)
+            yield page
+    return iter_pages
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    """Ganti registry dengan backend palsu; return fungsi untuk mendaftarkannya sesuai prioritas"""
+    registry = {}
+    monkeypatch.setattr(extractors, "EXTRACTORS", registry)
+    monkeypatch.delenv("CV_EVAL_PDF_BACKENDS", raising=False)
+
+    def register(name, iter_pages):
+        registry[name] = Extractor(name, len(registry), iter_pages)
+    return register
+
+
+def test_falls_back_when_first_backend_raises(backends):
+    backends("rusak", fake_backend(error=ValueError("PDF rusak")))
+    backends("cadangan", fake_backend([TEXT]))
+    assert extract_text("cv.pdf") == (TEXT, "cadangan")
+
+
+def test_falls_back_when_first_backend_returns_too_little_text(backends):
+    backends("kosong", fake_backend(["", " \n"]))
+    backends("cadangan", fake_backend([TEXT]))
+    assert extract_text("cv.pdf") == (TEXT, "cadangan")
+
+
+def test_longest_short_result_wins_and_all_errors_are_reported(backends):
+    backends("pendek", fake_backend(["ab"]))
+    backends("lebih panjang", fake_backend(["abc def"]))
+    backends("rusak", fake_backend(error=ValueError("x")))
+    assert extract_text("cv.pdf") == ("abc def", "lebih panjang")
+
+    extractors.EXTRACTORS.clear()
+    backends("a", fake_backend(error=ValueError("enkripsi")))
+    backends("b", fake_backend(error=OSError("tidak terbaca")))
+    with pytest.raises(PDFExtractionError, match="a: enkripsi; b: tidak terbaca"):
+        extract_text("cv.pdf")
+
+
+def test_order_from_argument_and_environment(backends, monkeypatch):
+    backends("pertama", fake_backend([TEXT]))
+    backends("kedua", fake_backend([TEXT.upper()]))
+    assert extract_text("cv.pdf", order=["kedua", "pertama"])[1] == "kedua"
+    monkeypatch.setenv("CV_EVAL_PDF_BACKENDS", "kedua,tidak-ada")
+    assert extract_text("cv.pdf")[1] == "kedua"
+
+
+def test_page_and_char_budget_stop_parsing(backends):
+    consumed = []
+    backends("x", fake_backend([TEXT] * 10, consumed=consumed))
+    assert extract_text("cv.pdf", max_pages=2)[0] == TEXT * 2
+    assert len(consumed) == 2
+
+    consumed.clear()
+    assert extract_text("cv.pdf", max_chars=100)[0] == (TEXT * 2)[:100]
+    assert len(consumed) == 2
+
+
+class FakeOCR:
+    def __init__(self, texts):
+        self.texts = texts
+        self.requested = None
+
+    def ocr_pages(self, source, page_numbers):
+        self.requested = page_numbers
+        return {number: self.texts[number] for number in page_numbers if number in self.texts}
+
+
+def test_ocr_fills_empty_pages_and_marks_backend(backends):
+    backends("x", fake_backend([TEXT, "", TEXT]))
+    ocr = FakeOCR({1: "Teks hasil OCR halaman dua"})
+    text, backend = extract_text("cv.pdf", ocr=ocr)
+    assert backend == "x+ocr"
+    assert ocr.requested == [1]
+    assert text == TEXT + "Teks hasil OCR halaman dua\n" + TEXT
+
+
+def test_ocr_without_result_keeps_backend_name(backends):
+    backends("x", fake_backend([TEXT, ""]))
+    assert extract_text("cv.pdf", ocr=FakeOCR({})) == (TEXT, "x")
+
+
+def test_real_pdf_from_path_and_file_object(tmp_path):
+    path = tmp_path / "cv.pdf"
+    generate_cv_pdf(str(path), pages=2, seed=1)
+    text, backend = extract_text(str(path))
+    assert backend == extractors.available_extractors()[0].name
+    assert len(text) > 500
+
+    with open(path, "rb") as f:
+        assert extract_text(io.BytesIO(f.read())) == (text, backend)
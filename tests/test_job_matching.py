@@ -0,0 +1,29 @@
+from app import parse_job_descriptions
+from evaluator import CVEvaluator
+from job_matching import JobMatcher
+
+
+def test_parse_job_descriptions_splits_blocks_on_dashes():
+    jobs = parse_job_descriptions("Data Analyst\nSQL Tableau\n---\nBackend Engineer\nGo Kubernetes\n---\n")
+    assert jobs == {
+        "Data Analyst": "Data Analyst\nSQL Tableau",
+        "Backend Engineer": "Backend Engineer\nGo Kubernetes",
+    }
+
+
+def test_match_ranks_closest_job_first_and_drops_unrelated():
+    matcher = JobMatcher({
+        "Data Analyst": "SQL Tableau analisis data dashboard",
+        "Backend Engineer": "Go Kubernetes microservice",
+    }, CVEvaluator.clean_text)
+    matches = matcher.match(["Membuat dashboard Tableau dan query SQL"]).top_jobs_per_cv(top_k=2)[0]
+    assert [m["role"] for m in matches] == ["Data Analyst"]
+    assert 0 < matches[0]["match_percentage"] <= 100
+
+
+def test_empty_vocabulary_gives_zero_matches():
+    matcher = JobMatcher({"Posisi A": "... ?", "Posisi B": "!!! ---"}, CVEvaluator.clean_text)
+    assert matcher.vocabulary == {}
+    result = matcher.match(["Pengalaman SQL dan Tableau", ""])
+    assert result.similarity.shape == (2, 2) and not result.similarity.any()
+    assert result.top_jobs_per_cv(top_k=2) == [[], []]
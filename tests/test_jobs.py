@@ -0,0 +1,104 @@
+import os
+import shutil
+
+import pytest
+
+from batch import BatchEvaluator
+from benchmarks.corpus import generate_cv_pdf
+from evaluator import CVEvaluator
+from jobs import EXTRACTED, FAILED, PENDING, SCORED_AI, SCORED_FALLBACK, JobStore
+
+
+@pytest.fixture
+def cv_dir(tmp_path):
+    """Dua CV berbeda dan satu salinan persis (path berbeda, isi sama)"""
+    directory = tmp_path / "cv"
+    directory.mkdir()
+    generate_cv_pdf(str(directory / "a.pdf"), pages=1, seed=1)
+    generate_cv_pdf(str(directory / "b.pdf"), pages=1, seed=2)
+    shutil.copy(directory / "a.pdf", directory / "a_copy.pdf")
+    return directory
+
+
+def test_state_transitions(tmp_path, cv_dir):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    [(_, key)] = store.sync([str(cv_dir / "a.pdf")])
+    assert store.get(key)["state"] == PENDING
+
+    store.mark_extracted(key, "teks CV", "None:None")
+    document = store.get(key)
+    assert (document["state"], document["text"], document["text_limits"]) == (EXTRACTED, "teks CV", "None:None")
+
+    store.mark_scored(key, SCORED_FALLBACK, "rule-based:1", {"overall_score": 50}, error="AI gagal")
+    document = store.get(key)
+    assert (document["state"], document["version"], document["results"], document["error"]) == \
+        (SCORED_FALLBACK, "rule-based:1", {"overall_score": 50}, "AI gagal")
+    assert document["text"] == "teks CV"
+
+    store.mark_failed(key, "rusak")
+    store.mark_failed(key, "rusak")
+    document = store.get(key)
+    assert (document["state"], document["attempts"]) == (FAILED, 2)
+    assert store.counts() == {FAILED: 1}
+    store.close()
+
+
+def test_documents_are_keyed_by_content_hash(tmp_path, cv_dir):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    paths = [str(cv_dir / name) for name in ("a.pdf", "a_copy.pdf", "b.pdf")]
+    entries = store.sync(paths)
+    assert [path for path, _ in entries] == paths
+    hashes = [key for _, key in entries]
+    assert hashes[0] == hashes[1] != hashes[2]
+    assert store.counts() == {PENDING: 2}
+
+    # File yang isinya berubah mendapat dokumen baru; dokumen lama tetap ada
+    generate_cv_pdf(paths[2], pages=1, seed=3)
+    os.utime(paths[2], ns=(0, 1))
+    assert store.sync(paths[2:])[0][1] not in hashes
+    assert store.counts() == {PENDING: 3}
+    store.close()
+
+
+@pytest.mark.parametrize("state, version, use_ai, retry_failed, done", [
+    (SCORED_FALLBACK, "rule-based:1", False, False, True),
+    (SCORED_FALLBACK, "rule-based:2", False, False, False),   # aturan scoring berubah
+    (SCORED_FALLBACK, "rule-based:1", True, False, False),    # run AI menilai ulang hasil rule-based
+    (SCORED_AI, "ai:model:1", True, False, True),
+    (SCORED_AI, "ai:model:0", True, False, False),            # prompt atau model berubah
+    (SCORED_AI, "ai:model:1", False, False, True),            # hasil AI tidak ditimpa run rule-based
+    (EXTRACTED, None, False, False, False),
+    (FAILED, None, False, False, True),
+    (FAILED, None, False, True, False),
+])
+def test_is_done(state, version, use_ai, retry_failed, done):
+    batch = BatchEvaluator(workers=1, retry_failed=retry_failed)
+    current = "ai:model:1" if use_ai else "rule-based:1"
+    assert batch._is_done({"state": state, "version": version}, current, use_ai) is done
+
+
+def test_second_run_skips_everything_and_version_change_rescores(tmp_path, cv_dir, monkeypatch):
+    store_path = str(tmp_path / "jobs.sqlite3")
+
+    batch = BatchEvaluator(workers=2, store_path=store_path)
+    first = list(batch.run([str(cv_dir)]))
+    assert len(first) == 3 and batch.skipped == 0
+    assert {record["source"] for record in first} == {"rule-based"}
+    by_path = {os.path.basename(record["path"]): record for record in first}
+    assert by_path["a.pdf"]["content_hash"] == by_path["a_copy.pdf"]["content_hash"]
+    assert by_path["a.pdf"]["results"] == by_path["a_copy.pdf"]["results"]
+
+    second = list(batch.run([str(cv_dir)]))
+    assert len(second) == 3 and batch.skipped == 3
+    assert {record["source"] for record in second} == {"store"}
+    assert {r["path"]: r["results"] for r in second} == {r["path"]: r["results"] for r in first}
+
+    # Versi aturan scoring berubah: semua CV dinilai ulang, teks diambil dari job store
+    monkeypatch.setattr(CVEvaluator, "RULES_VERSION", CVEvaluator.RULES_VERSION + "-test")
+    third = list(batch.run([str(cv_dir)]))
+    assert len(third) == 3 and batch.skipped == 0
+    assert {record["source"] for record in third} == {"rule-based"}
+
+    store = JobStore(store_path)
+    assert store.counts() == {SCORED_FALLBACK: 2}
+    store.close()
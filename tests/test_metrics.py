@@ -0,0 +1,66 @@
+import re
+import threading
+import tracemalloc
+
+from metrics import Metrics, profile
+
+
+def _report_peaks(directory):
+    """{nama profil: peak MB} dari laporan teks profile()"""
+    peaks = {}
+    for path in directory.glob("*.txt"):
+        match = re.match(r"(\w+): [\d.]+ detik, peak memori ([\d.]+) MB", path.read_text(encoding="utf-8"))
+        peaks[match.group(1)] = float(match.group(2))
+    return peaks
+
+
+def test_timer_and_trace_collect_stage_durations():
+    metrics = Metrics()
+    with metrics.trace() as timings:
+        with metrics.timer("extract"):
+            pass
+        metrics.observe("extract", 0.5)
+    metrics.incr("pages", 3)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"pages": 3}
+    assert snapshot["timers"]["extract"]["count"] == 2
+    assert timings["extract"] >= 0.5
+    assert "cv_eval_pages_total 3" in metrics.to_prometheus()
+
+
+def test_concurrent_profiles_share_tracemalloc(tmp_path):
+    # Profil pertama selesai saat profil kedua masih berjalan
+    second_started, first_done = threading.Event(), threading.Event()
+    errors = []
+
+    def run(name, before_exit):
+        try:
+            with profile(name, directory=str(tmp_path)):
+                before_exit()
+                data = [bytes(1024) for _ in range(100)]
+                del data
+        except Exception as e:
+            errors.append(e)
+
+    first = threading.Thread(target=run, args=("first", lambda: second_started.wait(5)))
+    second = threading.Thread(target=run, args=("second", lambda: (second_started.set(), first_done.wait(5))))
+    first.start()
+    second.start()
+    first.join()
+    first_done.set()
+    second.join()
+    assert errors == []
+    assert set(_report_peaks(tmp_path)) == {"first", "second"}
+    assert not tracemalloc.is_tracing()
+
+
+def test_nested_profile_keeps_outer_peak(tmp_path):
+    with profile("outer", directory=str(tmp_path)):
+        data = bytearray(20 * 1024 * 1024)
+        del data
+        with profile("inner", directory=str(tmp_path)):
+            pass
+    peaks = _report_peaks(tmp_path)
+    assert peaks["outer"] >= 19
+    assert peaks["inner"] < 19
+    assert not tracemalloc.is_tracing()
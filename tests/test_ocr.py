@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+Image = pytest.importorskip("PIL.Image")
+
+import ocr  # noqa: E402
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    """PDF 3 halaman yang masing-masing hanya berisi gambar"""
+    path = tmp_path / "scan.pdf"
+    pixmap = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 20, 20), False)
+    pixmap.clear_with(200)
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page().insert_image(fitz.Rect(10, 10, 110, 110), pixmap=pixmap)
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def test_inline_ocr_passes_remaining_budget_as_timeout(monkeypatch, scanned_pdf):
+    timeouts = []
+
+    def slow_ocr(image, lang, timeout):
+        timeouts.append(timeout)
+        if len(timeouts) == 2:
+            # Tesseract dihentikan oleh timeout pada halaman kedua
+            raise ocr.OCRTimeout("Tesseract process timeout")
+        return "teks halaman"
+
+    monkeypatch.setattr(ocr, "Image", Image, raising=False)
+    monkeypatch.setattr(ocr, "_ocr_image", slow_ocr)
+    page_ocr = ocr.PageOCR(workers=0, time_budget=5)
+    start = time.monotonic()
+    texts = page_ocr.ocr_pages(scanned_pdf, [0, 1, 2])
+    assert time.monotonic() - start < 5
+    assert texts == {0: "teks halaman"}
+    assert len(timeouts) == 2
+    assert all(0 < timeout <= 5 for timeout in timeouts)
+
+
+def test_page_after_deadline_is_skipped(scanned_pdf):
+    with pytest.raises(ocr.OCRTimeout):
+        ocr._ocr_page(scanned_pdf, 0, 72, "eng", deadline=time.time() - 1)
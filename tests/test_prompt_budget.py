@@ -0,0 +1,53 @@
+import pytest
+
+from prompt_budget import _allocate, compress_cv, estimate_tokens, split_sections
+
+
+def long_cv():
+    lines = ["Budi Santoso", "budi@example.com"]
+    lines += ["Profil"] + [f"Kalimat profil nomor {i} tentang motivasi dan minat umum kandidat." for i in range(40)]
+    lines += ["Pendidikan"] + [f"Kursus daring ke-{i} di berbagai platform belajar dengan sertifikat." for i in range(40)]
+    lines += ["Pengalaman Kerja"] + [f"Data Analyst di PT Contoh {i}: membangun dashboard penjualan." for i in range(10)]
+    lines += ["Keahlian", "Python, SQL, Tableau, Power BI, Excel"]
+    return "\n".join(lines)
+
+
+def test_noise_and_repeated_lines_are_removed():
+    text = "\n".join([
+        "Budi Santoso  -   Curriculum Vitae", "Pengalaman", "Data   Analyst di PT A", "", "Page 1 of 2", "-----",
+        "Budi Santoso - Curriculum Vitae", "Keahlian", "SQL, Python", "2", "Halaman 2 dari 2",
+    ])
+    assert compress_cv(text, max_tokens=1000) == (
+        "Budi Santoso - Curriculum Vitae\n\nPengalaman\nData Analyst di PT A\n\nKeahlian\nSQL, Python"
+    )
+
+
+def test_compact_text_under_budget_is_returned_unchanged():
+    text = "Budi Santoso\n\nPengalaman\nData Analyst di PT A\n\nKeahlian\nSQL, Python"
+    assert compress_cv(text, max_tokens=1000) == text
+
+
+@pytest.mark.parametrize("max_tokens", [150, 300, 600, 900])
+def test_output_stays_within_budget(max_tokens):
+    text = long_cv()
+    assert estimate_tokens(text) > max_tokens
+    assert estimate_tokens(compress_cv(text, max_tokens)) <= max_tokens
+
+
+def test_experience_and_skills_survive_when_lower_priority_sections_are_cut():
+    text = long_cv()
+    compressed = compress_cv(text, max_tokens=400)
+    sections = dict(split_sections(compressed))
+
+    assert "Python, SQL, Tableau, Power BI, Excel" in sections["skills"]
+    original = dict(split_sections(text))
+    assert len(sections["experience"]) > len(sections["education"])
+    assert len(sections["profile"]) < len(original["profile"])
+    assert len(sections["education"]) < len(original["education"])
+
+
+def test_allocate_gives_small_sections_their_full_size():
+    allocation = _allocate([50, 1000, 1000], [1, 4, 1], budget=900)
+    assert allocation[0] == 50
+    assert allocation[1] > allocation[2]
+    assert sum(allocation) <= 900
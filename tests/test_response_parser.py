@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from response_parser import (JSONObjectScanner, PartialJSONParser, ResponseValidationError,
+                             extract_json_object, normalize_field, parse_analysis)
+
+ANALYSIS = {
+    "overall_score": 78,
+    "section_scores": {"structure": 20, "experience": 18, "skills": 22, "branding": 18},
+    "strengths": ["Pengalaman relevan"],
+    "weaknesses": [],
+    "suggestions": ["Tambahkan metrik"],
+    "detected_skills": ["Python", "SQL"],
+    "job_roles": [{"role": "Data Analyst", "match_percentage": 80, "reason": "SQL"}],
+}
+
+
+def test_extract_from_code_fence_and_surrounding_text():
+    text = "Berikut hasilnya:\n```json\n" + json.dumps(ANALYSIS) + "\n```\nSemoga membantu {catatan}"
+    assert extract_json_object(text) == ANALYSIS
+
+
+def test_extract_skips_invalid_object_and_ignores_braces_in_strings():
+    text = '{rusak} lalu {"reason": "pakai } dan \\" di string", "ok": 1}'
+    assert extract_json_object(text) == {"reason": 'pakai } dan " di string', "ok": 1}
+
+
+def test_extract_without_object_raises():
+    with pytest.raises(ValueError):
+        extract_json_object("tidak ada JSON di sini")
+
+
+def test_scanner_handles_objects_split_across_chunks():
+    scanner = JSONObjectScanner()
+    text = 'x {"a": {"b": "}"}} y {"c": 2}'
+    objects = [obj for i in range(0, len(text), 3) for obj in scanner.feed(text[i:i + 3])]
+    assert [json.loads(obj) for obj in objects] == [{"a": {"b": "}"}}, {"c": 2}]
+
+
+def test_partial_parser_emits_fields_as_they_complete():
+    parser = PartialJSONParser()
+    text = json.dumps(ANALYSIS)
+    completed = [item for char in text for item in parser.feed(char)]
+    assert [key for key, _ in completed] == list(ANALYSIS)
+    assert parser.done and parser.fields == ANALYSIS
+
+
+def test_validation_repairs_string_numbers_and_clamps_scores():
+    data = dict(ANALYSIS, overall_score="120",
+                section_scores={"structure": "20%", "experience": 30, "skills": -1, "branding": 12.5})
+    result = parse_analysis(json.dumps(data))
+    assert result["overall_score"] == 100
+    assert result["section_scores"] == {"structure": 20, "experience": 25, "skills": 0, "branding": 12.5}
+
+
+def test_validation_reports_every_problem():
+    data = {"overall_score": "tinggi", "section_scores": {"structure": 10}, "job_roles": [{"reason": "x"}]}
+    with pytest.raises(ResponseValidationError) as excinfo:
+        parse_analysis(json.dumps(data))
+    message = str(excinfo.value)
+    for problem in ("overall_score harus berupa angka", "section_scores.skills wajib ada",
+                    "job_roles[0].role wajib ada"):
+        assert problem in message
+
+
+def test_partial_job_roles_are_defaulted_and_clamped():
+    parser = PartialJSONParser()
+    text = ('{"overall_score": 70, "job_roles": [{"role": "Data Analyst", "match_percentage": "85%"}, '
+            '{"role": "QA", "match_percentage": 140, "reason": null}, {"role": "PM", "match_percentage": "?"}, '
+            '{"reason": "tanpa role"}], ')
+    fields = dict(parser.feed(text))
+    assert normalize_field("job_roles", fields["job_roles"]) == [
+        {"role": "Data Analyst", "match_percentage": 85, "reason": ""},
+        {"role": "QA", "match_percentage": 100, "reason": ""},
+    ]
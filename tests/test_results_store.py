@@ -0,0 +1,58 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from results_store import ResultsStore  # noqa: E402
+
+
+def analysis(score, skills, roles):
+    return {
+        "overall_score": score,
+        "section_scores": {"structure": 20, "experience": 20, "skills": 20, "branding": score - 60},
+        "detected_skills": skills,
+        "job_roles": [{"role": role, "match_percentage": match} for role, match in roles.items()],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results"), flush_rows=1000)
+    store.append(analysis(90, ["SQL", "Tableau"], {"Data Analyst": 70}), "a", campaign="q3")
+    store.append(analysis(80, ["sql", "tableau", "Python"], {"Data Analyst": 95}), "b", campaign="q3")
+    store.append(analysis(95, ["SQL"], {"Data Analyst": 99}), "c", campaign="q3")
+    store.append(analysis(85, ["Tableau", "SQL"], {"Product Manager": 80}), "d", campaign="q3")
+    store.flush()
+    return store
+
+
+def test_ranking_by_role_match_with_required_skills(store):
+    top = store.query(role="data analyst", skills=["SQL", "TABLEAU"], limit=50)
+    assert top["content_hash"].to_pylist() == ["b", "a"]
+    assert top["role_match"].to_pylist() == [95, 70]
+
+
+def test_ranking_by_score_with_limit_and_min_score(store):
+    assert store.query(limit=2)["content_hash"].to_pylist() == ["c", "a"]
+    assert store.query(min_score=86, limit=None)["content_hash"].to_pylist() == ["c", "a"]
+
+
+def test_latest_row_wins_within_campaign_only(store):
+    store.append(analysis(60, ["SQL"], {"Data Analyst": 10}), "a", campaign="q3")
+    store.append(analysis(99, ["SQL"], {"Data Analyst": 10}), "a", campaign=None)
+    store.flush()
+    q3 = store.query(campaign="q3", limit=None)
+    assert q3.num_rows == 4
+    assert dict(zip(q3["content_hash"].to_pylist(), q3["overall_score"].to_pylist()))["a"] == 60
+    assert store.content_hashes("q3") == {"a", "b", "c", "d"}
+    assert store.content_hashes(None) == {"a"}
+
+
+def test_parts_compacted_past_max_files(tmp_path):
+    store = ResultsStore(str(tmp_path / "results"), flush_rows=1, max_files=3)
+    for index in range(5):
+        store.append(analysis(70 + index, ["SQL"], {}), str(index % 4))
+    assert len(store._files()) <= 3
+    assert store.count() == 4
+    store.compact()
+    assert len(store._files()) == 1
+    assert sorted(store.query(limit=None)["overall_score"].to_pylist()) == [71, 72, 73, 74]
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from errors import OpenRouterError
+from scheduler import CircuitBreaker, RequestScheduler, TokenBucket
+
+
+class ScriptedClient:
+    """Client palsu: tiap request mengambil langkah berikutnya dari `script` (exception atau hasil)"""
+
+    model = "test/model"
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _request_analysis(self, cv_text, on_update=None):
+        with self._lock:
+            self.calls += 1
+            step = self.script.pop(0) if self.script else {"overall_score": 80}
+        if isinstance(step, Exception):
+            raise step
+        return step
+
+
+def test_token_bucket_limits_burst_and_pause():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert 0 < bucket.try_acquire() <= 0.1
+    bucket.pause(5)
+    assert bucket.try_acquire() > 4
+
+
+def test_circuit_breaker_opens_and_allows_single_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.retry_in() == 0
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_in() > 0
+    time.sleep(0.06)
+    assert breaker.retry_in() == 0          # probe half-open
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.retry_in() > 0           # probe kedua ditahan
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limit_on_half_open_probe_releases_breaker():
+    client = ScriptedClient([
+        OpenRouterError("upstream", status_code=503),
+        OpenRouterError("upstream", status_code=503),
+        OpenRouterError("rate limited", status_code=429, retry_after=0.01),
+        {"overall_score": 75},
+    ])
+    scheduler = RequestScheduler(client, requests_per_second=100, workers=1, max_retries=5,
+                                 base_delay=0.01, max_delay=0.02,
+                                 breaker_failure_threshold=2, breaker_reset_timeout=0.1)
+    try:
+        assert scheduler.submit("cv").result(timeout=5) == {"overall_score": 75}
+    finally:
+        scheduler.close()
+    assert client.calls == 4
+    assert scheduler.breakers[client.model].state == CircuitBreaker.CLOSED
+
+
+def test_permanent_error_is_not_retried():
+    client = ScriptedClient([OpenRouterError("bad key", status_code=401)])
+    scheduler = RequestScheduler(client, requests_per_second=100, workers=1)
+    try:
+        with pytest.raises(OpenRouterError):
+            scheduler.submit("cv").result(timeout=5)
+    finally:
+        scheduler.close()
+    assert client.calls == 1
+
+
+def test_callback_errors_do_not_open_the_breaker():
+    client = ScriptedClient([ValueError("bug di on_update"), ValueError("bug di parser")])
+    scheduler = RequestScheduler(client, requests_per_second=100, workers=1, breaker_failure_threshold=1)
+    try:
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                scheduler.submit("cv").result(timeout=5)
+        assert scheduler.submit("cv").result(timeout=5) == {"overall_score": 80}
+    finally:
+        scheduler.close()
+    assert scheduler.breakers[client.model].state == CircuitBreaker.CLOSED
+
+
+def test_wait_metrics_exclude_provider_latency():
+    class SlowClient(ScriptedClient):
+        def _request_analysis(self, cv_text, on_update=None):
+            time.sleep(0.2)
+            return super()._request_analysis(cv_text, on_update)
+
+    scheduler = RequestScheduler(SlowClient([]), requests_per_second=100, workers=1)
+    try:
+        futures = [scheduler.submit("cv") for _ in range(3)]
+        for future in futures:
+            future.result(timeout=5)
+        metrics = scheduler.metrics()
+    finally:
+        scheduler.close()
+    # Job ke-1 tidak menunggu, job ke-2 dan ke-3 menunggu 1 dan 2 request sebelumnya
+    assert metrics["wait_avg"] == pytest.approx(0.2, abs=0.1)
+    assert 0.3 < metrics["wait_p95"] < 0.6
@@ -0,0 +1,47 @@
+import pytest
+
+from scoring_rules import ScoringRules
+from taxonomy import Taxonomy
+
+RULES = {
+    "categories": {
+        "structure": {"max": 25, "rules": [
+            {"type": "section", "section": "skills", "points": 5, "mention_points": 2},
+        ]},
+        "experience": {"max": 25, "rules": [
+            {"type": "term", "terms": ["%"], "sections": ["experience"], "points": 1,
+             "per_occurrence": True, "max": 2},
+        ]},
+        "skills": {"max": 25, "rules": [
+            {"type": "skill", "sections": ["skills"], "points": 1},
+        ]},
+    }
+}
+
+CV = """Budi Santoso
+Pengalaman Kerja
+- Menaikkan konversi 20% dengan power bi
+- Menurunkan biaya 10%, 5% dan 3%
+Keahlian
+SQL, PowerBI, machine learning
+"""
+
+
+@pytest.fixture
+def engine():
+    taxonomy = Taxonomy.from_dict({"Data Analyst": ["sql", "power bi", "machine learning", "tableau"]},
+                                  {"power bi": ["powerbi"]})
+    return ScoringRules.from_dict(RULES).engine(taxonomy)
+
+
+def test_rules_scored_per_section(engine):
+    scores, matches = engine.score(engine.tokenize(CV))
+    assert scores["structure"] == 5
+    assert scores["experience"] == 2          # per kemunculan, dibatasi max
+    assert scores["skills"] == 3              # hanya skill di bawah judul "Keahlian"
+    assert matches.counts == {"power bi": 2, "sql": 1, "machine learning": 1}
+
+
+def test_invalid_rule_rejected():
+    with pytest.raises(ValueError):
+        ScoringRules.from_dict({"categories": {"x": {"rules": [{"type": "regex"}]}}})
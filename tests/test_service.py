@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import pytest
+from starlette.requests import Request
+
+from service import ScoringJob, ScoringService, create_app
+
+
+def get_job(app, job_id, query):
+    """Panggil endpoint GET /jobs/{job_id} langsung tanpa server HTTP"""
+    route = next(r for r in app.routes if r.path == "/jobs/{job_id}")
+    scope = {"type": "http", "method": "GET", "path": f"/jobs/{job_id}", "headers": [],
+             "query_string": query.encode(), "path_params": {"job_id": job_id}}
+    response = asyncio.run(route.endpoint(Request(scope)))
+    return response.status_code, json.loads(response.body)
+
+
+@pytest.fixture
+def service_with_job(tmp_path):
+    service = ScoringService(workers=1, cache_path=str(tmp_path / "cache.sqlite"))
+    job = ScoringJob(b"%PDF", "test/model", "default", None)
+    service.jobs[job.job_id] = job
+    yield service, job
+    service.close()
+
+
+@pytest.mark.parametrize("query", ["wait=abc", "wait=nan", "wait="])
+def test_invalid_wait_returns_400(service_with_job, query):
+    service, job = service_with_job
+    status, body = get_job(create_app(service), job.job_id, query)
+    assert status == 400
+    assert "wait" in body["error"]
+
+
+@pytest.mark.parametrize("query", ["wait=-5", "wait=0", ""])
+def test_negative_or_missing_wait_returns_immediately(service_with_job, query):
+    service, job = service_with_job
+    status, body = get_job(create_app(service), job.job_id, query)
+    assert status == 200
+    assert body["status"] == "queued"
+
+
+def test_evaluators_use_the_interactive_extraction_budget(tmp_path):
+    service = ScoringService(workers=1, cache_path=str(tmp_path / "cache.sqlite"), max_pages=3, max_chars=1000)
+    evaluator = service._evaluator(None, None)
+    assert (evaluator.max_pages, evaluator.max_chars) == (3, 1000)
+    service.close()
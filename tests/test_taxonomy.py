@@ -0,0 +1,84 @@
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+
+import taxonomy as taxonomy_module
+from taxonomy import SkillMatches, Taxonomy, load_taxonomy
+
+
+def brute_force_rank(roles, detected, top_k):
+    ranked = []
+    for position, (role, skills) in enumerate(roles.items()):
+        skills = set(skills)
+        count = len(skills & detected)
+        if count:
+            ranked.append((-min(count / len(skills) * 100, 100), -count, position, role, count))
+    return [(role, count, -negative_pct) for negative_pct, _, _, role, count in sorted(ranked)[:top_k]]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rank_roles_matches_brute_force(seed):
+    rng = random.Random(seed)
+    skills = [f"skill {i}" for i in range(40)]
+    roles = {f"Role {i}": rng.sample(skills, rng.randint(1, 8)) for i in range(30)}
+    taxonomy = Taxonomy.from_dict(roles)
+    # SkillMatches hanya berisi skill yang ada di taksonomi
+    detected = set(rng.sample(sorted(taxonomy.skills), 10))
+    matches = SkillMatches([(skill, i, i + 1) for i, skill in enumerate(sorted(detected))])
+
+    expected = brute_force_rank(roles, detected, top_k=7)
+    actual = taxonomy.rank_roles(matches, top_k=7)
+    assert [(role, count) for role, count, _ in actual] == [(role, count) for role, count, _ in expected]
+    assert np.allclose([pct for _, _, pct in actual], [pct for _, _, pct in expected])
+
+
+def test_inverted_index_and_synonyms():
+    taxonomy = Taxonomy.from_dict({"Data Analyst": ["SQL", "Power BI"], "Backend": ["sql", "Go"]},
+                                  {"power bi": ["powerbi"]})
+    assert sorted(taxonomy.roles_for_skill("SQL")) == ["Backend", "Data Analyst"]
+    assert taxonomy.roles_for_skill("rust") == []
+    assert taxonomy.surfaces["powerbi"] == taxonomy.surfaces["power bi"]
+
+
+def write_taxonomy(path, roles, mtime):
+    path.write_text(json.dumps({"roles": roles}), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_changed_taxonomy_file_invalidates_cached_index(tmp_path):
+    path, index_dir = tmp_path / "roles.json", str(tmp_path / "index")
+    write_taxonomy(path, {"Data Analyst": ["sql"]}, mtime=1_000_000)
+    first = load_taxonomy(str(path), index_dir)
+    assert first.role_skills == {"Data Analyst": ["sql"]}
+    assert len(os.listdir(index_dir)) == 1
+
+    write_taxonomy(path, {"Data Analyst": ["sql", "tableau"]}, mtime=2_000_000)
+    second = load_taxonomy(str(path), index_dir)
+    assert second.role_skills == {"Data Analyst": ["sql", "tableau"]}
+    assert second.fingerprint != first.fingerprint
+    assert len(os.listdir(index_dir)) == 2
+
+
+def test_stale_or_corrupt_index_is_recompiled(tmp_path):
+    path, index_dir = tmp_path / "roles.json", str(tmp_path / "index")
+    write_taxonomy(path, {"Data Analyst": ["sql"]}, mtime=1_000_000)
+    load_taxonomy(str(path), index_dir)
+    [index_name] = os.listdir(index_dir)
+    index_path = os.path.join(index_dir, index_name)
+
+    # Index dengan nama yang sama tetapi isi taksonomi lain (mis. disalin dari mesin lain)
+    Taxonomy.from_dict({"Lain": ["go"]}, fingerprint="lain").save_index(index_path)
+    taxonomy_module._load_taxonomy.cache_clear()
+    assert load_taxonomy(str(path), index_dir).role_skills == {"Data Analyst": ["sql"]}
+
+    with open(index_path, "wb") as f:
+        f.write(b"bukan npz")
+    taxonomy_module._load_taxonomy.cache_clear()
+    assert load_taxonomy(str(path), index_dir).role_skills == {"Data Analyst": ["sql"]}
+
+
+def test_default_index_dir_does_not_depend_on_cwd():
+    assert os.path.isabs(taxonomy_module.DEFAULT_INDEX_DIR)